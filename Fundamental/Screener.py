@@ -1,9 +1,13 @@
-import requests
-from bs4 import BeautifulSoup
+import os
+
 import pandas as pd
-from io import StringIO
+from lxml import html as lxml_html
+
+from Fundamental.screener_client import get_client
 
-HEADERS = {"User-Agent": "Mozilla/5.0"}
+# Run from the repo root:
+#   python -m Fundamental.Screener
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # =============================
 # TICKER LIST (for now only Reliance)
@@ -14,33 +18,55 @@ TICKERS = ["RELIANCE","ANURAS"]   # later you can add more
 def fetch_screener_data(ticker):
     print(f"Fetching {ticker} ...")
 
-    url = f"https://www.screener.in/company/{ticker}/consolidated/"
-    html = requests.get(url, headers=HEADERS).text
-    soup = BeautifulSoup(html, "html.parser")
+    html = get_client().company_page(ticker)
+    return parse_screener_html(html)
+
+
+def _number(text):
+    # "1,234" → 1234.0, "12%" → 12.0, "" / "PDF" → NaN
+    try:
+        return float(text.replace(",", "").replace("%", "").strip())
+    except ValueError:
+        return float("nan")
+
+
+def _text(el):
+    return el.text_content().replace("\xa0", " ").strip()
+
+
+def parse_screener_html(html):
+    """
+    One lxml parse of the page, then the four blocks the screener uses,
+    already typed: quarterly values and ratios as floats, sector and
+    benchmark index names as strings.
+    """
+    root = lxml_html.fromstring(html)
 
     # =============================
     # 1️⃣ Quarterly Results Table
     # =============================
-    table = soup.select_one("section#quarters table")
-    df_quarterly = pd.read_html(StringIO(str(table)), header=0)[0]
+    table = root.xpath('//section[@id="quarters"]//table')[0]
 
-    df_quarterly.rename(columns={df_quarterly.columns[0]: "metric"}, inplace=True)
-    df_quarterly["metric"] = (
-        df_quarterly["metric"]
-        .str.replace("\xa0", " ", regex=False)
-        .str.replace("+", "", regex=False)
-        .str.strip()
-    )
+    periods = [_text(th) for th in table.xpath("./thead/tr/th")][1:]
+    metrics, values = [], []
+
+    for tr in table.xpath("./tbody/tr"):
+        cells = tr.xpath("./td")
+        metrics.append(_text(cells[0]).replace("+", "").strip())
+        values.append([_number(td.text_content()) for td in cells[1:]])
+
+    df_quarterly = pd.DataFrame(values, columns=periods, dtype="float64")
+    df_quarterly.insert(0, "metric", metrics)
 
     # =============================
     # 2️⃣ Company Ratios (Market Cap, PE, ROE...)
     # =============================
     ratios = {}
-    for li in soup.select("ul#top-ratios li"):
-        name = li.select_one("span.name").get_text(strip=True)
-        value = li.select_one("span.number")
-        if value:
-            ratios[name] = value.get_text(strip=True)
+    for li in root.xpath('//ul[@id="top-ratios"]/li'):
+        name = li.xpath('.//span[contains(@class, "name")]')
+        value = li.xpath('.//span[contains(@class, "number")]')
+        if name and value:
+            ratios[_text(name[0])] = _number(value[0].text_content())
 
     df_ratios = pd.DataFrame(ratios.items(), columns=["Metric", "Value"])
 
@@ -49,32 +75,38 @@ def fetch_screener_data(ticker):
     # =============================
     sector_info = {}
 
-    peer_section = soup.select_one("section#peers p.sub")
-    if peer_section:
-        links = peer_section.find_all("a")
-        if len(links) >= 4:
-            sector_info = {
-                "Broad Sector": links[0].get_text(strip=True),
-                "Sector": links[1].get_text(strip=True),
-                "Industry Group": links[2].get_text(strip=True),
-                "Industry": links[3].get_text(strip=True),
-            }
+    links = root.xpath('(//section[@id="peers"]//p[contains(@class, "sub")])[1]//a')
+    if len(links) >= 4:
+        sector_info = {
+            "Broad Sector": _text(links[0]),
+            "Sector": _text(links[1]),
+            "Industry Group": _text(links[2]),
+            "Industry": _text(links[3]),
+        }
 
     df_sector = pd.DataFrame(sector_info.items(), columns=["Category", "Value"])
 
-    return df_quarterly, df_ratios, df_sector
+    # =============================
+    # 4️⃣ Benchmark Indices (Nifty 50, Nifty Bank...)
+    # =============================
+    indices = dict.fromkeys(_text(a) for a in root.xpath('//*[@id="benchmarks"]//a'))
+    df_indices = pd.DataFrame({"Index": [name for name in indices if name]})
+
+    return df_quarterly, df_ratios, df_sector, df_indices
 
 
 # =============================
 # MAIN LOOP (for multiple tickers later)
 # =============================
-for ticker in TICKERS:
-    df_quarterly, df_ratios, df_sector = fetch_screener_data(ticker)
-
-    filename = f"{ticker}_fundamentals.xlsx"
-    with pd.ExcelWriter(filename) as writer:
-        df_quarterly.to_excel(writer, sheet_name="Quarterly Results", index=False)
-        df_ratios.to_excel(writer, sheet_name="Key Ratios", index=False)
-        df_sector.to_excel(writer, sheet_name="Sector Info", index=False)
-
-    print(f"✅ Saved {filename}")
+if __name__ == "__main__":
+    for ticker in TICKERS:
+        df_quarterly, df_ratios, df_sector, df_indices = fetch_screener_data(ticker)
+
+        filename = os.path.join(OUTPUT_DIR, f"{ticker}_fundamentals.xlsx")
+        with pd.ExcelWriter(filename) as writer:
+            df_quarterly.to_excel(writer, sheet_name="Quarterly Results", index=False)
+            df_ratios.to_excel(writer, sheet_name="Key Ratios", index=False)
+            df_sector.to_excel(writer, sheet_name="Sector Info", index=False)
+            df_indices.to_excel(writer, sheet_name="Indices", index=False)
+
+        print(f"✅ Saved {filename}")
@@ -0,0 +1,267 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+
+from Fundamental import fixture_server
+from Fundamental import screener_ingest as ingest
+from Fundamental.Screener import parse_screener_html
+from Fundamental.screener_client import HEADERS, ScreenerClient
+from Stocks_filtered import fake_es
+from Stocks_filtered import screener_core as core
+
+# =============================
+# BENCHMARKS AGAINST THE LOCAL FIXTURE SERVER
+# =============================
+# Run from the repo root:
+#   python -m Fundamental.benchmarks ingest --tickers 300 --latency-ms 50
+#   python -m Fundamental.benchmarks scrape --tickers 60 --latency-ms 300 --rate 10
+#   python -m Fundamental.benchmarks parse --tickers 300 [--pages-dir saved_pages/]
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def make_tickers(n):
+    return [f"FIX{i:04d}" for i in range(n)]
+
+
+def bench_ingest(n_tickers=300, latency=0.05, es_latency=0.002):
+
+    server, base_url = fixture_server.serve(latency=latency)
+    tickers = make_tickers(n_tickers) + ["MISSING1"]
+
+    print(f"Screener ingest — {len(tickers)} tickers, {latency * 1000:.0f} ms/page, "
+          f"{es_latency * 1000:.1f} ms/ES round trip")
+
+    try:
+        # one page at a time, one index call per doc
+        es = fake_es.FakeElasticsearch(latency=es_latency)
+        core.set_es(es)
+
+        def serial():
+            for ticker in tickers:
+                res = requests.get(f"{base_url}/company/{ticker}/consolidated/", headers=HEADERS)
+                if res.ok:
+                    doc = ingest.normalize_document(ticker, *parse_screener_html(res.text))
+                    es.bulk(operations=[{"index": {"_index": core.FUND_INDEX, "_id": ticker}}, doc])
+
+        _, t_serial = _timed(serial)
+        serial_docs = dict(es.data[core.FUND_INDEX])
+        print(f"  serial get + index       : {t_serial:8.2f}s  calls={es.calls}")
+
+        es = fake_es.FakeElasticsearch(latency=es_latency)
+        core.set_es(es)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with ingest.IngestCheckpoint(os.path.join(tmp, "checkpoint.sqlite")) as checkpoint:
+
+                # an interrupted first run that only got through half the list
+                # the fixture has no rate limit, so neither does the client
+                client = ScreenerClient(base_url, rate=10_000, burst=100, max_per_host=ingest.SCRAPE_WORKERS)
+
+                half = tickers[:n_tickers // 2]
+                stats, t_half = _timed(ingest.ingest, half, client, checkpoint)
+                print(f"  pipeline, first half     : {t_half:8.2f}s  {stats}")
+
+                stats, t_resume = _timed(ingest.ingest, tickers, client, checkpoint)
+                print(f"  pipeline, resumed        : {t_resume:8.2f}s  {stats}  calls={es.calls}")
+                print(f"  speedup (half + resume)  : {t_serial / (t_half + t_resume):8.1f}x")
+
+                failed = checkpoint.failed()
+                print(f"  failed in checkpoint     : {sorted(failed)}")
+
+        docs = es.data[core.FUND_INDEX]
+        same = docs.keys() == serial_docs.keys() and all(
+            {**docs[t], "scraped_at": None} == {**serial_docs[t], "scraped_at": None} for t in docs
+        )
+        print(f"  same docs as serial      : {same}")
+
+    finally:
+        server.shutdown()
+
+
+def bench_scrape(n_tickers=60, latency=0.3, rate=10, workers=8, full_list=500):
+    """
+    Against a server that answers 429 above `rate` req/s: the old serial
+    loop with a 1.5s sleep versus the shared client at the server's rate,
+    and the client pushed past it to show the backoff.
+    """
+
+    tickers = make_tickers(n_tickers)
+
+    print(f"Screener scrape — {n_tickers} tickers, {latency * 1000:.0f} ms/page, "
+          f"server allows {rate} req/s")
+
+    def run(label, fetch, pool_size):
+        server, base_url = fixture_server.serve(latency=latency, rate_limit=rate)
+        try:
+            with ThreadPoolExecutor(max_workers=pool_size) as pool:
+                pages, elapsed = _timed(lambda: list(pool.map(lambda t: fetch(base_url, t), tickers)))
+            ok = sum(page is not None for page in pages)
+            stats = server.stats
+            print(f"  {label:<28}: {elapsed:8.2f}s  {n_tickers / elapsed:6.1f} pages/s  ok={ok}/{n_tickers}  "
+                  f"429s={stats['throttled']}  peak in flight={stats['peak_in_flight']}")
+            return elapsed
+        finally:
+            server.shutdown()
+
+    # what Random/test.py used to do
+    def serial(base_url, ticker):
+        res = requests.get(f"{base_url}/company/{ticker}/consolidated/", headers=HEADERS)
+        time.sleep(1.5)
+        return res.text if res.ok else None
+
+    t_serial = run("serial get + sleep(1.5)", serial, 1)
+
+    clients = {}
+
+    def shared(client_rate):
+        def fetch(base_url, ticker):
+            if base_url not in clients:
+                clients[base_url] = ScreenerClient(base_url, rate=client_rate, burst=1, max_per_host=workers)
+            try:
+                return clients[base_url].company_page(ticker)
+            except requests.HTTPError:
+                return None
+        return fetch
+
+    t_client = run(f"client at {rate}/s, {workers} workers", shared(rate), workers)
+    run(f"client at {rate * 3}/s (too fast)", shared(rate * 3), workers)
+
+    per_page = t_serial / n_tickers
+    print(f"  {full_list} tickers, serial         : {per_page * full_list / 60:8.1f} min (extrapolated)")
+    print(f"  {full_list} tickers, client         : {t_client / n_tickers * full_list / 60:8.1f} min (extrapolated)")
+
+
+def _parse_soup(html):
+    # the original html.parser + read_html implementation
+    soup = BeautifulSoup(html, "html.parser")
+
+    table = soup.select_one("section#quarters table")
+    df_quarterly = pd.read_html(StringIO(str(table)), header=0)[0]
+    df_quarterly.rename(columns={df_quarterly.columns[0]: "metric"}, inplace=True)
+    df_quarterly["metric"] = (
+        df_quarterly["metric"]
+        .str.replace("\xa0", " ", regex=False)
+        .str.replace("+", "", regex=False)
+        .str.strip()
+    )
+
+    ratios = {}
+    for li in soup.select("ul#top-ratios li"):
+        name = li.select_one("span.name").get_text(strip=True)
+        value = li.select_one("span.number")
+        if value:
+            ratios[name] = value.get_text(strip=True)
+    df_ratios = pd.DataFrame(ratios.items(), columns=["Metric", "Value"])
+
+    sector_info = {}
+    peer_section = soup.select_one("section#peers p.sub")
+    if peer_section:
+        links = peer_section.find_all("a")
+        if len(links) >= 4:
+            sector_info = dict(zip(["Broad Sector", "Sector", "Industry Group", "Industry"],
+                                   [a.get_text(strip=True) for a in links[:4]]))
+    df_sector = pd.DataFrame(sector_info.items(), columns=["Category", "Value"])
+
+    return df_quarterly, df_ratios, df_sector
+
+
+PARSERS = {
+    "bs4 + read_html": _parse_soup,
+    "lxml single pass": parse_screener_html,
+}
+
+
+def load_pages(n_pages, pages_dir=None):
+    """
+    Saved .html pages from `pages_dir` if given, else fixture pages.
+    """
+    if pages_dir:
+        paths = sorted(glob.glob(os.path.join(pages_dir, "*.html")))[:n_pages]
+        pages = {}
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                pages[os.path.splitext(os.path.basename(path))[0]] = f.read()
+        return pages
+
+    return {t: fixture_server.company_html(t) for t in make_tickers(n_pages)}
+
+
+def _parse_worker(name, n_pages, pages_dir, queue):
+    pages = load_pages(n_pages, pages_dir)
+    parse = PARSERS[name]
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    start = time.perf_counter()
+    for html in pages.values():
+        parse(html)
+    elapsed = time.perf_counter() - start
+
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - before))
+
+
+def bench_parse(n_pages=300, pages_dir=None):
+    """
+    Pages/s for each parser, each in a fresh process so the RSS growth is
+    its own, plus a check that both give the same ingest documents.
+    """
+
+    pages = load_pages(n_pages, pages_dir)
+    size = sum(len(html) for html in pages.values()) / len(pages)
+    print(f"Screener page parsing — {len(pages)} pages, {size / 1024:.0f} KB avg")
+
+    ctx = multiprocessing.get_context("spawn")
+    for name in PARSERS:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_parse_worker, args=(name, n_pages, pages_dir, queue))
+        proc.start()
+        elapsed, grown = queue.get(timeout=600)
+        proc.join()
+        print(f"  {name:<17}: {len(pages) / elapsed:7.1f} pages/s  "
+              f"{elapsed / len(pages) * 1000:6.2f} ms/page  RSS +{grown:5.1f} MB")
+
+    same = True
+    for ticker, html in pages.items():
+        old = ingest.normalize_document(ticker, *_parse_soup(html))
+        new = ingest.normalize_document(ticker, *parse_screener_html(html)[:3])
+        same = same and {**old, "scraped_at": None} == {**new, "scraped_at": None}
+    print(f"  same ingest docs  : {same}")
+
+
+BENCHMARKS = {
+    "ingest": bench_ingest,
+    "scrape": bench_scrape,
+    "parse": bench_parse,
+}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Fundamentals benchmarks against local fixtures")
+    parser.add_argument("name", nargs="?", choices=sorted(BENCHMARKS), default="ingest")
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--rate", type=float, default=10, help="server-side limit for scrape, req/s")
+    parser.add_argument("--pages-dir", default=None, help="saved .html pages for parse")
+    args = parser.parse_args()
+
+    if args.name == "ingest":
+        bench_ingest(args.tickers, args.latency_ms / 1000)
+    elif args.name == "scrape":
+        bench_scrape(args.tickers, args.latency_ms / 1000, args.rate)
+    elif args.name == "parse":
+        bench_parse(args.tickers, args.pages_dir)
@@ -0,0 +1,240 @@
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =============================
+# LOCAL SCREENER.IN STAND-IN
+# =============================
+# Serves synthetic company pages with the same markup the scraper reads
+# (section#quarters table, ul#top-ratios, section#peers p.sub, #benchmarks)
+# plus the annual sections a real page carries, so page sizes and parse
+# times are in the right ballpark. Tickers starting with MISSING return 404.
+# With `rate_limit` set, requests beyond that many per second get a 429
+# with Retry-After, like the real site; `stats` counts requests, 429s and
+# the peak number of requests in flight.
+
+QUARTERS = [f"{m} {y}" for y in range(2022, 2026) for m in ("Mar", "Jun", "Sep", "Dec")][-13:]
+YEARS = [f"Mar {y}" for y in range(2014, 2026)]
+
+QUARTER_ROWS = [
+    "Sales", "Expenses", "Operating Profit", "OPM %", "Other Income",
+    "Interest", "Depreciation", "Profit before tax", "Tax %",
+    "Net Profit", "EPS in Rs"
+]
+ANNUAL_SECTIONS = {
+    "profit-loss": QUARTER_ROWS + ["Dividend Payout %"],
+    "balance-sheet": [
+        "Equity Capital", "Reserves", "Borrowings", "Other Liabilities",
+        "Total Liabilities", "Fixed Assets", "CWIP", "Investments",
+        "Other Assets", "Total Assets"
+    ],
+    "cash-flow": [
+        "Cash from Operating Activity", "Cash from Investing Activity",
+        "Cash from Financing Activity", "Net Cash Flow"
+    ],
+    "ratios": [
+        "Debtor Days", "Inventory Days", "Days Payable",
+        "Cash Conversion Cycle", "Working Capital Days", "ROCE %"
+    ],
+    "shareholding": ["Promoters", "FIIs", "DIIs", "Government", "Public", "No. of Shareholders"]
+}
+SECTORS = [
+    ("Energy", "Oil, Gas & Consumable Fuels", "Petroleum Products", "Refineries & Marketing"),
+    ("Financial Services", "Financial Services", "Banks", "Private Sector Bank"),
+    ("Information Technology", "Information Technology", "IT - Services", "Computers - Software & Consulting"),
+    ("Healthcare", "Healthcare", "Pharmaceuticals & Biotechnology", "Pharmaceuticals"),
+    ("Capital Goods", "Capital Goods", "Electrical Equipment", "Heavy Electrical Equipment"),
+]
+BENCHMARKS = ["Nifty 50", "Nifty 500", "Nifty 100", "Nifty Bank", "Nifty IT", "Nifty Energy", "BSE Sensex"]
+
+
+def _fmt(value, pct=False):
+    if pct:
+        return f"{value:.0f}%"
+    return f"{value:,.2f}" if abs(value) < 100 else f"{value:,.0f}"
+
+
+def _table(label, rows, columns, rng):
+    head = "".join(f'<th class="">{c}</th>' for c in columns)
+    body = []
+
+    for name in rows:
+        pct = name.endswith("%")
+        value = rng.uniform(5, 60) if pct else rng.uniform(50, 50000)
+        cells = []
+        for _ in columns:
+            value = value * rng.uniform(0.9, 1.15) if not pct else rng.uniform(5, 60)
+            cells.append(f"<td>{_fmt(value, pct)}</td>")
+
+        button = (
+            f'<button class="button-plain" onclick="Company.showSchedule(\'{name}\', \'{label}\', this)">'
+            f'{name}&nbsp;<span class="blue-icon">+</span></button>'
+        )
+        body.append(f'<tr class="stripe"><td class="text">{button}</td>{"".join(cells)}</tr>')
+
+    pdf = "".join('<td><a href="/company/source/quarter/1/" target="_blank">PDF</a></td>' for _ in columns)
+    body.append(f'<tr class="font-size-14"><td class="text">Raw PDF</td>{pdf}</tr>')
+
+    return (
+        f'<div class="responsive-holder fill-card-width">'
+        f'<table class="data-table responsive-text-nowrap">'
+        f'<thead><tr><th class="text"></th>{head}</tr></thead>'
+        f'<tbody>{"".join(body)}</tbody></table></div>'
+    )
+
+
+@lru_cache(maxsize=4096)
+def company_html(ticker):
+    rng = random.Random(ticker)
+    broad, sector, group, industry = rng.choice(SECTORS)
+    benchmarks = "".join(
+        f'<a href="/company/{1000 + BENCHMARKS.index(name)}/">{name}</a>'
+        for name in rng.sample(BENCHMARKS, rng.randint(1, 3))
+    )
+
+    ratios = [
+        ("Market Cap", "&#8377; ", rng.uniform(500, 500000), " Cr."),
+        ("Current Price", "&#8377; ", rng.uniform(50, 5000), ""),
+        ("Stock P/E", "", rng.uniform(5, 90), ""),
+        ("Book Value", "&#8377; ", rng.uniform(10, 2000), ""),
+        ("Dividend Yield", "", rng.uniform(0, 4), " %"),
+        ("ROCE", "", rng.uniform(-5, 35), " %"),
+        ("ROE", "", rng.uniform(-5, 30), " %"),
+        ("Face Value", "&#8377; ", rng.choice([1, 2, 5, 10]), ""),
+    ]
+    ratio_items = "".join(
+        f'<li class="flex flex-space-between" data-source="default">'
+        f'<span class="name">{name}</span>'
+        f'<span class="nowrap value">{prefix}<span class="number">{value:,.2f}</span>{suffix}</span></li>'
+        for name, prefix, value, suffix in ratios
+    )
+
+    annual = "".join(
+        f'<section id="{sid}" class="card card-large">'
+        f'<h2>{sid.replace("-", " ").title()}</h2>'
+        f'{_table(sid, rows, YEARS, rng)}</section>'
+        for sid, rows in ANNUAL_SECTIONS.items()
+    )
+
+    return (
+        "<!DOCTYPE html><html lang='en'><head><meta charset='utf-8'>"
+        f"<title>{ticker} share price | About {ticker} | Key Insights - Screener</title>"
+        "<link rel='stylesheet' href='/static/css/app.css'></head><body>"
+        f'<main class="flex-grow container"><div id="top" class="card card-large">'
+        f'<h1 class="h2 shrink-text">{ticker} Ltd</h1>'
+        f'<p id="benchmarks" class="sub">{benchmarks}</p>'
+        f'<ul id="top-ratios">{ratio_items}</ul></div>'
+        f'<section id="peers" class="card card-large"><h2>Peer comparison</h2>'
+        f'<p class="sub">Sector: <a href="/market/IN01/">{broad}</a> '
+        f'Industry: <a href="/market/IN01/IN0101/">{sector}</a> '
+        f'<a href="/market/IN01/IN0101/IN010101/">{group}</a> '
+        f'<a href="/market/IN01/IN0101/IN010101/IN010101001/">{industry}</a></p></section>'
+        f'<section id="quarters" class="card card-large"><h2>Quarterly Results</h2>'
+        f'{_table("Quarters", QUARTER_ROWS, QUARTERS, rng)}</section>'
+        f"{annual}</main></body></html>"
+    )
+
+
+COMPANY_PATH = re.compile(r"^/company/([^/]+)/consolidated/?$")
+
+
+class ServerLimiter:
+    """
+    Fixed one-second windows of at most `rate` requests.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.window = 0
+        self.count = 0
+        self.in_flight = 0
+        self.stats = {"requests": 0, "throttled": 0, "peak_in_flight": 0}
+        self.lock = threading.Lock()
+
+    def enter(self):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.in_flight += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.in_flight)
+
+            if not self.rate:
+                return True
+
+            window = int(time.monotonic())
+            if window != self.window:
+                self.window, self.count = window, 0
+            self.count += 1
+
+            if self.count > self.rate:
+                self.stats["throttled"] += 1
+                return False
+            return True
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+
+    latency = 0.0
+    limiter = None
+
+    def do_GET(self):
+        allowed = self.limiter.enter()
+        try:
+            self._respond(allowed)
+        finally:
+            self.limiter.leave()
+
+    def _respond(self, allowed):
+        if not allowed:
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        match = COMPANY_PATH.match(self.path.split("?")[0])
+        if not match or match.group(1).startswith("MISSING"):
+            self.send_error(404)
+            return
+
+        body = company_html(match.group(1)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(latency=0.0, port=0, rate_limit=None):
+    """
+    Start the fixture server on a background thread. Returns the server
+    (call .shutdown() when done, read .stats for counters) and its base URL.
+    """
+    limiter = ServerLimiter(rate_limit)
+    handler = type("Handler", (FixtureHandler,), {"latency": latency, "limiter": limiter})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.stats = limiter.stats
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    server, url = serve()
+    print(f"🧪 Screener fixtures on {url}/company/<TICKER>/consolidated/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
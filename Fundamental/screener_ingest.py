@@ -0,0 +1,297 @@
+import argparse
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from Fundamental.Screener import parse_screener_html
+from Fundamental import screener_client
+from Fundamental.screener_client import ScreenerClient, get_client
+from Stocks_filtered import screener_core as core
+
+# =============================
+# CONFIG
+# =============================
+# Scrapes Screener.in company pages concurrently, normalizes them into
+# the nifty_fundamental document the screener reads and streams them into
+# ES with helpers.parallel_bulk. A SQLite checkpoint records every ticker
+# that made it into the index, so an interrupted run resumes where it
+# stopped. Page requests go through the shared rate-limited ScreenerClient.
+CHECKPOINT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "screener_ingest_checkpoint.sqlite")
+
+SCRAPE_WORKERS = 8         # download + parse threads sharing the client
+BULK_THREADS = 2           # parallel_bulk sender threads
+BULK_CHUNK = 200           # docs per bulk request
+CHECKPOINT_MAX_AGE = 7 * 24 * 3600   # re-scrape tickers older than this
+
+SECTOR_KEYS = {
+    "Broad Sector": "broad_sector",
+    "Sector": "sector",
+    "Industry Group": "industry_group",
+    "Industry": "industry"
+}
+
+
+# =============================
+# NORMALIZATION
+# =============================
+
+def to_number(value):
+    """
+    1234.0, "1,234", "12%", "₹ 1,234 Cr." → float; anything else → None.
+    """
+    if isinstance(value, (int, float)):
+        return None if pd.isna(value) else float(value)
+
+    text = re.sub(r"[^0-9.\-]", "", str(value).replace(",", ""))
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def ratio_key(name):
+    # "Stock P/E" → stock_p_e, "ROCE" → roce
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def period_date(column):
+    # "Dec 2023" → "2023-12", the format screener_core reads
+    try:
+        month = pd.to_datetime(column, format="%b %Y")
+    except (ValueError, TypeError):
+        return None
+    return month.strftime("%Y-%m")
+
+
+def normalize_document(ticker, df_quarterly, df_ratios, df_sector, df_indices=None):
+    """
+    The frames parse_screener_html returns, as one nifty_fundamental doc:
+    quarterly[{metric, period_date, value}], ratios.<key>,
+    sector.{broad_sector, sector, industry_group, industry}, indices[].
+    """
+
+    periods = {col: period_date(col) for col in df_quarterly.columns[1:]}
+
+    quarterly = []
+    for row in df_quarterly.itertuples(index=False):
+        metric = row[0]
+        for col, value in zip(df_quarterly.columns[1:], row[1:]):
+            number = to_number(value)
+            if periods[col] and number is not None:
+                quarterly.append({"metric": metric, "period_date": periods[col], "value": number})
+
+    ratios = {}
+    for name, value in df_ratios.itertuples(index=False):
+        number = to_number(value)
+        if number is not None:
+            ratios[ratio_key(name)] = number
+
+    sector = {
+        SECTOR_KEYS[category]: value
+        for category, value in df_sector.itertuples(index=False)
+        if category in SECTOR_KEYS
+    }
+
+    doc = {
+        "ticker": ticker,
+        "sector": sector,
+        "ratios": ratios,
+        "quarterly": quarterly,
+        "scraped_at": datetime.now(timezone.utc).isoformat()
+    }
+    if df_indices is not None:
+        doc["indices"] = df_indices["Index"].tolist()
+
+    return doc
+
+
+# =============================
+# SCRAPING
+# =============================
+
+def scrape_document(ticker, client=None):
+    html = (client or get_client()).company_page(ticker)
+    return normalize_document(ticker, *parse_screener_html(html))
+
+
+def scrape_many(tickers, client=None, workers=SCRAPE_WORKERS, failures=None):
+    """
+    Yield normalized docs as pages finish downloading; tickers that fail
+    are recorded in `failures` instead of stopping the run.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(scrape_document, t, client): t for t in tickers}
+
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                if failures is not None:
+                    failures[futures[future]] = f"scrape: {e}"
+
+
+# =============================
+# CHECKPOINT
+# =============================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingested (
+    ticker      TEXT PRIMARY KEY,
+    status      TEXT NOT NULL,
+    error       TEXT,
+    ingested_at REAL NOT NULL
+)
+"""
+
+
+class IngestCheckpoint:
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def done(self, max_age=CHECKPOINT_MAX_AGE):
+        rows = self.conn.execute(
+            "SELECT ticker FROM ingested WHERE status = 'ok' AND ingested_at >= ?",
+            (time.time() - max_age,)
+        )
+        return {ticker for ticker, in rows}
+
+    def mark(self, tickers, status="ok", errors=None):
+        now = time.time()
+        errors = errors or {}
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO ingested VALUES (?, ?, ?, ?)",
+            [(t, status, errors.get(t), now) for t in tickers]
+        )
+        self.conn.commit()
+
+    def failed(self):
+        return dict(self.conn.execute("SELECT ticker, error FROM ingested WHERE status = 'failed'"))
+
+
+# =============================
+# PIPELINE
+# =============================
+
+def bulk_actions(docs, index=None):
+    for doc in docs:
+        yield {
+            "_op_type": "index",
+            "_index": index or core.FUND_INDEX,
+            "_id": doc["ticker"],
+            "_source": doc
+        }
+
+
+def ingest(tickers, client=None, checkpoint=None, workers=SCRAPE_WORKERS,
+           bulk_threads=BULK_THREADS, chunk_size=BULK_CHUNK, max_age=CHECKPOINT_MAX_AGE):
+    """
+    Scrape and index every ticker not already in the checkpoint. Returns
+    counts of requested, skipped, indexed and failed tickers.
+    """
+
+    from elasticsearch import helpers
+
+    tickers = list(dict.fromkeys(t.replace(".NS", "").strip().upper() for t in tickers))
+    done = checkpoint.done(max_age) if checkpoint is not None else set()
+    todo = [t for t in tickers if t not in done]
+
+    failures = {}
+    pending = []
+    n_indexed = 0
+
+    results = helpers.parallel_bulk(
+        core.get_es(),
+        bulk_actions(scrape_many(todo, client, workers, failures)),
+        thread_count=bulk_threads,
+        chunk_size=chunk_size,
+        raise_on_error=False,
+        raise_on_exception=False
+    )
+
+    for ok, info in results:
+        item = next(iter(info.values()))
+        if ok:
+            pending.append(item["_id"])
+            n_indexed += 1
+        else:
+            failures[item["_id"]] = f"index: {item.get('error') or item.get('exception')}"
+
+        # checkpoint once per bulk chunk, not per doc
+        if checkpoint is not None and len(pending) >= chunk_size:
+            checkpoint.mark(pending)
+            pending.clear()
+
+    if checkpoint is not None:
+        checkpoint.mark(pending)
+        checkpoint.mark(list(failures), status="failed", errors=failures)
+
+    return {
+        "requested": len(tickers),
+        "skipped": len(tickers) - len(todo),
+        "indexed": n_indexed,
+        "failed": len(failures)
+    }
+
+
+def read_tickers(path):
+    """
+    Tickers from an .xlsx/.csv with a *ticker* column, or one per line.
+    """
+    if path.endswith((".xlsx", ".csv")):
+        df = pd.read_excel(path) if path.endswith(".xlsx") else pd.read_csv(path)
+        column = [c for c in df.columns if "ticker" in str(c).lower()][0]
+        return df[column].dropna().astype(str).tolist()
+
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+# =============================
+# MAIN
+# =============================
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Scrape Screener.in fundamentals into nifty_fundamental")
+    parser.add_argument("tickers", nargs="*", help="symbols, with or without .NS")
+    parser.add_argument("--tickers-file", default=None)
+    parser.add_argument("--base-url", default=screener_client.BASE_URL)
+    parser.add_argument("--rate", type=float, default=screener_client.RATE_PER_SEC, help="requests per second")
+    parser.add_argument("--workers", type=int, default=SCRAPE_WORKERS)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    parser.add_argument("--fresh", action="store_true", help="ignore the checkpoint and re-scrape everything")
+    core.add_es_arguments(parser)
+    args = parser.parse_args()
+    core.configure_from_args(args)
+
+    tickers = args.tickers + (read_tickers(args.tickers_file) if args.tickers_file else [])
+
+    client = ScreenerClient(args.base_url, rate=args.rate)
+
+    print(f"📥 Ingesting {len(tickers)} tickers from {args.base_url} into {core.FUND_INDEX}...")
+    start = time.perf_counter()
+    with IngestCheckpoint(args.checkpoint) as checkpoint:
+        stats = ingest(tickers, client, checkpoint, args.workers,
+                       max_age=0 if args.fresh else CHECKPOINT_MAX_AGE)
+        failed = checkpoint.failed()
+
+    print(f"✅ Done in {time.perf_counter() - start:.1f}s: {stats}")
+    for ticker, error in list(failed.items())[:20]:
+        print(f"   ❌ {ticker}: {error}")
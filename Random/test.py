@@ -1,17 +1,23 @@
-import requests
+import os
+
 from bs4 import BeautifulSoup
 import pandas as pd
-import time
+from concurrent.futures import ThreadPoolExecutor
 
+from Fundamental.screener_client import get_client
 
-def get_indices_from_screener(symbol: str):
-    url = f"https://www.screener.in/company/{symbol}/consolidated/"
-    headers = {"User-Agent": "Mozilla/5.0"}
+# Run from the repo root:
+#   python -m Random.test
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# the shared client enforces Screener's rate limit across all workers
+WORKERS = 8
 
+
+def get_indices_from_screener(symbol: str):
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
+        html = get_client().company_page(symbol)
+        soup = BeautifulSoup(html, "html.parser")
 
         # --- Extract Indices ---
         indices = []
@@ -45,23 +51,21 @@ def get_indices_from_screener(symbol: str):
 
 
 # --- Read tickers from Excel ---
-input_file = "nifty500_valid_tickers.xlsx"
+input_file = os.path.join(HERE, "nifty500_valid_tickers.xlsx")
 df = pd.read_excel(input_file)
 
 # Assuming the ticker column name is 'Ticker' or similar
 ticker_col = [col for col in df.columns if 'ticker' in col.lower()][0]
 tickers = df[ticker_col].dropna().tolist()
 
-results = []
+symbols = [ticker.replace(".NS", "").strip().upper() for ticker in tickers]
 
-for ticker in tickers:
-    symbol = ticker.replace(".NS", "").strip().upper()
-    print(f"🔍 Fetching {symbol}...")
-    data = get_indices_from_screener(symbol)
-    results.append(data)
-    time.sleep(1.5)  # polite delay to avoid blocking by Screener
+print(f"🔍 Fetching {len(symbols)} symbols...")
+with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+    results = list(pool.map(get_indices_from_screener, symbols))
 
 # --- Save results ---
 output_df = pd.DataFrame(results)
-output_df.to_excel("nifty500_screener_indices.xlsx", index=False)
-print("\n✅ Done! Saved to nifty500_screener_indices.xlsx")
+output_file = os.path.join(HERE, "nifty500_screener_indices.xlsx")
+output_df.to_excel(output_file, index=False)
+print(f"\n✅ Done! Saved to {output_file}")
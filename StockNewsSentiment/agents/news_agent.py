@@ -1,79 +1,234 @@
 from ..services.news_service import NewsService
+from ..services.async_news_fetcher import AsyncNewsFetcher
+from ..config.settings import (
+    NEWS_CACHE_TTL_SECONDS, NEWS_HTTP_CACHE_FILE, NEWS_HTTP_CACHE_MAX_MB,
+    NEWS_MAX_CONCURRENCY, NEWS_PER_HOST_RATE, NEWS_PER_HOST_CONCURRENCY,
+    OLLAMA_URL, OLLAMA_MODEL, OLLAMA_KEEP_ALIVE, LLM_USE_CHAT, SENTIMENT_BATCH_SIZE
+)
+from typing import Dict, List, Optional
 import json
+import time
 import requests
 
+SENTIMENT_SCHEMA = """{
+"stock_sentiment": "Positive | Negative | Neutral",
+"sector_sentiment": "Positive | Negative | Neutral",
+"market_sentiment": "Positive | Negative | Neutral",
+"Trading Sentiment": "Positive only if the stock, sector and market sentiment are all Positive, otherwise Negative",
+"Reason": "Explain the reason for sentiment",
+"top_stock_news": "most defining one single top news",
+"top_sector_news": "most defining one single top news",
+"top_market_news": "most defining one single top news"
+}"""
+
 
 class NewsAgent:
 
-    def __init__(self):
-        self.news_service = NewsService()
+    def __init__(
+            self,
+            news_service: Optional[NewsService] = None,
+            llm_url: str = OLLAMA_URL,
+            model: str = OLLAMA_MODEL
+    ):
+        self.news_service = news_service or NewsService(
+            cache_ttl=NEWS_CACHE_TTL_SECONDS,
+            http_cache_path=NEWS_HTTP_CACHE_FILE,
+            http_cache_max_bytes=NEWS_HTTP_CACHE_MAX_MB * 1024 * 1024
+        )
+        self.llm_url = llm_url.rstrip("/")
+        self.model = model
+        self.llm_session = requests.Session()
+        self.use_chat = LLM_USE_CHAT
+        self.keep_alive = OLLAMA_KEEP_ALIVE
+
+        # one entry per LLM call: ttft, total and Ollama's token counts
+        self.llm_timings: List[Dict] = []
+        self.news_fetcher = AsyncNewsFetcher(
+            self.news_service,
+            max_concurrency=NEWS_MAX_CONCURRENCY,
+            per_host_rate=NEWS_PER_HOST_RATE,
+            per_host_concurrency=NEWS_PER_HOST_CONCURRENCY
+        )
 
         # fetch wide market news once
         self.wide_market_news = self.news_service.fetch(
             "National and International news that impacts Indian stock market"
         )
 
-    def call_llm(self, prompt: str):
+        # identical for every prompt of the run, so Ollama only evaluates
+        # it once and keeps it in the KV cache
+        self.prompt_prefix = self.build_prompt_prefix()
+
+    def call_llm(self, prompt: str, json_mode: bool = False):
+
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": self.keep_alive
+        }
+        if json_mode:
+            # constrain the output to valid JSON
+            payload["format"] = "json"
+
+        return self._stream("/api/generate", payload)
+
+    def call_llm_chat(self, system: str, user: str, json_mode: bool = False):
+
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": user}
+            ],
+            "stream": True,
+            "keep_alive": self.keep_alive
+        }
+        if json_mode:
+            payload["format"] = "json"
+
+        return self._stream("/api/chat", payload)
+
+    def _stream(self, path: str, payload: dict):
+        """
+        POST a streaming request and join the pieces, recording time to
+        first token and the final chunk's counters in llm_timings.
+        """
+
+        start = time.perf_counter()
+        ttft = None
+        pieces = []
 
         try:
-            response = requests.post(
-                "http://127.0.0.1:11434/api/generate",
-                json={
-                    "model": "llama3",
-                    "prompt": prompt,
-                    "stream": False
-                }
-            )
+            with self.llm_session.post(f"{self.llm_url}{path}", json=payload, stream=True) as response:
+                response.raise_for_status()
+
+                for line in response.iter_lines():
+                    if not line:
+                        continue
 
-            response.raise_for_status()
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        print(f"Error from LLM: {chunk['error']}")
+                        return None
 
-            return response.json()["response"]
+                    piece = chunk.get("response") or chunk.get("message", {}).get("content", "")
+                    if piece:
+                        if ttft is None:
+                            ttft = time.perf_counter() - start
+                        pieces.append(piece)
 
-        except requests.RequestException as e:
+                    if chunk.get("done"):
+                        self.llm_timings.append({
+                            "ttft": ttft,
+                            "total": time.perf_counter() - start,
+                            "load": chunk.get("load_duration", 0) / 1e9,
+                            "prompt_eval_count": chunk.get("prompt_eval_count", 0),
+                            "prompt_eval": chunk.get("prompt_eval_duration", 0) / 1e9,
+                            "eval_count": chunk.get("eval_count", 0)
+                        })
+
+        # ValueError: a malformed or cut-off NDJSON line
+        except (requests.RequestException, ValueError) as e:
             print(f"Error sending request to LLM: {e}")
             return None
 
-    def get_latest_news(self, stock_name: str, sector: str):
+        return "".join(pieces)
+
+    def timing_summary(self) -> Dict:
+        """
+        Median / p95 time to first token and totals over llm_timings.
+        """
+
+        if not self.llm_timings:
+            return {"calls": 0}
+
+        ttfts = sorted(t["ttft"] for t in self.llm_timings if t["ttft"] is not None)
+
+        def pct(values, q):
+            return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+        return {
+            "calls": len(self.llm_timings),
+            "ttft_p50": pct(ttfts, 0.5),
+            "ttft_p95": pct(ttfts, 0.95),
+            "prompt_tokens_evaluated": sum(t["prompt_eval_count"] for t in self.llm_timings),
+            "prompt_eval_seconds": sum(t["prompt_eval"] for t in self.llm_timings),
+            "output_tokens": sum(t["eval_count"] for t in self.llm_timings),
+            "total_seconds": sum(t["total"] for t in self.llm_timings)
+        }
+
+    def ask_llm(self, suffix: str, json_mode: bool = False):
+        """
+        The shared prefix plus a per-call suffix, as a system + user chat
+        (use_chat) or one generate prompt. Either way the prefix comes
+        first, so Ollama reuses its cached evaluation.
+        """
+
+        if self.use_chat:
+            return self.call_llm_chat(self.prompt_prefix, suffix, json_mode)
+
+        return self.call_llm(self.prompt_prefix + suffix, json_mode)
+
+    @staticmethod
+    def build_queries(stock_name: str, sector: str):
 
         # query formation responsibility moved here
         stock_query = f"{stock_name} stock NSE OR BSE"
         sector_query = f"{sector} sector stock India"
 
-        stock_news = self.news_service.fetch(stock_query)
-        sector_news = self.news_service.fetch(sector_query)
+        return stock_query, sector_query
+
+    def prefetch_news(self, stock_to_sector: dict):
+        """
+        Fetch the stock and sector feeds of every stock concurrently into
+        the service's query cache, so get_latest_news finds them there.
+        """
+        queries = [q for stock, sector in stock_to_sector.items() for q in self.build_queries(stock, sector)]
+        self.news_fetcher.fetch_all(queries)
+
+    def _news_texts(self, stock_name: str, sector: str):
 
-        stock_news = stock_news[:5]
-        sector_news = sector_news[:5]
-        wide_market_news = self.wide_market_news[:5]
+        stock_query, sector_query = self.build_queries(stock_name, sector)
 
-        stock_news_text = json.dumps(stock_news, indent=2)
-        sector_news_text = json.dumps(sector_news, indent=2)
-        market_news_text = json.dumps(wide_market_news, indent=2)
+        stock_news = self.news_service.fetch(stock_query)[:5]
+        sector_news = self.news_service.fetch(sector_query)[:5]
 
-        prompt = f"""
+        return json.dumps(stock_news, indent=2), json.dumps(sector_news, indent=2)
+
+    def build_prompt_prefix(self) -> str:
+        """
+        Instructions, output schema and market news: everything that is
+        the same for every stock.
+        """
+
+        market_news_text = json.dumps(self.wide_market_news[:5], indent=2)
+
+        return f"""
 You are a financial news analyst.
 
-Analyze the following news and determine sentiment impact for stock investing.
+Analyze the news you are given and determine sentiment impact for stock investing.
 
 Consider three layers of news:
 
 1. Stock specific news
 2. Sector level news
-3. Overall market news
+3. Overall market news (below, the same for every stock)
 
-Return the result strictly in JSON format:
+For each stock, the result is strictly JSON of this form:
 
-{{
-"stock_sentiment": "Positive | Negative | Neutral",
-"sector_sentiment": "Positive | Negative | Neutral",
-"market_sentiment": "Positive | Negative | Neutral",
-"Trading Sentiment": "The stock is  positive only if all the news ie market sector and stock are positive if any one news is marked not positive then make the trading sentiment as negative - just tell positive or negative"
-"Reason" : Explain the reason for sentiment
-"top_stock_news": most defining one single top news,
-"top_sector_news": most defining one single top news,
-"top_market_news": most defining one single top news,
-}}
+{SENTIMENT_SCHEMA}
+
+------------ MARKET NEWS ------------
+
+{market_news_text}
+"""
+
+    def build_stock_suffix(self, stock_name: str, sector: str) -> str:
+
+        stock_news_text, sector_news_text = self._news_texts(stock_name, sector)
 
+        return f"""
 ------------ STOCK NEWS ({stock_name}) ------------
 
 {stock_news_text}
@@ -82,11 +237,85 @@ Return the result strictly in JSON format:
 
 {sector_news_text}
 
------------- MARKET NEWS ------------
+Return the result for {stock_name} strictly as one JSON object of the form above.
+"""
 
-{market_news_text}
+    def get_latest_news(self, stock_name: str, sector: str):
+
+        return self.ask_llm(self.build_stock_suffix(stock_name, sector))
+
+    def build_batch_suffix(self, stock_to_sector: Dict[str, str]) -> str:
+        """
+        Several stocks after the shared prefix: each sector's news once,
+        then every stock's own news.
+        """
+
+        sector_blocks = {}
+        stock_blocks = []
+        for stock, sector in stock_to_sector.items():
+            stock_news_text, sector_news_text = self._news_texts(stock, sector)
+            sector_blocks.setdefault(sector, sector_news_text)
+            stock_blocks.append(
+                f"------------ STOCK NEWS ({stock}, sector: {sector}) ------------\n\n{stock_news_text}"
+            )
+
+        sector_text = "\n\n".join(
+            f"------------ SECTOR NEWS ({sector}) ------------\n\n{text}"
+            for sector, text in sector_blocks.items()
+        )
+        stock_text = "\n\n".join(stock_blocks)
+
+        return f"""
+{sector_text}
+
+{stock_text}
+
+Return the result strictly as one JSON object with one key per stock symbol
+({", ".join(stock_to_sector)}), each mapped to an object of the form above.
 """
 
-        # print(f"prompt = {market_news_text}")
+    @staticmethod
+    def parse_json_response(text: Optional[str]):
+        """
+        The JSON object in an LLM response, tolerating code fences and
+        chatter around it; None if there is none.
+        """
+
+        if not text:
+            return None
+
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return None
+
+        try:
+            return json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+
+    def get_latest_news_batch(self, stock_to_sector: Dict[str, str], batch_size: int = SENTIMENT_BATCH_SIZE):
+        """
+        Sentiment for many stocks with batch_size stocks per LLM call.
+        Stocks are batched by sector so sector news is shared within a
+        prompt. Returns {stock: parsed sentiment dict or None}; stocks a
+        batch answer leaves out are retried one at a time.
+        """
+
+        stocks = sorted(stock_to_sector, key=lambda s: (stock_to_sector[s], s))
+        results = {}
+
+        for start in range(0, len(stocks), batch_size):
+            batch = {s: stock_to_sector[s] for s in stocks[start:start + batch_size]}
+
+            if len(batch) > 1:
+                answer = self.parse_json_response(self.ask_llm(self.build_batch_suffix(batch), json_mode=True))
+                answer = {str(k).upper(): v for k, v in (answer or {}).items()}
+                for stock in batch:
+                    if isinstance(answer.get(stock.upper()), dict):
+                        results[stock] = answer[stock.upper()]
+
+            for stock, sector in batch.items():
+                if stock not in results:
+                    results[stock] = self.parse_json_response(self.get_latest_news(stock, sector))
 
-        return self.call_llm(prompt)
\ No newline at end of file
+        return {stock: results[stock] for stock in stock_to_sector}
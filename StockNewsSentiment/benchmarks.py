@@ -0,0 +1,343 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import feedparser
+
+from StockNewsSentiment import fake_ollama, fixture_server
+from StockNewsSentiment.agents.news_agent import NewsAgent, SENTIMENT_SCHEMA
+from StockNewsSentiment.config.settings import STOCK_TO_SECTOR
+from StockNewsSentiment.services.async_news_fetcher import AsyncNewsFetcher
+from StockNewsSentiment.services.news_service import NewsService
+
+# Benchmarks against the local RSS fixture server. Run from the repo root:
+#   python -m StockNewsSentiment.benchmarks fetch --stocks 60 --latency-ms 200
+#   python -m StockNewsSentiment.benchmarks cache --stocks 300 --latency-ms 50
+#   python -m StockNewsSentiment.benchmarks http-cache --stocks 300 --latency-ms 50
+#   python -m StockNewsSentiment.benchmarks sentiment --stocks 48
+#   python -m StockNewsSentiment.benchmarks prefix --stocks 24
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def universe_queries(n_stocks=None):
+    stocks = list(STOCK_TO_SECTOR.items())[:n_stocks]
+    return [q for stock, sector in stocks for q in NewsAgent.build_queries(stock, sector)]
+
+
+def fixture_service(base_url, cache_ttl=900, http_cache_path=None, http_cache_max_bytes=64 * 1024 * 1024):
+    service = NewsService(cache_ttl=cache_ttl, http_cache_path=http_cache_path,
+                          http_cache_max_bytes=http_cache_max_bytes)
+    service.BASE_URL = base_url
+    return service
+
+
+def bench_fetch(n_stocks=60, latency=0.2, rate=50):
+    """
+    main.py's serial feedparser loop versus the async fan-out, against a
+    server that answers 429 above `rate` req/s.
+    """
+
+    queries = universe_queries(n_stocks)
+    full = len(universe_queries())
+
+    print(f"RSS fetching — {n_stocks} stocks, {len(queries)} queries, "
+          f"{latency * 1000:.0f} ms/feed, server allows {rate} req/s")
+
+    server, base_url = fixture_server.serve(latency=latency, rate_limit=rate)
+    try:
+        service = fixture_service(base_url)
+        serial, t_serial = _timed(lambda: {q: service.fetch(q) for q in queries})
+        print(f"  {'serial fetch':<24}: {t_serial:7.2f}s  {len(queries) / t_serial:6.1f} feeds/s  "
+              f"429s={server.stats['throttled']}")
+    finally:
+        server.shutdown()
+
+    server, base_url = fixture_server.serve(latency=latency, rate_limit=rate)
+    try:
+        fetcher = AsyncNewsFetcher(fixture_service(base_url), per_host_rate=rate, per_host_concurrency=16)
+        fanned, t_async = _timed(fetcher.fetch_all, queries)
+        print(f"  {f'async, {rate:g} req/s/host':<24}: {t_async:7.2f}s  {len(queries) / t_async:6.1f} feeds/s  "
+              f"429s={server.stats['throttled']}  peak in flight={server.stats['peak_in_flight']}  "
+              f"{fetcher.stats}")
+    finally:
+        server.shutdown()
+
+    print(f"  {'speedup':<24}: {t_serial / t_async:7.1f}x")
+    print(f"  {'same news':<24}: {fanned == serial}")
+    print(f"  {f'all {full} queries':<24}: {t_serial / len(queries) * full / 60:5.1f} min serial, "
+          f"{t_async / len(queries) * full / 60:5.1f} min async (extrapolated)")
+
+
+def bench_cache(n_stocks=300, latency=0.05, workers=16):
+    """
+    Requests the server sees for main.py's per-stock loop with the query
+    cache off (TTL 0, single-flight only) and on, serially and from a
+    thread pool.
+    """
+
+    stocks = list(STOCK_TO_SECTOR.items())[:n_stocks]
+    n_sectors = len({sector for _, sector in stocks})
+
+    print(f"News query cache — {n_stocks} stocks in {n_sectors} sectors, {latency * 1000:.0f} ms/feed")
+
+    def per_stock(service, stock, sector):
+        stock_query, sector_query = NewsAgent.build_queries(stock, sector)
+        return service.fetch(stock_query), service.fetch(sector_query)
+
+    results = {}
+    for label, ttl, pool_size in (
+        ("serial, TTL 0", 0, 1),
+        ("serial, TTL 15 min", 900, 1),
+        (f"{workers} threads, TTL 0", 0, workers),
+        (f"{workers} threads, TTL 15 min", 900, workers),
+    ):
+        server, base_url = fixture_server.serve(latency=latency)
+        try:
+            service = fixture_service(base_url, cache_ttl=ttl)
+            service.fetch("National and International news that impacts Indian stock market")
+
+            with ThreadPoolExecutor(max_workers=pool_size) as pool:
+                out, elapsed = _timed(lambda: list(pool.map(lambda s: per_stock(service, *s), stocks)))
+
+            results[label] = out
+            print(f"  {label:<24}: {elapsed:7.2f}s  requests={server.stats['requests']:5d}  {service.cache.stats}")
+        finally:
+            server.shutdown()
+
+    print(f"  {'same news':<24}: {all(r == results['serial, TTL 0'] for r in results.values())}")
+
+    # a second fan-out in the same run window is served from the cache
+    server, base_url = fixture_server.serve(latency=latency)
+    try:
+        fetcher = AsyncNewsFetcher(fixture_service(base_url), per_host_rate=200, per_host_concurrency=16)
+        queries = universe_queries(n_stocks)
+        _, t_cold = _timed(fetcher.fetch_all, queries)
+        cold = server.stats["requests"]
+        _, t_warm = _timed(fetcher.fetch_all, queries)
+        print(f"  {'async cold / warm':<24}: {t_cold:7.2f}s / {t_warm:.3f}s  "
+              f"requests={cold} / {server.stats['requests'] - cold}")
+    finally:
+        server.shutdown()
+
+
+def _fetch_feedparser(service, query):
+    # the original path: feedparser downloads the URL itself
+    return NewsService.items_from_feed(feedparser.parse(service.build_url(query)))
+
+
+def bench_http_cache(n_stocks=300, latency=0.05, changed=0.1, workers=8):
+    """
+    Repeat runs within minutes: a fresh NewsService (empty memory cache)
+    per run, sharing one on-disk feed cache. Between the third and fourth
+    run a fraction of the feeds change upstream.
+    """
+
+    queries = list(dict.fromkeys(universe_queries(n_stocks)))
+    print(f"RSS HTTP cache — {len(queries)} feeds, {latency * 1000:.0f} ms/feed, {workers} threads")
+
+    server, base_url = fixture_server.serve(latency=latency)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "news_http_cache.sqlite")
+
+            def run(label, fetch):
+                before = dict(server.stats)
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    out, elapsed = _timed(lambda: list(pool.map(fetch, queries)))
+                sent = {k: server.stats[k] - before[k] for k in ("requests", "not_modified", "bytes")}
+                print(f"  {label:<24}: {elapsed:7.2f}s  200s={sent['requests'] - sent['not_modified']:4d}  "
+                      f"304s={sent['not_modified']:4d}  downloaded {sent['bytes'] / 1e6:6.2f} MB")
+                return out
+
+            plain = fixture_service(base_url)
+            expected = run("feedparser.parse(url)", lambda q: _fetch_feedparser(plain, q))
+
+            def cached_run(label):
+                service = fixture_service(base_url, http_cache_path=path)
+                return run(label, service._fetch_rss_sorted), service
+
+            cold, _ = cached_run("session, cold cache")
+            warm, service = cached_run("session, warm cache")
+
+            for query in queries[::int(1 / changed)]:
+                server.bump(query)
+            cached_run(f"{changed:.0%} of feeds changed")
+
+            fanout = fixture_service(base_url, http_cache_path=path)
+            before = dict(server.stats)
+            _, elapsed = _timed(AsyncNewsFetcher(fanout, per_host_rate=500, per_host_concurrency=16).fetch_all, queries)
+            print(f"  {'async, warm cache':<24}: {elapsed:7.2f}s  "
+                  f"304s={server.stats['not_modified'] - before['not_modified']:4d}")
+
+            print(f"  {'same items':<24}: {cold == expected and warm == expected}")
+            print(f"  {'cache file':<24}: {service.feed_cache.size() / 1e6:.2f} MB of items, "
+                  f"{os.path.getsize(path) / 1e6:.2f} MB on disk")
+
+            small = fixture_service(base_url, http_cache_path=os.path.join(tmp, "small.sqlite"),
+                                    http_cache_max_bytes=200 * 1024)
+            for query in queries:
+                small._fetch_rss_sorted(query)
+            print(f"  {'200 KB cap':<24}: {small.feed_cache.size() / 1024:.0f} KB kept after {len(queries)} feeds")
+    finally:
+        server.shutdown()
+
+
+def bench_sentiment(n_stocks=48, batch_sizes=(1, 4, 8, 16), prompt_rate=500.0, eval_rate=50.0, time_scale=20.0):
+    """
+    Stocks per minute of LLM time against the fake Ollama server, one
+    call per stock versus batched prompts. News comes from the RSS
+    fixtures and is prefetched, so only LLM time is measured.
+    """
+
+    stock_to_sector = dict(list(STOCK_TO_SECTOR.items())[:n_stocks])
+
+    print(f"Batched sentiment — {n_stocks} stocks, fake model at {prompt_rate:.0f} prompt tok/s, "
+          f"{eval_rate:.0f} output tok/s (run {time_scale:g}x faster, reported in model time)")
+
+    rss, rss_url = fixture_server.serve()
+    try:
+        for batch_size in batch_sizes:
+            llm, llm_url = fake_ollama.serve(prompt_rate, eval_rate, time_scale=time_scale)
+            try:
+                agent = NewsAgent(fixture_service(rss_url), llm_url=llm_url)
+                agent.prefetch_news(stock_to_sector)
+
+                if batch_size == 1:
+                    results, elapsed = _timed(lambda: {
+                        stock: agent.parse_json_response(agent.get_latest_news(stock, sector))
+                        for stock, sector in stock_to_sector.items()
+                    })
+                else:
+                    results, elapsed = _timed(agent.get_latest_news_batch, stock_to_sector, batch_size)
+
+                model_time = elapsed * time_scale
+                parsed = sum(isinstance(r, dict) for r in results.values())
+                stats = llm.stats
+                print(f"  batch {batch_size:>2}: {n_stocks / model_time * 60:6.1f} stocks/min  "
+                      f"calls={stats['requests']:3d}  prompt tokens={stats['prompt_tokens']:6d} "
+                      f"({stats['evaluated_tokens']:6d} evaluated)  "
+                      f"output tokens={stats['eval_tokens']:6d}  parsed={parsed}/{n_stocks}")
+            finally:
+                llm.shutdown()
+    finally:
+        rss.shutdown()
+
+
+def _legacy_prompt(agent, stock_name, sector):
+    # the original layout: per-stock news first, market news last
+    stock_news_text, sector_news_text = agent._news_texts(stock_name, sector)
+    market_news_text = json.dumps(agent.wide_market_news[:5], indent=2)
+
+    return f"""
+You are a financial news analyst.
+
+Analyze the following news and determine sentiment impact for stock investing.
+
+Consider three layers of news:
+
+1. Stock specific news
+2. Sector level news
+3. Overall market news
+
+Return the result strictly in JSON format:
+
+{SENTIMENT_SCHEMA}
+
+------------ STOCK NEWS ({stock_name}) ------------
+
+{stock_news_text}
+
+------------ SECTOR NEWS ({sector}) ------------
+
+{sector_news_text}
+
+------------ MARKET NEWS ------------
+
+{market_news_text}
+"""
+
+
+def bench_prefix(n_stocks=24, prompt_rate=500.0, eval_rate=50.0, time_scale=20.0):
+    """
+    Prompt layout and Ollama session reuse: the original prompt (market
+    news last) against the shared prefix + per-stock suffix, over
+    /api/generate and /api/chat, with and without keep_alive. Time to
+    first token is what the agent measured, in model time.
+    """
+
+    stock_to_sector = dict(list(STOCK_TO_SECTOR.items())[:n_stocks])
+
+    print(f"Shared prompt prefix — {n_stocks} stocks, fake model at {prompt_rate:.0f} prompt tok/s, "
+          f"{eval_rate:.0f} output tok/s (run {time_scale:g}x faster, reported in model time)")
+
+    rss, rss_url = fixture_server.serve()
+    try:
+        for label, use_chat, keep_alive, run in (
+            ("original prompt, generate", False, "30m",
+             lambda a: [a.call_llm(_legacy_prompt(a, s, sec)) for s, sec in stock_to_sector.items()]),
+            ("prefix, generate", False, "30m",
+             lambda a: [a.get_latest_news(s, sec) for s, sec in stock_to_sector.items()]),
+            ("prefix, chat", True, "30m",
+             lambda a: [a.get_latest_news(s, sec) for s, sec in stock_to_sector.items()]),
+            ("prefix, chat, keep_alive 0", True, 0,
+             lambda a: [a.get_latest_news(s, sec) for s, sec in stock_to_sector.items()]),
+            ("prefix, chat, batch 8", True, "30m",
+             lambda a: a.get_latest_news_batch(stock_to_sector, 8)),
+        ):
+            llm, llm_url = fake_ollama.serve(prompt_rate, eval_rate, time_scale=time_scale)
+            try:
+                agent = NewsAgent(fixture_service(rss_url), llm_url=llm_url)
+                agent.use_chat, agent.keep_alive = use_chat, keep_alive
+                agent.prefetch_news(stock_to_sector)
+
+                _, elapsed = _timed(run, agent)
+                summary = agent.timing_summary()
+                stats = llm.stats
+                print(f"  {label:<27}: {n_stocks / (elapsed * time_scale) * 60:6.1f} stocks/min  "
+                      f"TTFT p50 {summary['ttft_p50'] * time_scale:5.2f}s p95 {summary['ttft_p95'] * time_scale:5.2f}s  "
+                      f"prompt tokens evaluated {stats['evaluated_tokens']:6d}/{stats['prompt_tokens']:6d}  "
+                      f"loads={stats['loads']}")
+            finally:
+                llm.shutdown()
+    finally:
+        rss.shutdown()
+
+
+BENCHMARKS = {
+    "fetch": bench_fetch,
+    "cache": bench_cache,
+    "http-cache": bench_http_cache,
+    "sentiment": bench_sentiment,
+    "prefix": bench_prefix,
+}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="News sentiment benchmarks against local fixtures")
+    parser.add_argument("name", nargs="?", choices=sorted(BENCHMARKS), default="fetch")
+    parser.add_argument("--stocks", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--rate", type=float, default=50, help="server-side limit, req/s")
+    parser.add_argument("--prompt-rate", type=float, default=500.0, help="fake model prompt tokens/s")
+    parser.add_argument("--eval-rate", type=float, default=50.0, help="fake model output tokens/s")
+    args = parser.parse_args()
+
+    if args.name == "fetch":
+        bench_fetch(args.stocks, args.latency_ms / 1000, args.rate)
+    elif args.name == "cache":
+        bench_cache(args.stocks, args.latency_ms / 1000)
+    elif args.name == "http-cache":
+        bench_http_cache(args.stocks, args.latency_ms / 1000)
+    elif args.name == "sentiment":
+        bench_sentiment(args.stocks, prompt_rate=args.prompt_rate, eval_rate=args.eval_rate)
+    elif args.name == "prefix":
+        bench_prefix(args.stocks, prompt_rate=args.prompt_rate, eval_rate=args.eval_rate)
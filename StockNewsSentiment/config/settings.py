@@ -1,3 +1,5 @@
+import os
+
 STOCK_TO_SECTOR = {
     "360ONE": "Financial Services",
     "3MINDIA": "Diversified",
@@ -751,3 +753,26 @@ STOCK_TO_SECTOR = {
 }
 
 NUM_STOCKS_TO_COVER = 1
+
+# async RSS fan-out (services/async_news_fetcher.py)
+NEWS_MAX_CONCURRENCY = 32
+NEWS_PER_HOST_RATE = 10.0
+NEWS_PER_HOST_CONCURRENCY = 8
+
+# how long a fetched feed is reused within a run (services/query_cache.py)
+NEWS_CACHE_TTL_SECONDS = 15 * 60
+
+# on-disk RSS cache revalidated with ETag / Last-Modified (services/feed_cache.py)
+NEWS_HTTP_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "news_http_cache.sqlite")
+NEWS_HTTP_CACHE_MAX_MB = 64
+
+# local Ollama server used by NewsAgent.call_llm
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://127.0.0.1:11434")
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "llama3")
+# keep the model, and the cached prompt prefix, loaded between stocks
+OLLAMA_KEEP_ALIVE = "30m"
+# /api/chat with the shared prefix as the system message; False = /api/generate
+LLM_USE_CHAT = True
+
+# stocks per LLM call in NewsAgent.get_latest_news_batch; 1 = one call per stock
+SENTIMENT_BATCH_SIZE = 8
@@ -0,0 +1,218 @@
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for Ollama's /api/generate and /api/chat, so LLM
+# throughput can be benchmarked without a model. It answers with
+# sentiment JSON for every stock whose "STOCK NEWS (<symbol>" section is
+# in the prompt: one object for a single stock, an object keyed by symbol
+# for several.
+#
+# Time is modelled like one Ollama slot: requests run one at a time; a
+# cold model costs `load_time`; prompt tokens are evaluated at
+# `prompt_rate` except the prefix shared with the previous prompt, which
+# is still in the KV cache; output tokens come at `eval_rate` (tokens ~
+# chars / 4). The model stays loaded for keep_alive (default 5m).
+# `time_scale` divides every sleep so benchmarks finish quickly; the
+# durations reported back are in model time.
+
+STOCK_SECTION = re.compile(r"STOCK NEWS \(([^,)]+)")
+DEFAULT_KEEP_ALIVE = 300.0
+STREAM_CHUNKS = 8
+
+
+def tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def keep_alive_seconds(value) -> float:
+    # 300, "300", "5m", "1h", -1 (forever)
+    if value is None:
+        return DEFAULT_KEEP_ALIVE
+    if isinstance(value, (int, float)):
+        return float("inf") if value < 0 else float(value)
+
+    match = re.fullmatch(r"(-?\d+(?:\.\d+)?)([smh]?)", str(value).strip())
+    if not match:
+        return DEFAULT_KEEP_ALIVE
+    number = float(match.group(1))
+    return float("inf") if number < 0 else number * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+def sentiment(stock: str) -> dict:
+    mood = ("Positive", "Negative", "Neutral")[sum(map(ord, stock)) % 3]
+    return {
+        "stock_sentiment": mood,
+        "sector_sentiment": "Positive",
+        "market_sentiment": "Neutral",
+        "Trading Sentiment": "Positive" if mood == "Positive" else "Negative",
+        "Reason": f"{stock} news flow is {mood.lower()} while the sector is steady and the broader "
+                  f"market is mixed on global cues, so the overall view for {stock} follows its own news.",
+        "top_stock_news": f"{stock} posts quarterly results ahead of street estimates",
+        "top_sector_news": "Sector sees steady order inflows this quarter",
+        "top_market_news": "Nifty ends flat as global markets stay cautious"
+    }
+
+
+class Slot:
+    """
+    The one loaded model: what is in its KV cache and until when it
+    stays loaded.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cached = ""
+        self.loaded_until = 0.0
+
+
+class OllamaHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "FakeOllama/0.2"
+
+    overhead = 0.05
+    load_time = 2.0
+    prompt_rate = 500.0
+    eval_rate = 50.0
+    time_scale = 1.0
+    slot = None
+    stats = None
+
+    def do_POST(self):
+
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+        if self.path == "/api/generate":
+            prompt = f"<|user|>{request.get('prompt', '')}<|assistant|>"
+        elif self.path == "/api/chat":
+            prompt = "".join(f"<|{m['role']}|>{m['content']}" for m in request.get("messages", [])) + "<|assistant|>"
+        else:
+            self.send_error(404)
+            return
+
+        stocks = list(dict.fromkeys(STOCK_SECTION.findall(prompt)))
+        answer = sentiment(stocks[0]) if len(stocks) == 1 else {s: sentiment(s) for s in stocks}
+        text = json.dumps(answer, indent=2)
+
+        stream = request.get("stream", True)
+        if stream:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+        with self.slot.lock:
+            now = time.monotonic()
+            loading = now >= self.slot.loaded_until
+            if loading:
+                self.slot.cached = ""
+
+            cached_tokens = len(os.path.commonprefix([self.slot.cached, prompt])) // 4
+            prompt_tokens = tokens(prompt)
+            evaluated = max(1, prompt_tokens - cached_tokens)
+
+            load_seconds = self.load_time if loading else 0.0
+            prompt_seconds = evaluated / self.prompt_rate
+            self._sleep(load_seconds + self.overhead + prompt_seconds)
+
+            # the first token on its own, so time to first token is honest
+            rest = text[4:]
+            pieces = [text[:4]] + [
+                rest[len(rest) * i // STREAM_CHUNKS:len(rest) * (i + 1) // STREAM_CHUNKS]
+                for i in range(STREAM_CHUNKS)
+            ]
+            for piece in pieces:
+                self._sleep(tokens(piece) / self.eval_rate)
+                if stream and piece:
+                    self._send_chunk(self._chunk(piece, done=False))
+
+            self.slot.cached = prompt
+            self.slot.loaded_until = time.monotonic() + keep_alive_seconds(request.get("keep_alive")) / self.time_scale
+
+        eval_tokens = tokens(text)
+        eval_seconds = eval_tokens / self.eval_rate
+
+        with self.stats["lock"]:
+            self.stats["requests"] += 1
+            self.stats["loads"] += loading
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["evaluated_tokens"] += evaluated
+            self.stats["eval_tokens"] += eval_tokens
+
+        final = {
+            **self._chunk("" if stream else text, done=True),
+            "total_duration": int((load_seconds + self.overhead + prompt_seconds + eval_seconds) * 1e9),
+            "load_duration": int(load_seconds * 1e9),
+            "prompt_eval_count": evaluated,
+            "prompt_eval_duration": int(prompt_seconds * 1e9),
+            "eval_count": eval_tokens,
+            "eval_duration": int(eval_seconds * 1e9)
+        }
+
+        if stream:
+            self._send_chunk(final)
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            body = json.dumps(final).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def _sleep(self, seconds: float):
+        time.sleep(seconds / self.time_scale)
+
+    def _chunk(self, piece: str, done: bool) -> dict:
+        if self.path == "/api/chat":
+            return {"model": "fake", "message": {"role": "assistant", "content": piece}, "done": done}
+        return {"model": "fake", "response": piece, "done": done}
+
+    def _send_chunk(self, payload: dict):
+        line = json.dumps(payload).encode() + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(prompt_rate: float = 500.0, eval_rate: float = 50.0, overhead: float = 0.05,
+          load_time: float = 2.0, time_scale: float = 1.0, port: int = 0):
+    """
+    Start the fake server on a background thread. Returns the server
+    (call .shutdown() when done, read .stats for token counts) and its
+    base URL for NewsAgent(llm_url=...).
+    """
+    stats = {
+        "requests": 0, "loads": 0, "prompt_tokens": 0, "evaluated_tokens": 0, "eval_tokens": 0,
+        "lock": threading.Lock()
+    }
+    handler = type("Handler", (OllamaHandler,), {
+        "prompt_rate": prompt_rate,
+        "eval_rate": eval_rate,
+        "overhead": overhead,
+        "load_time": load_time,
+        "time_scale": time_scale,
+        "slot": Slot(),
+        "stats": stats
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    server, url = serve()
+    print(f"Fake Ollama on {url}/api/generate and /api/chat")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
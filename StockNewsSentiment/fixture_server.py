@@ -0,0 +1,177 @@
+import hashlib
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+# Local stand-in for Google News RSS search, so the fetchers can be
+# benchmarked without hitting the network. Every query gets a stable
+# feed of ITEMS_PER_FEED items with an ETag and Last-Modified, and
+# conditional requests for an unchanged feed get a 304. `server.bump(q)`
+# publishes a new version of q's feed. `latency` delays each response,
+# and `rate_limit` answers 429 with Retry-After above that many requests
+# per second. `server.stats` counts requests, 304s, 429s, body bytes and
+# peak in-flight.
+
+ITEMS_PER_FEED = 40
+SOURCES = ["Moneycontrol", "Economic Times", "Business Standard", "Mint", "Reuters", "CNBC TV18"]
+VERBS = ["rallies", "slips", "hits 52-week high", "posts Q3 results", "eyes expansion", "faces probe"]
+EPOCH = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=4096)
+def feed_xml(query: str, version: int = 0) -> bytes:
+    rng = random.Random(f"{query}|{version}")
+    items = []
+
+    for i in range(ITEMS_PER_FEED):
+        source = rng.choice(SOURCES)
+        published = EPOCH + timedelta(hours=version) - timedelta(minutes=rng.randint(0, 60 * 24 * 14))
+        title = f"{query.split(' ')[0]} {rng.choice(VERBS)} as markets {rng.choice(['rise', 'fall'])} ({i}) - {source}"
+        items.append(
+            f"<item><title>{escape(title)}</title>"
+            f"<link>https://news.google.com/rss/articles/{rng.getrandbits(64):x}?oc=5</link>"
+            f"<guid isPermaLink=\"false\">{rng.getrandbits(64):x}</guid>"
+            f"<pubDate>{format_datetime(published)}</pubDate>"
+            f"<description>{escape(title)}</description>"
+            f"<source url=\"https://example.com\">{source}</source></item>"
+        )
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>'
+        '<generator>NFE/5.0</generator>'
+        f'<title>"{escape(query)}" - Google News</title>'
+        '<link>https://news.google.com/search?hl=en-IN&amp;gl=IN&amp;ceid=IN:en</link>'
+        '<language>en-IN</language>'
+        f'{"".join(items)}</channel></rss>'
+    ).encode()
+
+
+class Stats:
+
+    def __init__(self, rate_limit):
+        self.rate_limit = rate_limit
+        self.window = 0
+        self.count = 0
+        self.in_flight = 0
+        self.counts = {"requests": 0, "not_modified": 0, "throttled": 0, "bytes": 0, "peak_in_flight": 0}
+        self.lock = threading.Lock()
+
+    def enter(self) -> bool:
+        with self.lock:
+            self.counts["requests"] += 1
+            self.in_flight += 1
+            self.counts["peak_in_flight"] = max(self.counts["peak_in_flight"], self.in_flight)
+
+            if not self.rate_limit:
+                return True
+
+            window = int(time.monotonic())
+            if window != self.window:
+                self.window, self.count = window, 0
+            self.count += 1
+
+            if self.count > self.rate_limit:
+                self.counts["throttled"] += 1
+                return False
+            return True
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+
+class RssHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    # headers and body go out as separate writes; with keep-alive, Nagle
+    # plus delayed ACK would add ~40 ms to every response
+    disable_nagle_algorithm = True
+    latency = 0.0
+    stats = None
+    versions = None
+
+    def do_GET(self):
+        allowed = self.stats.enter()
+        try:
+            self._respond(allowed)
+        finally:
+            self.stats.leave()
+
+    def _respond(self, allowed: bool):
+
+        if not allowed:
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query).get("q", [""])[0]
+        if url.path != "/rss/search" or not query:
+            self.send_error(404)
+            return
+
+        version = self.versions.get(query, 0)
+        body = feed_xml(query, version)
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        last_modified = format_datetime(EPOCH + timedelta(hours=version), usegmt=True)
+
+        if self.headers.get("If-None-Match") == etag:
+            with self.stats.lock:
+                self.stats.counts["not_modified"] += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        with self.stats.lock:
+            self.stats.counts["bytes"] += len(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(latency: float = 0.0, port: int = 0, rate_limit=None):
+    """
+    Start the fixture server on a background thread. Returns the server
+    (call .shutdown() when done, read .stats for counters) and the
+    NewsService.BASE_URL template that points at it.
+    """
+    stats = Stats(rate_limit)
+    versions = {}
+    handler = type("Handler", (RssHandler,), {"latency": latency, "stats": stats, "versions": versions})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.stats = stats.counts
+    server.bump = lambda query: versions.__setitem__(query, versions.get(query, 0) + 1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/rss/search?q={{query}}&hl=en-IN&gl=IN&ceid=IN:en"
+    return server, base_url
+
+
+if __name__ == "__main__":
+    server, url = serve()
+    print(f"RSS fixtures on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,12 +1,27 @@
 from StockNewsSentiment.agents.news_agent import NewsAgent
-from StockNewsSentiment.config.settings import STOCK_TO_SECTOR, NUM_STOCKS_TO_COVER
+from StockNewsSentiment.config.settings import STOCK_TO_SECTOR, NUM_STOCKS_TO_COVER, SENTIMENT_BATCH_SIZE
+import json
 
 if __name__ == "__main__":
     news_agent = NewsAgent()
     stocks_to_cover = list(STOCK_TO_SECTOR.keys())[:NUM_STOCKS_TO_COVER]
 
-    for stock in stocks_to_cover:
-        sector = STOCK_TO_SECTOR[stock]
-        result = news_agent.get_latest_news(stock, sector)
-        print(f"Stock: {stock}, Sector: {sector}")
-        print(result)
+    # all RSS queries at once, then the LLM
+    stock_to_sector = {stock: STOCK_TO_SECTOR[stock] for stock in stocks_to_cover}
+    news_agent.prefetch_news(stock_to_sector)
+
+    if SENTIMENT_BATCH_SIZE > 1 and len(stocks_to_cover) > 1:
+        results = news_agent.get_latest_news_batch(stock_to_sector)
+
+        for stock, result in results.items():
+            print(f"Stock: {stock}, Sector: {stock_to_sector[stock]}")
+            print(json.dumps(result, indent=2))
+
+    else:
+        for stock in stocks_to_cover:
+            sector = STOCK_TO_SECTOR[stock]
+            result = news_agent.get_latest_news(stock, sector)
+            print(f"Stock: {stock}, Sector: {sector}")
+            print(result)
+
+    print(f"LLM timing: {news_agent.timing_summary()}")
@@ -0,0 +1,146 @@
+import asyncio
+import random
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from .news_service import NewsService
+
+
+class HostLimiter:
+    """
+    At most `max_in_flight` requests and `rate` request starts per second
+    for one host. A 429/503 pauses the whole host, not just one request.
+    """
+
+    def __init__(self, rate: float, max_in_flight: int):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.lock = asyncio.Lock()
+        self.next_start = 0.0
+
+    async def wait_turn(self):
+        async with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def pause(self, seconds: float):
+        self.next_start = max(self.next_start, time.monotonic() + seconds)
+
+
+class AsyncNewsFetcher:
+    """
+    Fans out many RSS queries at once over one aiohttp session. Results
+    are shaped exactly like NewsService.fetch and go through the same
+    query cache, so either path reuses what the other downloaded.
+    """
+
+    RETRY_STATUS = (429, 503)
+
+    def __init__(
+            self,
+            news_service: Optional[NewsService] = None,
+            max_concurrency: int = 32,
+            per_host_rate: float = 10.0,
+            per_host_concurrency: int = 8,
+            timeout: int = 15,
+            max_retries: int = 3
+    ):
+        self.news_service = news_service or NewsService()
+        self.max_concurrency = max_concurrency
+        self.per_host_rate = per_host_rate
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        self.stats = {"requests": 0, "throttled": 0, "failed": 0}
+
+    def fetch_all(self, queries: Iterable[str], max_results: int = 5) -> Dict[str, List[Dict]]:
+        """
+        {query: news items} for every query; a query that cannot be
+        fetched maps to [] like an empty feed.
+        """
+        return asyncio.run(self.fetch_many(queries, max_results))
+
+    async def fetch_many(self, queries: Iterable[str], max_results: int = 5) -> Dict[str, List[Dict]]:
+
+        queries = list(dict.fromkeys(queries))
+        limit = asyncio.Semaphore(self.max_concurrency)
+        hosts: Dict[str, HostLimiter] = {}
+
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers=dict(self.news_service.session.headers)
+        ) as session:
+
+            async def one(query: str):
+                url = self.news_service.build_url(query)
+                host = urlparse(url).netloc
+                if host not in hosts:
+                    hosts[host] = HostLimiter(self.per_host_rate, self.per_host_concurrency)
+
+                async def download():
+                    cached, headers = self.news_service.conditional_headers(url)
+                    async with limit:
+                        resp = await self._get(session, hosts[host], url, headers)
+                    if resp is None:
+                        return None
+                    return self.news_service.items_from_response(url, *resp, cached)
+
+                items = await self.news_service.cache.get_or_fetch_async(query, download)
+                return query, NewsService.finalize(items or [], max_results)
+
+            results = await asyncio.gather(*(one(q) for q in queries))
+
+        return dict(results)
+
+    async def _get(self, session: aiohttp.ClientSession, host: HostLimiter, url: str, headers: Dict):
+        """
+        (status, headers, body) of the final response, or None when the
+        request kept failing.
+        """
+
+        for attempt in range(self.max_retries + 1):
+            await host.wait_turn()
+
+            try:
+                async with host.slots:
+                    async with session.get(url, headers=headers) as resp:
+                        self.stats["requests"] += 1
+
+                        if resp.status in self.RETRY_STATUS and attempt < self.max_retries:
+                            self.stats["throttled"] += 1
+                            host.pause(self._retry_after(resp.headers.get("Retry-After"), attempt))
+                            continue
+
+                        return resp.status, resp.headers, await resp.read()
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self._retry_after(None, attempt))
+                    continue
+                print(f"Error fetching {url}: {e}")
+
+        self.stats["failed"] += 1
+        return None
+
+    @staticmethod
+    def _retry_after(header: Optional[str], attempt: int) -> float:
+
+        if header:
+            try:
+                return float(header)
+            except ValueError:
+                pass
+
+        return random.uniform(0, min(30.0, 2 ** attempt))
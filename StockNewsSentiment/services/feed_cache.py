@@ -0,0 +1,115 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+
+class CachedFeed(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    items: List[Dict]
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    items         TEXT NOT NULL,
+    size          INTEGER NOT NULL,
+    last_used     REAL NOT NULL
+)
+"""
+
+
+class FeedCache:
+    """
+    On-disk HTTP cache for RSS feeds: the validators a feed was served
+    with plus its parsed items, so a 304 costs neither a download nor a
+    parse. Least recently used feeds are evicted once the stored items
+    exceed max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # one small commit per feed: WAL without fsync-per-commit keeps
+        # that off the critical path
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+        self.lock = threading.Lock()
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _dump(items: List[Dict]) -> str:
+        return json.dumps([
+            {**item, "_published_dt": item["_published_dt"].isoformat() if item["_published_dt"] else None}
+            for item in items
+        ])
+
+    @staticmethod
+    def _load(text: str) -> List[Dict]:
+        items = json.loads(text)
+        for item in items:
+            if item["_published_dt"]:
+                item["_published_dt"] = datetime.fromisoformat(item["_published_dt"])
+        return items
+
+    def get(self, url: str) -> Optional[CachedFeed]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, items FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        etag, last_modified, items = row
+        return CachedFeed(etag, last_modified, self._load(items))
+
+    def touch(self, url: str):
+        with self.lock:
+            self.conn.execute("UPDATE feeds SET last_used = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str], items: List[Dict]):
+
+        # nothing to revalidate against
+        if not etag and not last_modified:
+            return
+
+        text = self._dump(items)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, text, len(text), time.time())
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        total, = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM feeds").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        rows = self.conn.execute("SELECT url, size FROM feeds ORDER BY last_used").fetchall()
+        evicted = []
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((url,))
+            total -= size
+
+        self.conn.executemany("DELETE FROM feeds WHERE url = ?", evicted)
+
+    def size(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM feeds").fetchone()[0]
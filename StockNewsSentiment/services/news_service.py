@@ -2,22 +2,39 @@ import time
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional
-from urllib.parse import urlparse
+from urllib.parse import quote_plus, urlparse
 
 import feedparser
 import requests
 from bs4 import BeautifulSoup
 from readability import Document
 
+from .feed_cache import CachedFeed, FeedCache
+from .query_cache import QueryCache
+
 
 class NewsService:
     BASE_URL = "https://news.google.com/rss/search?q={query}&hl=en-IN&gl=IN&ceid=IN:en"
 
-    def __init__(self, timeout: int = 15, sleep_seconds: float = 1.2, max_content_chars: int = 12000):
+    def __init__(
+            self,
+            timeout: int = 15,
+            sleep_seconds: float = 1.2,
+            max_content_chars: int = 12000,
+            cache_ttl: float = 900,
+            http_cache_path: Optional[str] = None,
+            http_cache_max_bytes: int = 64 * 1024 * 1024
+    ):
         self.timeout = timeout
         self.sleep_seconds = sleep_seconds
         self.max_content_chars = max_content_chars
 
+        # sorted feed items per normalized query, shared with AsyncNewsFetcher
+        self.cache = QueryCache(ttl_seconds=cache_ttl)
+
+        # validators + parsed items per feed URL, kept across runs
+        self.feed_cache = FeedCache(http_cache_path, http_cache_max_bytes) if http_cache_path else None
+
         self.session = requests.Session()
         self.session.headers.update({
             "User-Agent": (
@@ -29,9 +46,19 @@ class NewsService:
 
     def fetch(self, query: str, max_results: int = 5) -> List[Dict]:
         """
-        Fetch latest news for query.
+        Fetch latest news for query. Repeats within the cache TTL, and
+        concurrent calls for the same query, share one download.
+        """
+        items = self.cache.get_or_fetch(query, lambda: self._fetch_rss_sorted(query))
+        return self.finalize(items or [], max_results)
+
+    @staticmethod
+    def finalize(items: List[Dict], max_results: int = 5) -> List[Dict]:
+        """
+        Trim sorted feed items to max_results and drop internal fields.
+        Works on copies, so cached items stay intact.
         """
-        items = self._fetch_rss_sorted(query)[:max_results]
+        items = [dict(item) for item in items[:max_results]]
 
         # remove internal fields before returning
         for item in items:
@@ -41,13 +68,70 @@ class NewsService:
 
         return items
 
-    def _fetch_rss_sorted(self, query: str) -> List[Dict]:
+    def build_url(self, query: str) -> str:
+        return self.BASE_URL.format(query=quote_plus(query))
+
+    def _fetch_rss_sorted(self, query: str) -> Optional[List[Dict]]:
+
+        url = self.build_url(query)
+        cached, headers = self.conditional_headers(url)
+
+        try:
+            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+
+        return self.items_from_response(url, resp.status_code, resp.headers, resp.content, cached)
+
+    def conditional_headers(self, url: str):
+        """
+        The cached copy of url, if any, and the If-None-Match /
+        If-Modified-Since headers that revalidate it.
+        """
+        cached = self.feed_cache.get(url) if self.feed_cache else None
+        headers = {}
+
+        if cached:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        return cached, headers
+
+    def items_from_response(
+            self,
+            url: str,
+            status: int,
+            headers,
+            body: bytes,
+            cached: Optional[CachedFeed] = None
+    ) -> Optional[List[Dict]]:
+        """
+        Sorted items for a feed response: the cached ones on 304, freshly
+        parsed (and cached) ones on 200, None otherwise.
+        """
+        if status == 304 and cached:
+            self.feed_cache.touch(url)
+            return cached.items
+
+        if status != 200:
+            print(f"Error fetching {url}: HTTP {status}")
+            return None
+
+        items = self.items_from_feed(feedparser.parse(body))
 
-        query = query.replace(" ", "+")
-        url = self.BASE_URL.format(query=query)
+        if self.feed_cache:
+            self.feed_cache.store(url, headers.get("ETag"), headers.get("Last-Modified"), items)
 
-        feed = feedparser.parse(url)
+        return items
 
+    @classmethod
+    def items_from_feed(cls, feed) -> List[Dict]:
+        """
+        Deduplicated feed entries, newest first.
+        """
         items: List[Dict] = []
         seen_titles = set()
 
@@ -60,7 +144,7 @@ class NewsService:
             seen_titles.add(title)
 
             published_str = entry.get("published", "") or entry.get("updated", "")
-            published_dt = self._parse_rss_datetime(published_str)
+            published_dt = cls._parse_rss_datetime(published_str)
 
             source = entry.source.title if hasattr(entry, "source") else "Unknown"
             link = entry.get("link", "")
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+def normalize_query(query: str) -> str:
+    """
+    "  Banks sector  stock India" and "banks sector stock india" are the
+    same feed.
+    """
+    return " ".join(query.lower().split())
+
+
+class _Flight:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.ok = False
+
+
+class QueryCache:
+    """
+    In-memory TTL memo for news queries with single-flight: while one
+    caller fetches a query, every other caller asking for it (thread or
+    coroutine) waits for that result instead of fetching again.
+    A fetch that returns None is not cached.
+    """
+
+    def __init__(self, ttl_seconds: float = 900, max_entries: int = 4096):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self.entries: Dict[str, Tuple[float, Any]] = {}
+        self.in_flight: Dict[str, _Flight] = {}
+        self.in_flight_async: Dict[str, asyncio.Future] = {}
+        self.lock = threading.Lock()
+
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def _lookup(self, key: str):
+        entry = self.entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.stats["hits"] += 1
+            return True, entry[1]
+        return False, None
+
+    def _store(self, key: str, value):
+        if value is None:
+            return
+
+        if len(self.entries) >= self.max_entries:
+            now = time.monotonic()
+            self.entries = {k: e for k, e in self.entries.items() if e[0] > now}
+            while len(self.entries) >= self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def get_or_fetch(self, query: str, fetch: Callable[[], Any]):
+        key = normalize_query(query)
+
+        while True:
+            with self.lock:
+                found, value = self._lookup(key)
+                if found:
+                    return value
+
+                flight = self.in_flight.get(key)
+                if flight is None:
+                    flight = self.in_flight[key] = _Flight()
+                    self.stats["misses"] += 1
+                    break
+
+                self.stats["coalesced"] += 1
+
+            flight.done.wait()
+            if flight.ok:
+                return flight.value
+            # the leader failed; try ourselves
+
+        try:
+            value = fetch()
+            flight.value, flight.ok = value, value is not None
+            with self.lock:
+                self._store(key, value)
+            return value
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            flight.done.set()
+
+    async def get_or_fetch_async(self, query: str, fetch: Callable[[], Awaitable[Any]]):
+        key = normalize_query(query)
+        loop = asyncio.get_running_loop()
+
+        with self.lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+
+            waiting: Optional[asyncio.Future] = self.in_flight_async.get(key)
+            if waiting is not None and waiting.get_loop() is loop:
+                self.stats["coalesced"] += 1
+            else:
+                waiting = None
+                leader = self.in_flight_async[key] = loop.create_future()
+                self.stats["misses"] += 1
+
+        if waiting is not None:
+            return await asyncio.shield(waiting)
+
+        try:
+            value = await fetch()
+            with self.lock:
+                self._store(key, value)
+            leader.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            leader.cancel()
+            raise
+        except Exception as e:
+            leader.set_exception(e)
+            leader.exception()     # retrieved, even if nobody was waiting
+            raise
+        finally:
+            with self.lock:
+                if self.in_flight_async.get(key) is leader:
+                    del self.in_flight_async[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,220 @@
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Stocks_filtered import screener_core as core
+from Stocks_filtered.fundamentals_cache import FundamentalsCache
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+# Run from the repo root:
+#   python -m Stocks_filtered.backtest
+START_DATE = "2025-02-10"
+END_DATE = "2026-02-09"
+HORIZONS = [1, 4, 12]          # forward return horizons, in weeks
+DATE_WINDOWS = 4               # date slices fetched in parallel
+OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "support_resistance_backtest.xlsx")
+
+PANEL_COLUMNS = ["Date", "Ticker", "Status", "Support", "Resistance", "Close"]
+
+
+# ==========================================================
+# DATA PULL
+# ==========================================================
+
+def split_date_range(start, end, windows):
+    """
+    Cut [start, end] into `windows` contiguous, non-overlapping slices.
+    """
+    days = pd.date_range(start, end, freq="D")
+    parts = np.array_split(days, max(1, min(windows, len(days))))
+    return [
+        (p[0].strftime("%Y-%m-%d"), p[-1].strftime("%Y-%m-%d"))
+        for p in parts if len(p)
+    ]
+
+
+def fetch_scan_window(start, end):
+    """
+    Matched/missed rows for every weekly date in [start, end], from one
+    paginated query over the VCP universe.
+    """
+
+    query = {
+        "_source": ["ticker", "date", "crossed_resistance", "close"],
+        "query": {
+            "bool": {
+                "must": [
+                    {"term": {"vcp_trend_template": True}},
+                    {"range": {"date": {"gte": start, "lte": end}}}
+                ]
+            }
+        }
+    }
+
+    rows = []
+
+    for src in core.iter_hits(query):
+        date = str(src.get("date"))[:10]
+        ticker = src["ticker"].replace(".NS", "")
+        close = src.get("close")
+        status = "matched" if core.is_support_matched(src) else "missed"
+
+        for cr in src.get("crossed_resistance", []):
+            rows.append((
+                date,
+                ticker,
+                status,
+                cr.get("support_level"),
+                cr.get("resistance_level"),
+                close
+            ))
+
+    return pd.DataFrame(rows, columns=PANEL_COLUMNS)
+
+
+def fetch_closes_window(start, end):
+
+    query = {
+        "_source": ["ticker", "date", "close"],
+        "query": {"range": {"date": {"gte": start, "lte": end}}}
+    }
+
+    rows = [
+        (str(src.get("date"))[:10], src["ticker"].replace(".NS", ""), src.get("close"))
+        for src in core.iter_hits(query)
+    ]
+
+    return pd.DataFrame(rows, columns=["Date", "Ticker", "Close"])
+
+
+def fetch_parallel(fn, start, end, windows=DATE_WINDOWS):
+    ranges = split_date_range(start, end, windows)
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+        frames = list(pool.map(lambda r: fn(*r), ranges))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+# ==========================================================
+# PANEL
+# ==========================================================
+
+def build_panel(scan):
+    """
+    Apply the single-date matched/missed rule per date: a ticker that is
+    matched on a date never also appears as missed on that date.
+    """
+
+    is_matched = scan["Status"].eq("matched")
+    matched_on_date = is_matched.groupby([scan["Date"], scan["Ticker"]]).transform("any")
+    drop = ~is_matched & matched_on_date
+
+    return scan[~drop].sort_values(["Date", "Status", "Ticker"]).reset_index(drop=True)
+
+
+def forward_returns(closes, horizons=HORIZONS):
+    """
+    Long frame of Date, Ticker and Fwd_Ret_<h>W_% from the weekly closes.
+    """
+
+    wide = (
+        closes
+        .drop_duplicates(["Date", "Ticker"], keep="last")
+        .pivot(index="Date", columns="Ticker", values="Close")
+        .sort_index()
+    )
+
+    out = pd.DataFrame(index=wide.stack(future_stack=True).index)
+    for h in horizons:
+        ret = (wide.shift(-h) / wide - 1) * 100
+        out[f"Fwd_Ret_{h}W_%"] = ret.stack(future_stack=True).round(2)
+
+    return out.reset_index()
+
+
+def summarize(panel, horizons=HORIZONS):
+    per_ticker = panel.drop_duplicates(["Date", "Ticker", "Status"])
+    ret_cols = [f"Fwd_Ret_{h}W_%" for h in horizons]
+
+    counts = (
+        per_ticker.groupby(["Date", "Status"])["Ticker"]
+        .count()
+        .unstack(fill_value=0)
+        .add_suffix("_count")
+    )
+    means = (
+        per_ticker.groupby(["Date", "Status"])[ret_cols]
+        .mean()
+        .round(2)
+        .unstack()
+    )
+    means.columns = [f"{status}_{col}" for col, status in means.columns]
+
+    return counts.join(means).reset_index()
+
+
+def run_backtest(start=START_DATE, end=END_DATE, horizons=HORIZONS,
+                 windows=DATE_WINDOWS, cache=None, profile=core.ROCE_PROFILE):
+    """
+    Per-date matched/missed panel with Net_Score and forward returns.
+
+    Fundamentals are fetched once for every ticker in the range and reused
+    for all dates, so Net_Score reflects the latest fundamentals rather
+    than the ones available on each historical date.
+    """
+
+    scan = fetch_parallel(fetch_scan_window, start, end, windows)
+    panel = build_panel(scan)
+
+    # closes run past `end` so the last dates still get forward returns
+    closes_end = (pd.Timestamp(end) + pd.Timedelta(weeks=max(horizons) + 1)).strftime("%Y-%m-%d")
+    closes = fetch_parallel(fetch_closes_window, start, closes_end, windows)
+
+    fundamentals = core.get_fundamental_data_bulk(panel["Ticker"].unique(), profile, cache=cache)
+    panel = core.enrich_dataframe(panel, fundamentals, profile)
+
+    panel = panel.merge(forward_returns(closes, horizons), on=["Date", "Ticker"], how="left")
+    panel = panel.sort_values(["Date", "Status", "Net_Score"], ascending=[True, True, False])
+
+    return panel.reset_index(drop=True), summarize(panel, horizons)
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Support/resistance scan over a range of weekly dates")
+    parser.add_argument("--start", default=START_DATE)
+    parser.add_argument("--end", default=END_DATE)
+    parser.add_argument("--horizons", type=int, nargs="+", default=HORIZONS)
+    parser.add_argument("--windows", type=int, default=DATE_WINDOWS)
+    parser.add_argument("--profile", choices=sorted(core.PROFILES), default="roce")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    core.add_es_arguments(parser)
+    args = parser.parse_args()
+    if pd.Timestamp(args.start) > pd.Timestamp(args.end):
+        parser.error(f"--start {args.start} is after --end {args.end}")
+    core.configure_from_args(args)
+
+    print(f"🔎 Backtesting {args.start} → {args.end}...")
+    with FundamentalsCache(core.FUND_CACHE_FILE, ttl=core.FUND_CACHE_TTL,
+                           fields=core.FUND_SOURCE_FIELDS) as cache:
+        panel, summary = run_backtest(
+            args.start, args.end, args.horizons, args.windows, cache, core.PROFILES[args.profile]
+        )
+
+    print("💾 Saving Excel...")
+    with pd.ExcelWriter(args.output, engine="openpyxl") as writer:
+        summary.to_excel(writer, sheet_name="summary", index=False)
+        panel.to_excel(writer, sheet_name="panel", index=False)
+
+    print("✅ Done!")
+    print(f"Dates: {panel['Date'].nunique()}, rows: {len(panel)}")
@@ -0,0 +1,622 @@
+import argparse
+import math
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from Stocks_filtered import fake_es
+from Stocks_filtered import feature_materializer
+from Stocks_filtered import screener_core as core
+from Stocks_filtered import support_watcher
+from Stocks_filtered.fundamentals_cache import FundamentalsCache
+from Stocks_filtered.report_writers import REPORT_WRITERS, sector_chart, write_report
+from Stocks_filtered.resistance_support_fundamental_roce import df_indices, df_mf
+
+# ==========================================================
+# BENCHMARKS AGAINST THE LOCAL ES STAND-IN
+# ==========================================================
+# Run from the repo root:
+#   python -m Stocks_filtered.benchmarks fundamentals --tickers 500
+#   python -m Stocks_filtered.benchmarks scan --tickers 2500
+#   python -m Stocks_filtered.benchmarks scoring --rows 100000
+#   python -m Stocks_filtered.benchmarks features --tickers 5000
+#   python -m Stocks_filtered.benchmarks enrichment --tickers 1500
+#   python -m Stocks_filtered.benchmarks payload --tickers 1500
+#   python -m Stocks_filtered.benchmarks materialized --tickers 1500
+#   python -m Stocks_filtered.benchmarks cache --tickers 1500
+#   python -m Stocks_filtered.benchmarks report --rows 60000
+#   python -m Stocks_filtered.benchmarks flatten --rows 50000
+#   python -m Stocks_filtered.benchmarks watch --tickers 2500
+#   python -m Stocks_filtered.benchmarks sectors --tickers 2500
+
+
+def _same_value(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+def _same_result(a, b):
+    return a.keys() == b.keys() and all(_same_value(a[k], b[k]) for k in a)
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def bench_fundamentals(n_tickers=300, latency=0.002, chunk_size=core.FUND_MGET_CHUNK):
+
+    es = fake_es.FakeElasticsearch(latency=latency)
+    tickers = fake_es.make_tickers(n_tickers)
+    fake_es.load_fundamentals(es, core.FUND_INDEX, tickers)
+
+    # a few tickers with no fundamentals doc at all
+    tickers += ["MISSING1", "MISSING2"]
+
+    core.set_es(es)
+
+    per_ticker, t_single = _timed(
+        lambda: {t: core.get_fundamental_data(t) for t in tickers}
+    )
+    single_calls = dict(es.calls)
+    es.calls.clear()
+
+    bulk, t_bulk = _timed(core.get_fundamental_data_bulk, tickers, chunk_size=chunk_size)
+    bulk_calls = dict(es.calls)
+
+    mismatched = [t for t in tickers if not _same_result(per_ticker[t], bulk[t])]
+
+    print(f"Fundamentals fetch — {len(tickers)} tickers, {latency * 1000:.1f} ms/round trip")
+    print(f"  per-ticker get : {t_single:8.3f}s  calls={single_calls}")
+    print(f"  chunked mget   : {t_bulk:8.3f}s  calls={bulk_calls}")
+    print(f"  speedup        : {t_single / t_bulk:8.1f}x")
+    print(f"  mismatches     : {len(mismatched)}")
+
+    return t_single, t_bulk, mismatched
+
+
+def bench_features(n_tickers=5000):
+
+    docs = {t: fake_es.make_fundamental_doc(t) for t in fake_es.make_tickers(n_tickers)}
+
+    per_ticker, t_single = _timed(
+        lambda: {t: core.parse_fundamental_source(src) for t, src in docs.items()}
+    )
+    batch, t_batch = _timed(core.build_fundamental_features, docs)
+
+    mismatched = [t for t in docs if not _same_result(per_ticker[t], batch[t])]
+
+    # a new listing with no quarterly rows yet, alone and among full docs
+    empty = {"NEWLISTING": {**fake_es.make_fundamental_doc("NEWLISTING"), "quarterly": []}}
+    for subset in (empty, {**empty, **dict(list(docs.items())[:5])}):
+        subset_batch = core.build_fundamental_features(subset)
+        mismatched += [
+            t for t, src in subset.items()
+            if not _same_result(core.parse_fundamental_source(src), subset_batch[t])
+        ]
+
+    print(f"Quarterly features — {n_tickers} docs")
+    print(f"  per-ticker parse + polyfit : {t_single:8.3f}s")
+    print(f"  batch array                : {t_batch:8.3f}s  ({t_single / t_batch:.1f}x)")
+    print(f"  mismatches                 : {len(mismatched)}")
+
+    return t_single, t_batch, mismatched
+
+
+def bench_enrichment(n_tickers=1500, latency=0.002, doc_latency=0.0002):
+
+    es = fake_es.FakeElasticsearch(latency=latency, doc_latency=doc_latency)
+    tickers = fake_es.make_tickers(n_tickers)
+    fake_es.load_fundamentals(es, core.FUND_INDEX, tickers)
+    core.set_es(es)
+
+    # matched and missed overlap by a third of the universe
+    third = n_tickers // 3
+    df_matched = pd.DataFrame({"Ticker": tickers[:2 * third]})
+    df_missed = pd.DataFrame({"Ticker": tickers[third:]})
+
+    print(f"Enrichment — {len(df_matched)} matched + {len(df_missed)} missed tickers, "
+          f"{latency * 1000:.1f} ms/round trip, {doc_latency * 1e6:.0f} us/doc")
+
+    es.docs_returned = 0
+    start = time.perf_counter()
+    for df in (df_matched, df_missed):
+        core.enrich_dataframe(
+            df, core.get_fundamental_data_bulk(df["Ticker"].unique(), max_workers=1)
+        )
+    print(f"  per-frame, serial   : {time.perf_counter() - start:8.3f}s  docs={es.docs_returned}")
+
+    for workers in (1, 2, 4, 8):
+        es.docs_returned = 0
+        (_, stats), elapsed = _timed(core.enrich_frames, df_matched, df_missed, max_workers=workers)
+        print(f"  deduped, {workers} workers : {elapsed:8.3f}s  docs={es.docs_returned}  "
+              f"fetch={stats}")
+
+
+def bench_materialized(n_tickers=1500, latency=0.002, byte_latency=2e-8, n_changed=25):
+
+    es = fake_es.FakeElasticsearch(latency=latency, byte_latency=byte_latency)
+    tickers = fake_es.make_tickers(n_tickers)
+    fake_es.load_fundamentals(es, core.FUND_INDEX, tickers)
+    core.set_es(es)
+
+    df = pd.DataFrame({"Ticker": tickers + ["MISSING1"]})
+
+    print(f"Materialized features — {n_tickers} tickers, {latency * 1000:.1f} ms/round trip, "
+          f"{byte_latency * 1e9:.0f} ns/byte")
+
+    stats, elapsed = _timed(feature_materializer.materialize)
+    print(f"  full materialize        : {elapsed * 1000:8.1f} ms  {stats}")
+
+    results = {}
+    for profile in core.PROFILES.values():
+        for mode in ("includes", "features"):
+            es.bytes_returned = 0
+            (enriched,), fetch = core.enrich_frames(df, profile=profile, mode=mode)
+            results[profile.name, mode] = enriched.sort_values("Ticker").reset_index(drop=True)
+            print(f"  enrich {profile.name:5s} {mode:9s}  : {fetch['total_ms']:8.1f} ms  "
+                  f"{es.bytes_returned / 1e6:6.2f} MB")
+
+        same = _same_frame(results[profile.name, "includes"], results[profile.name, "features"])
+        print(f"  {profile.name + ' identical':24s}: {same}")
+
+    for ticker in tickers[:n_changed]:
+        es.index(index=core.FUND_INDEX, id=ticker, document=fake_es.make_fundamental_doc(ticker, 13))
+
+    # before the materializer reruns, moved docs go through the fallback
+    (stale,), _ = core.enrich_frames(df, mode="features")
+    (fresh,), _ = core.enrich_frames(df, mode="includes")
+    same = _same_frame(stale.sort_values("Ticker").reset_index(drop=True),
+                       fresh.sort_values("Ticker").reset_index(drop=True))
+    print(f"  {f'{n_changed} moved, not rerun':24s}: identical={same}")
+
+    stats, elapsed = _timed(feature_materializer.materialize)
+    print(f"  after {n_changed} updates        : {elapsed * 1000:8.1f} ms  {stats}")
+
+    stats, elapsed = _timed(feature_materializer.materialize)
+    print(f"  nothing changed         : {elapsed * 1000:8.1f} ms  {stats}")
+
+
+def bench_payload(n_tickers=1500, latency=0.002, byte_latency=2e-8):
+
+    es = fake_es.FakeElasticsearch(latency=latency, byte_latency=byte_latency)
+    tickers = fake_es.make_tickers(n_tickers)
+    fake_es.load_fundamentals(es, core.FUND_INDEX, tickers)
+    core.set_es(es)
+
+    df = pd.DataFrame({"Ticker": tickers})
+
+    print(f"Fundamentals payload — {n_tickers} tickers, {latency * 1000:.1f} ms/round trip, "
+          f"{byte_latency * 1e9:.0f} ns/byte")
+
+    includes = core.FUND_SOURCE_FIELDS
+    results = {}
+
+    for name, mode, fields in (
+        ("full _source", "includes", None),
+        ("_source includes", "includes", includes),
+        ("script_fields", "script", includes),
+    ):
+        core.FUND_SOURCE_FIELDS = fields
+        es.bytes_returned = 0
+        try:
+            (enriched,), stats = core.enrich_frames(df, mode=mode, measure_payload=True)
+        finally:
+            core.FUND_SOURCE_FIELDS = includes
+
+        results[name] = enriched.sort_values("Ticker").reset_index(drop=True)
+        print(f"  {name:17s}: {es.bytes_returned / 1e6:7.2f} MB  {stats['total_ms']:8.1f} ms  "
+              f"p50={stats['p50']} ms  payload_kb={stats['payload_kb']}")
+
+    expected = results["full _source"]
+    for name, out in results.items():
+        print(f"  identical to full ({name}): {out.equals(expected)}")
+
+
+def bench_cache(n_tickers=1500, latency=0.002, doc_latency=0.0002, n_changed=25):
+
+    es = fake_es.FakeElasticsearch(latency=latency, doc_latency=doc_latency)
+    tickers = fake_es.make_tickers(n_tickers)
+    fake_es.load_fundamentals(es, core.FUND_INDEX, tickers)
+    core.set_es(es)
+
+    print(f"Fundamentals cache — {n_tickers} tickers, {latency * 1000:.1f} ms/round trip, "
+          f"{doc_latency * 1e6:.0f} us/doc")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FundamentalsCache(os.path.join(tmp, "cache.sqlite"), fields=core.FUND_SOURCE_FIELDS)
+
+        def run(label):
+            es.calls.clear()
+            es.docs_returned = 0
+            result, elapsed = _timed(core.get_fundamental_data_bulk, tickers, cache=cache)
+            print(f"  {label:28s}: {elapsed:8.3f}s  docs={es.docs_returned:5d}  calls={es.calls}")
+            return result
+
+        run("cold")
+        run("warm, inside TTL")
+
+        # fundamentals update for a handful of tickers, then the TTL lapses
+        for ticker in tickers[:n_changed]:
+            es.index(core.FUND_INDEX, ticker, fake_es.make_fundamental_doc(ticker, 13))
+        cache.ttl = 0
+        cached = run(f"TTL expired, {n_changed} changed")
+
+        fresh = core.get_fundamental_data_bulk(tickers)
+        mismatched = [t for t in tickers if not _same_result(cached[t], fresh[t])]
+        print(f"  mismatches vs uncached      : {len(mismatched)}")
+
+        cache.close()
+
+
+def make_report(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def scan_frame(n):
+        df = make_score_frame(n, seed=int(rng.integers(1 << 31)))
+        df.insert(0, "Ticker", rng.choice(fake_es.make_tickers(2000), n))
+        df.insert(1, "Support", rng.uniform(50, 5000, n).round(2))
+        df.insert(2, "Resistance", rng.uniform(50, 5000, n).round(2))
+        df.insert(3, "Close", rng.uniform(50, 5000, n).round(2))
+        df["Sector"] = rng.choice(fake_es.SECTORS + [None], n)
+        df["Industry"] = [f"Industry {i}" for i in rng.integers(1, 40, n)]
+        df["Net_Score"] = core.calculate_net_scores(df)
+        return df
+
+    df_matched = scan_frame(n_rows // 3)
+    df_missed = scan_frame(n_rows - n_rows // 3)
+
+    def sector_counts(df):
+        return (
+            df.groupby("Sector")["Ticker"].count().reset_index()
+            .rename(columns={"Ticker": "Stock_Count"})
+            .sort_values(by="Stock_Count", ascending=False)
+        )
+
+    sector_matched, sector_missed = sector_counts(df_matched), sector_counts(df_missed)
+
+    sheets = {
+        "sector_matched": sector_matched,
+        "sector_missed": sector_missed,
+        "indices": df_indices,
+        "MF": df_mf,
+        "matched": df_matched,
+        "missed": df_missed
+    }
+    charts = [
+        sector_chart("sector_matched", "Sector Distribution (Matched)", len(sector_matched)),
+        sector_chart("sector_missed", "Sector Distribution (Missed)", len(sector_missed))
+    ]
+    return sheets, charts
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _report_worker(backend, n_rows, path, queue):
+    sheets, charts = make_report(n_rows)
+    before = _peak_rss_mb()
+
+    start = time.perf_counter()
+    written = write_report(sheets, charts, path, backend=backend)
+    elapsed = time.perf_counter() - start
+
+    size = sum(os.path.getsize(p) for p in written)
+    queue.put((elapsed, before, _peak_rss_mb(), size))
+
+
+def bench_report(n_rows=60000, backends=None):
+    """
+    Each backend runs in a fresh process so peak RSS is not inherited
+    from the previous one.
+    """
+
+    ctx = multiprocessing.get_context("spawn")
+    backends = backends or list(REPORT_WRITERS)
+
+    print(f"Report writers — {n_rows} matched+missed rows")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            queue = ctx.Queue()
+            path = os.path.join(tmp, f"report_{backend}.xlsx")
+            proc = ctx.Process(target=_report_worker, args=(backend, n_rows, path, queue))
+            proc.start()
+            try:
+                elapsed, before, peak, size = queue.get(timeout=600)
+            except Exception as e:
+                print(f"  {backend:10s}: failed ({e})")
+                continue
+            finally:
+                proc.join()
+
+            print(f"  {backend:10s}: {elapsed:7.2f}s  peak RSS {peak:7.1f} MB "
+                  f"(+{peak - before:6.1f} MB while writing)  output {size / 1e6:6.1f} MB")
+
+
+def make_level_payload(n_levels=50000):
+    tickers = fake_es.make_tickers(5000)
+    sources, total = [], 0
+
+    while total < n_levels:
+        src = fake_es.make_weekly_doc(tickers[len(sources) % len(tickers)], f"w{len(sources)}")
+        sources.append(src)
+        total += len(src["crossed_resistance"])
+
+    return sources
+
+
+def _flatten_dict_rows(sources):
+    # the original per-level dict implementation
+    rows = []
+    for src in sources:
+        ticker = src["ticker"].replace(".NS", "")
+        close = src.get("close")
+        for cr in src.get("crossed_resistance", []):
+            rows.append({
+                "Ticker": ticker,
+                "Support": cr.get("support_level"),
+                "Resistance": cr.get("resistance_level"),
+                "Close": close
+            })
+    return pd.DataFrame(rows, columns=core.SCAN_COLUMNS)
+
+
+def _flatten_json_normalize(sources):
+    df = pd.json_normalize(sources, record_path="crossed_resistance", meta=["ticker", "close"])
+    return pd.DataFrame({
+        "Ticker": df["ticker"].str.replace(".NS", "", regex=False),
+        "Support": df["support_level"],
+        "Resistance": df["resistance_level"],
+        "Close": pd.to_numeric(df["close"])
+    })
+
+
+def bench_flatten(n_levels=50000, repeat=5):
+
+    sources = make_level_payload(n_levels)
+    expected = _flatten_dict_rows(sources)
+
+    print(f"crossed_resistance flattening — {len(expected)} levels from {len(sources)} docs "
+          f"(pandas {pd.__version__})")
+
+    for name, fn in (
+        ("dict per level", _flatten_dict_rows),
+        ("column lists", core.flatten_crossed_resistance),
+        ("json_normalize", _flatten_json_normalize),
+    ):
+        best = min(_timed(fn, iter(sources))[1] for _ in range(repeat))
+
+        tracemalloc.start()
+        out = fn(iter(sources))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"  {name:15s}: {best * 1000:7.1f} ms  peak alloc {peak / 1e6:6.1f} MB  "
+              f"identical={_same_frame(out, expected)}")
+
+
+def _same_frame(a, b):
+    return a.reset_index(drop=True).equals(b.reset_index(drop=True))
+
+
+def bench_scan(n_tickers=2500, latency=0.002, doc_latency=0.00005):
+
+    es = fake_es.FakeElasticsearch(latency=latency, doc_latency=doc_latency)
+    fake_es.load_weekly(es, core.TECH_INDEX, fake_es.make_tickers(n_tickers), [core.SCAN_DATE])
+
+    core.set_es(es)
+
+    (m2, x2), t_two = _timed(core.fetch_matched_and_all, single_pass=False)
+    two_calls, two_docs = dict(es.calls), es.docs_returned
+    es.calls.clear()
+    es.docs_returned = 0
+
+    (m1, x1), t_one = _timed(core.fetch_matched_and_all, single_pass=True)
+    one_calls, one_docs = dict(es.calls), es.docs_returned
+
+    print(f"Technical scan — {n_tickers} tickers, {latency * 1000:.1f} ms/round trip, "
+          f"{doc_latency * 1e6:.0f} us/doc")
+    print(f"  two queries : {t_two:8.3f}s  docs={two_docs:6d}  calls={two_calls}")
+    print(f"  single pass : {t_one:8.3f}s  docs={one_docs:6d}  calls={one_calls}")
+    print(f"  speedup     : {t_two / t_one:8.1f}x")
+    print(f"  identical   : matched={_same_frame(m1, m2)} missed={_same_frame(x1, x2)}")
+
+    return t_two, t_one
+
+
+def bench_watch(n_tickers=2500, latency=0.002, n_new=20):
+
+    es = fake_es.FakeElasticsearch(latency=latency)
+    tickers = fake_es.make_tickers(n_tickers)
+    fake_es.load_weekly(es, core.TECH_INDEX, tickers, [core.SCAN_DATE])
+    fake_es.load_fundamentals(es, core.FUND_INDEX, tickers)
+    core.set_es(es)
+
+    print(f"Support watcher — {n_tickers} tickers, {latency * 1000:.1f} ms/round trip")
+
+    def rescan():
+        df_matched, df_missed = core.fetch_matched_and_all()
+        return core.enrich_frames(df_matched, df_missed)
+
+    _, t_rescan = _timed(rescan)
+    print(f"  full rescan + enrich      : {t_rescan * 1000:8.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with support_watcher.WatchState(os.path.join(tmp, "watch.sqlite")) as state:
+
+            (alerts, n_docs), t_catch_up = _timed(support_watcher.poll_once, state)
+            print(f"  catch-up poll             : {t_catch_up * 1000:8.1f} ms  docs={n_docs}  "
+                  f"alerts={alerts['Ticker'].nunique()}")
+
+            _, t_idle = _timed(support_watcher.poll_once, state)
+            print(f"  idle poll                 : {t_idle * 1000:8.1f} ms")
+
+            # new week's docs trickling in one at a time
+            latencies, n_alerts = [], 0
+            for ticker in tickers[:n_new]:
+                es.index(index=core.TECH_INDEX, id=f"{ticker}_next",
+                         document=fake_es.make_weekly_doc(ticker, "2026-02-16"))
+                (alerts, _), elapsed = _timed(support_watcher.poll_once, state)
+                latencies.append(elapsed)
+                n_alerts += len(alerts) and alerts["Ticker"].nunique()
+
+            print(f"  per new doc               : {core.latency_percentiles(latencies)}  "
+                  f"alerts={n_alerts}/{n_new}")
+
+            # an alerted doc re-indexed unchanged must not alert again
+            for ticker in tickers[:n_new]:
+                es.index(index=core.TECH_INDEX, id=f"{ticker}_next",
+                         document=fake_es.make_weekly_doc(ticker, "2026-02-16"))
+            alerts, n_docs = support_watcher.poll_once(state)
+            print(f"  re-indexed duplicates     : docs={n_docs}  alerts={len(alerts)}")
+
+    # weeks indexed ticker by ticker: older dates keep arriving after newer
+    # ones, and small pages must still see every doc
+    dates = ["2026-01-26", "2026-02-02", "2026-02-09"]
+    es = fake_es.FakeElasticsearch(latency=0)
+    fake_es.load_weekly(es, core.TECH_INDEX, tickers[:300], dates, ticker_major=True)
+    fake_es.load_fundamentals(es, core.FUND_INDEX, tickers[:300])
+    core.set_es(es)
+
+    expected = {
+        (src["ticker"].replace(".NS", ""), src["date"])
+        for src in es.data[core.TECH_INDEX].values()
+        if src["vcp_trend_template"] and core.is_support_matched(src)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with support_watcher.WatchState(os.path.join(tmp, "watch.sqlite"), since=dates[0]) as state:
+            alerts, n_docs = support_watcher.poll_once(state, batch=100)
+            alerted = set(zip(alerts["Ticker"], alerts["Date"])) if len(alerts) else set()
+            print(f"  ticker-major, batch 100   : docs={n_docs}  alerts={len(alerted)}/{len(expected)}  "
+                  f"missed={len(expected - alerted)}")
+
+
+def bench_sectors(n_tickers=2500, latency=0.002, doc_latency=0.0002):
+
+    es = fake_es.FakeElasticsearch(latency=latency, doc_latency=doc_latency)
+    tickers = fake_es.make_tickers(n_tickers)
+    fake_es.load_weekly(es, core.TECH_INDEX, tickers, [core.SCAN_DATE])
+    fake_es.load_fundamentals(es, core.FUND_INDEX, tickers)
+    core.set_es(es)
+
+    df_matched, df_missed = core.fetch_matched_and_all()
+
+    print(f"Sector summary — {df_matched['Ticker'].nunique()} matched + "
+          f"{df_missed['Ticker'].nunique()} missed tickers, {latency * 1000:.1f} ms/round trip, "
+          f"{doc_latency * 1e6:.0f} us/doc")
+
+    es.calls.clear()
+    es.docs_returned = 0
+    start = time.perf_counter()
+    (em, ex), _ = core.enrich_frames(df_matched, df_missed)
+    by_pandas = {
+        name: core.sector_summary(df.drop_duplicates("Ticker"))
+        for name, df in (("matched", em), ("missed", ex))
+    }
+    t_pandas = time.perf_counter() - start
+    print(f"  enrich + groupby  : {t_pandas * 1000:8.1f} ms  docs={es.docs_returned}  calls={es.calls}")
+
+    es.calls.clear()
+    es.docs_returned = 0
+    by_es, t_es = _timed(core.sector_summaries_es, {
+        "matched": df_matched["Ticker"].unique(),
+        "missed": df_missed["Ticker"].unique()
+    })
+    print(f"  terms aggregation : {t_es * 1000:8.1f} ms  docs={es.docs_returned}  calls={es.calls}")
+
+    for name in by_es:
+        a = dict(by_pandas[name].itertuples(index=False, name=None))
+        b = dict(by_es[name].itertuples(index=False, name=None))
+        print(f"  {name} counts identical: {a == b}")
+
+
+def make_score_frame(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+
+    df = pd.DataFrame({
+        col: rng.normal(0, 20, n_rows).round(2)
+        for col in core.ROCE_PROFILE.sign_weights
+    })
+    # band edges, zeros and NaN are where a rewrite usually breaks
+    edges = np.array([-1, 0, 5, 8, 12, 18, 20, 25, 40, np.nan])
+    df["ROCE"] = rng.choice(edges, n_rows)
+    df["ROE"] = rng.choice(edges, n_rows)
+    df.iloc[::7, 0] = np.nan
+    df.iloc[::11, 3] = 0
+    return df
+
+
+def bench_scoring(n_rows=100000):
+
+    df = make_score_frame(n_rows)
+
+    print(f"Net_Score — {n_rows} rows")
+    for name, profile in core.PROFILES.items():
+        expected, t_apply = _timed(df.apply, core.calculate_net_score, axis=1, args=(profile,))
+        actual, t_vec = _timed(core.calculate_net_scores, df, profile)
+
+        print(f"  {name:5s} apply      : {t_apply:8.3f}s")
+        print(f"  {name:5s} vectorized : {t_vec:8.3f}s  ({t_apply / t_vec:.0f}x)  "
+              f"identical={expected.equals(actual)}")
+
+
+BENCHMARKS = {
+    "fundamentals": bench_fundamentals,
+    "scan": bench_scan,
+    "scoring": bench_scoring,
+    "features": bench_features,
+    "enrichment": bench_enrichment,
+    "payload": bench_payload,
+    "materialized": bench_materialized,
+    "cache": bench_cache,
+    "report": bench_report,
+    "flatten": bench_flatten,
+    "watch": bench_watch,
+    "sectors": bench_sectors,
+}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Screener benchmarks against a local fake ES")
+    parser.add_argument("name", nargs="?", choices=sorted(BENCHMARKS), default="fundamentals")
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    if args.name == "fundamentals":
+        bench_fundamentals(args.tickers, args.latency_ms / 1000)
+    elif args.name == "scan":
+        bench_scan(args.tickers, args.latency_ms / 1000)
+    elif args.name == "scoring":
+        bench_scoring(args.rows)
+    elif args.name == "features":
+        bench_features(args.tickers)
+    elif args.name == "enrichment":
+        bench_enrichment(args.tickers, args.latency_ms / 1000)
+    elif args.name == "materialized":
+        bench_materialized(args.tickers, args.latency_ms / 1000)
+    elif args.name == "payload":
+        bench_payload(args.tickers, args.latency_ms / 1000)
+    elif args.name == "cache":
+        bench_cache(args.tickers, args.latency_ms / 1000)
+    elif args.name == "report":
+        bench_report(args.rows)
+    elif args.name == "flatten":
+        bench_flatten(args.rows)
+    elif args.name == "sectors":
+        bench_sectors(args.tickers, args.latency_ms / 1000)
+    elif args.name == "watch":
+        bench_watch(args.tickers, args.latency_ms / 1000)
@@ -0,0 +1,558 @@
+import contextlib
+import copy
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+# ==========================================================
+# LOCAL ELASTICSEARCH STAND-IN
+# ==========================================================
+# In-process replacement for the few Elasticsearch calls the screener
+# makes. Every call sleeps `latency` seconds to mimic one HTTP round trip
+# to a local node, so call counts show up in the timings, plus
+# `doc_latency` per returned hit and `byte_latency` per response byte to
+# stand in for payload transfer. Painless script fields are emulated by
+# name through SCRIPT_FIELDS.
+
+QUARTER_MONTHS = ["03", "06", "09", "12"]
+FUND_METRICS = [
+    "Sales", "Expenses", "Operating Profit", "OPM %", "Other Income",
+    "Interest", "Depreciation", "Profit before tax", "Tax %",
+    "Net Profit", "EPS in Rs"
+]
+SECTORS = [
+    "Financial Services", "Healthcare", "Capital Goods", "Chemicals",
+    "Information Technology", "Power", "Consumer Services",
+    "Automobile and Auto Components"
+]
+
+
+def _select_path(value, parts):
+    if not parts:
+        return value
+
+    if isinstance(value, list):
+        # keep one slot per element so several includes merge positionally
+        return [_select_path(v, parts) or {} for v in value]
+
+    if isinstance(value, dict) and parts[0] in value:
+        return {parts[0]: _select_path(value[parts[0]], parts[1:])}
+
+    return None
+
+
+def _merge(dst, src):
+    if isinstance(dst, list) and isinstance(src, list):
+        return [_merge(a, b) for a, b in zip(dst, src)]
+
+    if isinstance(dst, dict) and isinstance(src, dict):
+        for k, v in src.items():
+            dst[k] = _merge(dst[k], v) if k in dst else v
+        return dst
+
+    return src
+
+
+def filter_source(src, includes):
+    """
+    Apply `_source` includes (dotted paths, arrays of objects walked
+    element-wise) the same way Elasticsearch does.
+    """
+    if not includes:
+        return copy.deepcopy(src)
+
+    if isinstance(includes, str):
+        includes = [includes]
+
+    out = {}
+    for path in includes:
+        selected = _select_path(src, path.split("."))
+        if selected:
+            out = _merge(out, selected)
+    return out
+
+
+def recent_quarters(src, params):
+    """
+    Python twin of screener_core.RECENT_QUARTERS_SCRIPT.
+    """
+    by_metric = {}
+    for q in src.get("quarterly") or []:
+        if q.get("metric") in params["metrics"]:
+            by_metric.setdefault(q["metric"], []).append(q)
+
+    out = []
+    for series in by_metric.values():
+        series.sort(key=lambda q: q["period_date"])
+        out += series[-params["n"]:]
+    return out
+
+
+SCRIPT_FIELDS = {
+    "recent_quarterly": recent_quarters
+}
+
+
+def _field_values(src, path):
+    values = [src]
+    for part in path.split("."):
+        nxt = []
+        for v in values:
+            if isinstance(v, list):
+                v_items = v
+            else:
+                v_items = [v]
+            for item in v_items:
+                if isinstance(item, dict) and part in item:
+                    child = item[part]
+                    nxt.extend(child if isinstance(child, list) else [child])
+        values = nxt
+    return values
+
+
+def _matches(src, query):
+    if not query or "match_all" in query:
+        return True
+
+    if "bool" in query:
+        clauses = query["bool"]
+        must = clauses.get("must", []) + clauses.get("filter", [])
+        if isinstance(must, dict):
+            must = [must]
+        return all(_matches(src, q) for q in must)
+
+    if "term" in query:
+        field, value = next(iter(query["term"].items()))
+        if isinstance(value, dict):
+            value = value["value"]
+        return value in _field_values(src, field)
+
+    if "terms" in query:
+        field, values = next(iter(query["terms"].items()))
+        return any(v in values for v in _field_values(src, field))
+
+    if "range" in query:
+        field, bounds = next(iter(query["range"].items()))
+        checks = {
+            "lte": lambda v, b: v <= b,
+            "lt": lambda v, b: v < b,
+            "gte": lambda v, b: v >= b,
+            "gt": lambda v, b: v > b,
+        }
+        return any(
+            all(checks[op](v, b) for op, b in bounds.items() if op in checks)
+            for v in _field_values(src, field)
+            if v is not None
+        )
+
+    raise ValueError(f"FakeElasticsearch does not support query {query}")
+
+
+def _matches_doc(doc_id, src, query):
+    if query and "ids" in query:
+        return doc_id in query["ids"]["values"]
+    return _matches(src, query)
+
+
+def _aggregate(matched, aggs):
+    """
+    terms (by doc_count desc, key asc) and filters buckets, nested.
+    """
+    out = {}
+
+    for name, spec in aggs.items():
+        sub = spec.get("aggs") or spec.get("aggregations") or {}
+
+        if "filters" in spec:
+            out[name] = {"buckets": {
+                key: {
+                    "doc_count": len(docs),
+                    **_aggregate(docs, sub)
+                }
+                for key, query in spec["filters"]["filters"].items()
+                for docs in [[(i, d) for i, d in matched if _matches_doc(i, d, query)]]
+            }}
+
+        elif "terms" in spec:
+            field = spec["terms"]["field"].removesuffix(".keyword")
+            groups = {}
+            for doc_id, src in matched:
+                for value in set(_field_values(src, field)):
+                    groups.setdefault(value, []).append((doc_id, src))
+
+            ranked = sorted(groups.items(), key=lambda kv: (-len(kv[1]), kv[0]))
+            size = spec["terms"].get("size", 10)
+            out[name] = {
+                "sum_other_doc_count": sum(len(docs) for _, docs in ranked[size:]),
+                "buckets": [
+                    {"key": key, "doc_count": len(docs), **_aggregate(docs, sub)}
+                    for key, docs in ranked[:size]
+                ]
+            }
+
+        else:
+            raise ValueError(f"FakeElasticsearch does not support aggregation {spec}")
+
+    return out
+
+
+class FakeIndices:
+
+    def __init__(self, es):
+        self.es = es
+
+    def exists(self, index, **kwargs):
+        return index in self.es.mappings or index in self.es.data
+
+    def create(self, index, mappings=None, settings=None, **kwargs):
+        self.es._round_trip("indices.create")
+        if self.exists(index):
+            raise ValueError(f"resource_already_exists_exception: {index}")
+        self.es.mappings[index] = mappings or {}
+        self.es.data.setdefault(index, {})
+        return {"acknowledged": True, "index": index}
+
+    def refresh(self, index=None, **kwargs):
+        self.es._round_trip("indices.refresh")
+        return {"_shards": {"failed": 0}}
+
+
+class _Response(dict):
+    # helpers.*bulk read `.body` off the client's response objects
+    @property
+    def body(self):
+        return self
+
+
+class _JsonSerializer:
+    def dumps(self, data):
+        return json.dumps(data)
+
+
+class _NoTracing:
+    def helpers_span(self, name):
+        return contextlib.nullcontext()
+
+    def use_span(self, span):
+        return contextlib.nullcontext()
+
+
+class FakeElasticsearch:
+
+    def __init__(self, latency=0.002, doc_latency=0.0, byte_latency=0.0):
+        self.latency = latency
+        self.doc_latency = doc_latency
+        self.byte_latency = byte_latency
+        self.docs_returned = 0
+        self.bytes_returned = 0
+        self.data = {}
+        self.indices = FakeIndices(self)
+        self.mappings = {}
+        self.calls = {}
+        self.pits = {}
+        self.scrolls = {}
+        self.seq_no = 0
+        self.seq_nos = {}
+        self.lock = threading.Lock()
+
+        # enough client internals for elasticsearch.helpers.parallel_bulk
+        self.transport = SimpleNamespace(
+            serializers=SimpleNamespace(get_serializer=lambda mimetype: _JsonSerializer())
+        )
+        self._otel = _NoTracing()
+
+    def _round_trip(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _respond(self, res):
+        size = len(json.dumps(res))
+        self.bytes_returned += size
+        if self.byte_latency:
+            time.sleep(self.byte_latency * size)
+
+        # like ObjectApiResponse.meta: the transport's headers
+        res = _Response(res)
+        res.meta = SimpleNamespace(headers={"content-length": str(size)})
+        return res
+
+    def options(self, **kwargs):
+        return self
+
+    def index(self, index, id, document):
+        with self.lock:
+            self.data.setdefault(index, {})[id] = copy.deepcopy(document)
+            self.seq_no += 1
+            self.seq_nos[(index, id)] = self.seq_no
+
+    def bulk(self, operations, refresh=None, **kwargs):
+        self._round_trip("bulk")
+        items = []
+        # helpers send pre-serialized lines
+        ops = iter(json.loads(op) if isinstance(op, (bytes, str)) else op for op in operations)
+
+        for action in ops:
+            (op, meta), = action.items()
+            index, doc_id = meta["_index"], meta["_id"]
+
+            if op == "delete":
+                found = self.data.get(index, {}).pop(doc_id, None) is not None
+                self.seq_nos.pop((index, doc_id), None)
+                items.append({"delete": {"_index": index, "_id": doc_id, "status": 200 if found else 404}})
+            elif op == "index":
+                self.index(index=index, id=doc_id, document=next(ops))
+                items.append({"index": {"_index": index, "_id": doc_id, "status": 201}})
+            else:
+                raise ValueError(f"FakeElasticsearch does not support bulk {op}")
+
+        return _Response({"errors": False, "items": items})
+
+    def _doc_meta(self, index, doc_id):
+        return {
+            "_index": index,
+            "_id": doc_id,
+            "_seq_no": self.seq_nos[(index, doc_id)],
+            "_primary_term": 1,
+            "found": True
+        }
+
+    def get(self, index, id, _source_includes=None, **kwargs):
+        self._round_trip("get")
+
+        docs = self.data.get(index, {})
+        if id not in docs:
+            raise KeyError(f"{index}/{id} not found")
+
+        return self._respond({
+            **self._doc_meta(index, id),
+            "_source": filter_source(docs[id], _source_includes)
+        })
+
+    def mget(self, index, ids, _source_includes=None, _source=True, **kwargs):
+        self._round_trip("mget")
+        if _source is not False:
+            self.docs_returned += len(ids)
+            if self.doc_latency:
+                time.sleep(self.doc_latency * len(ids))
+
+        docs = self.data.get(index, {})
+        out = []
+        for doc_id in ids:
+            if doc_id in docs:
+                doc = self._doc_meta(index, doc_id)
+                if _source is not False:
+                    doc["_source"] = filter_source(docs[doc_id], _source_includes)
+                out.append(doc)
+            else:
+                out.append({"_index": index, "_id": doc_id, "found": False})
+
+        return self._respond({"docs": out})
+
+    # ---------------- search / pagination ----------------
+
+    def _run_query(self, index, body):
+        docs = self.data.get(index, {})
+        query = body.get("query")
+
+        if query and "ids" in query:
+            return [(i, docs[i]) for i in query["ids"]["values"] if i in docs]
+
+        if "_seq_no" in json.dumps(query or {}):
+            # metadata field: expose it to range queries on this index
+            matched = [
+                (doc_id, src) for doc_id, src in docs.items()
+                if _matches({**src, "_seq_no": self.seq_nos[(index, doc_id)]}, query)
+            ]
+        else:
+            matched = [
+                (doc_id, src) for doc_id, src in docs.items()
+                if _matches(src, query)
+            ]
+
+        for spec in body.get("sort", []):
+            if isinstance(spec, dict) and "_seq_no" in spec:
+                order = spec["_seq_no"]
+                order = order.get("order", "asc") if isinstance(order, dict) else order
+                matched.sort(key=lambda m: self.seq_nos[(index, m[0])], reverse=order == "desc")
+
+        return matched
+
+    def _hits(self, index, matched, body):
+        includes = body.get("_source")
+        self.docs_returned += len(matched)
+        if self.doc_latency:
+            time.sleep(self.doc_latency * len(matched))
+        hits = [
+            {"_index": index, "_id": doc_id, "_source": filter_source(src, includes)}
+            if includes is not False else {"_index": index, "_id": doc_id}
+            for doc_id, src in matched
+        ]
+
+        if body.get("seq_no_primary_term"):
+            for hit in hits:
+                hit["_seq_no"] = self.seq_nos[(index, hit["_id"])]
+                hit["_primary_term"] = 1
+
+        for name, spec in body.get("script_fields", {}).items():
+            params = spec["script"].get("params", {})
+            for hit, (_, src) in zip(hits, matched):
+                hit.setdefault("fields", {})[name] = SCRIPT_FIELDS[name](src, params)
+
+        return hits
+
+    def open_point_in_time(self, index, keep_alive=None, **kwargs):
+        self._round_trip("open_point_in_time")
+        pit_id = f"pit-{len(self.pits) + 1}"
+        self.pits[pit_id] = index
+        return {"id": pit_id}
+
+    def close_point_in_time(self, id, **kwargs):
+        self._round_trip("close_point_in_time")
+        self.pits.pop(id, None)
+        return {"succeeded": True}
+
+    def search(self, index=None, body=None, scroll=None, **kwargs):
+        self._round_trip("search")
+        body = dict(body or {})
+
+        pit = body.get("pit")
+        if pit:
+            index = self.pits[pit["id"]]
+
+        matched = self._run_query(index, body)
+        size = body.get("size", 10)
+
+        if pit:
+            start = body.get("search_after", [-1])[0] + 1
+            page = matched[start:start + size]
+            hits = self._hits(index, page, body)
+            for i, h in enumerate(hits):
+                h["sort"] = [start + i]
+        else:
+            start = body.get("from", 0)
+            hits = self._hits(index, matched[start:start + size], body)
+
+        res = {
+            "hits": {
+                "total": {"value": len(matched), "relation": "eq"},
+                "hits": hits
+            }
+        }
+
+        aggs = body.get("aggs") or body.get("aggregations")
+        if aggs:
+            res["aggregations"] = _aggregate(matched, aggs)
+
+        if pit:
+            res["pit_id"] = pit["id"]
+
+        if scroll:
+            scroll_id = f"scroll-{len(self.scrolls) + 1}"
+            self.scrolls[scroll_id] = (index, body, start + size)
+            res["_scroll_id"] = scroll_id
+
+        return self._respond(res)
+
+    def scroll(self, scroll_id, scroll=None, **kwargs):
+        self._round_trip("scroll")
+        index, body, start = self.scrolls[scroll_id]
+        matched = self._run_query(index, body)
+        size = body.get("size", 10)
+        self.scrolls[scroll_id] = (index, body, start + size)
+        return self._respond({
+            "_scroll_id": scroll_id,
+            "hits": {
+                "total": {"value": len(matched), "relation": "eq"},
+                "hits": self._hits(index, matched[start:start + size], body)
+            }
+        })
+
+    def clear_scroll(self, scroll_id, **kwargs):
+        self._round_trip("clear_scroll")
+        self.scrolls.pop(scroll_id, None)
+        return {"succeeded": True}
+
+
+# ==========================================================
+# SYNTHETIC DATA
+# ==========================================================
+
+def make_tickers(n):
+    return [f"TICK{i:04d}" for i in range(n)]
+
+
+def make_fundamental_doc(ticker, n_quarters=12, rng=None):
+    rng = rng or random.Random(ticker)
+
+    periods = []
+    year = 2023
+    for i in range(n_quarters):
+        periods.append(f"{year + i // 4}-{QUARTER_MONTHS[i % 4]}")
+
+    quarterly = []
+    for metric in FUND_METRICS:
+        value = rng.uniform(50, 5000)
+        for period in periods:
+            value *= rng.uniform(0.85, 1.2)
+            quarterly.append({
+                "metric": metric,
+                "period_date": period,
+                "value": round(value, 2)
+            })
+
+    # Documents come back in arbitrary order from the scraper
+    rng.shuffle(quarterly)
+
+    return {
+        "ticker": ticker,
+        "sector": {
+            "sector": rng.choice(SECTORS),
+            "industry": f"Industry {rng.randint(1, 40)}"
+        },
+        "ratios": {
+            "roce": round(rng.uniform(-5, 35), 2),
+            "roe": round(rng.uniform(-5, 30), 2),
+            "market_cap": round(rng.uniform(500, 500000), 2),
+            "pe": round(rng.uniform(5, 90), 2)
+        },
+        "quarterly": quarterly
+    }
+
+
+def make_weekly_doc(ticker, date, rng=None):
+    rng = rng or random.Random(f"{ticker}-{date}")
+
+    close = round(rng.uniform(50, 5000), 2)
+    crossed = []
+    for _ in range(rng.randint(0, 4)):
+        resistance = round(close * rng.uniform(0.85, 0.99), 2)
+        support = round(resistance * rng.uniform(0.8, 0.98), 2)
+        crossed.append({
+            "support_level": support,
+            "resistance_level": resistance,
+            "support_distance_pct": round((close - support) / close * 100, 2)
+        })
+
+    return {
+        "ticker": f"{ticker}.NS",
+        "date": date,
+        "close": close,
+        "vcp_trend_template": rng.random() < 0.6,
+        "crossed_resistance": crossed
+    }
+
+
+def load_weekly(es, index, tickers, dates, ticker_major=False):
+    # date-major: a whole week at a time; ticker-major: every week of one
+    # ticker before the next, so _seq_no order is not date order
+    pairs = [(t, d) for t in tickers for d in dates] if ticker_major else [(t, d) for d in dates for t in tickers]
+    for ticker, date in pairs:
+        es.index(index=index, id=f"{ticker}_{date}", document=make_weekly_doc(ticker, date))
+
+
+def load_fundamentals(es, index, tickers, n_quarters=12):
+    for ticker in tickers:
+        es.index(index=index, id=ticker, document=make_fundamental_doc(ticker, n_quarters))
@@ -0,0 +1,174 @@
+import argparse
+import math
+import time
+from datetime import datetime, timezone
+
+from Stocks_filtered import screener_core as core
+
+# ==========================================================
+# FUNDAMENTAL FEATURES MATERIALIZER
+# ==========================================================
+# Computes the QoQ/YoY/slope features of every scoring profile once per
+# fundamentals update and bulk-indexes them into FEATURES_INDEX, one
+# small doc per ticker:
+#   {"ticker": ..., "source_version": "<_seq_no>:<_primary_term>",
+#    "feature_set": ..., "computed_at": ...,
+#    "profiles": {"roce": {...}, "plain": {...}}}
+# Enrichment then reads them with FUND_FETCH_MODE = "features", checking
+# source_version against the live doc, so tickers ingested since the last
+# run are scored from nifty_fundamental until this runs again. A ticker
+# is recomputed only when its nifty_fundamental doc moved or the feature
+# definitions changed.
+
+BULK_CHUNK = 500
+
+FEATURES_MAPPINGS = {
+    "dynamic": False,
+    "properties": {
+        "ticker": {"type": "keyword"},
+        "source_version": {"type": "keyword"},
+        "feature_set": {"type": "keyword"},
+        "computed_at": {"type": "date"},
+        # only ever read back whole, never searched
+        "profiles": {"type": "object", "enabled": False}
+    }
+}
+
+
+def feature_set_key(profiles):
+    """
+    Changes whenever the stored features would: other profiles, another
+    quarter window or feature groups.
+    """
+    return "|".join([
+        ",".join(sorted(p.name for p in profiles)),
+        f"q{core.FEATURE_QUARTERS}",
+        ",".join(core.FEATURE_GROUPS),
+        ",".join(core.SLOPE_GROUPS)
+    ])
+
+
+def _json_safe(features):
+    return {
+        k: None if isinstance(v, float) and math.isnan(v) else v
+        for k, v in features.items()
+    }
+
+
+def ensure_features_index(index=None):
+    es = core.get_es()
+    index = index or core.FEATURES_INDEX
+
+    if not es.indices.exists(index=index):
+        es.indices.create(index=index, mappings=FEATURES_MAPPINGS)
+
+
+def _versions(index, fields):
+    query = {"_source": fields, "seq_no_primary_term": True, "query": {"match_all": {}}}
+    return {h["_id"]: h for h in core.iter_search_hits(query, index)}
+
+
+def plan(profiles, full=False):
+    """
+    Tickers whose features are missing or stale, and feature docs whose
+    fundamentals doc is gone.
+    """
+
+    key = feature_set_key(profiles)
+    sources = _versions(core.FUND_INDEX, False)
+    features = _versions(core.FEATURES_INDEX, ["source_version", "feature_set"])
+
+    stale = []
+    for ticker, hit in sources.items():
+        stored = features.get(ticker, {}).get("_source", {})
+        version = f"{hit.get('_seq_no')}:{hit.get('_primary_term')}"
+        if full or stored.get("source_version") != version or stored.get("feature_set") != key:
+            stale.append(ticker)
+
+    removed = [t for t in features if t not in sources]
+    return stale, removed
+
+
+def feature_actions(docs, profiles):
+    key = feature_set_key(profiles)
+    now = datetime.now(timezone.utc).isoformat()
+    sources = {t: doc["_source"] for t, doc in docs.items()}
+
+    per_profile = {p.name: core.build_fundamental_features(sources, p) for p in profiles}
+
+    for ticker, doc in docs.items():
+        yield {"index": {"_index": core.FEATURES_INDEX, "_id": ticker}}
+        yield {
+            "ticker": ticker,
+            "source_version": f"{doc.get('_seq_no')}:{doc.get('_primary_term')}",
+            "feature_set": key,
+            "computed_at": now,
+            "profiles": {name: _json_safe(results[ticker]) for name, results in per_profile.items()}
+        }
+
+
+def _bulk(actions):
+    """
+    Send (action, source) pairs BULK_CHUNK at a time; returns the number
+    of failed items.
+    """
+    es = core.get_es()
+    failed = 0
+    batch = []
+
+    def flush():
+        nonlocal failed
+        if batch:
+            res = es.bulk(operations=batch)
+            if res.get("errors"):
+                failed += sum(1 for item in res["items"] for r in item.values() if r.get("error"))
+            batch.clear()
+
+    for action in actions:
+        batch.append(action)
+        if len(batch) >= 2 * BULK_CHUNK:
+            flush()
+    flush()
+
+    return failed
+
+
+def materialize(profiles=None, full=False, chunk_size=core.FUND_MGET_CHUNK,
+                max_workers=core.FUND_FETCH_WORKERS):
+    """
+    Bring FEATURES_INDEX up to date with nifty_fundamental. Returns
+    {"computed": n, "removed": n, "failed": n}.
+    """
+
+    profiles = list(profiles or core.PROFILES.values())
+
+    ensure_features_index()
+    stale, removed = plan(profiles, full)
+
+    failed = 0
+    for start in range(0, len(stale), BULK_CHUNK):
+        docs = core.fetch_fundamental_docs(stale[start:start + BULK_CHUNK], chunk_size, max_workers)
+        failed += _bulk(feature_actions(docs, profiles))
+
+    failed += _bulk({"delete": {"_index": core.FEATURES_INDEX, "_id": t}} for t in removed)
+
+    core.get_es().indices.refresh(index=core.FEATURES_INDEX)
+    return {"computed": len(stale), "removed": len(removed), "failed": failed}
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Precompute fundamentals features into their own index")
+    parser.add_argument("--full", action="store_true", help="recompute every ticker")
+    core.add_es_arguments(parser)
+    args = parser.parse_args()
+    core.configure_from_args(args)
+
+    print(f"🧮 Materializing {core.FUND_INDEX} → {core.FEATURES_INDEX}...")
+    start = time.perf_counter()
+    stats = materialize(full=args.full)
+    print(f"✅ Done in {time.perf_counter() - start:.1f}s: {stats}")
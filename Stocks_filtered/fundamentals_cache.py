@@ -0,0 +1,171 @@
+import json
+import sqlite3
+import time
+
+# ==========================================================
+# ON-DISK FUNDAMENTALS CACHE
+# ==========================================================
+# Keeps the filtered fundamentals _source per (host, index, ticker)
+# together with the _seq_no/_primary_term it was read at. Entries younger
+# than `ttl` seconds are served without touching ES; older ones are
+# revalidated with a source-less mget and only re-downloaded when the doc
+# actually changed. The whole cache is dropped when the _source fields it
+# was filled with differ from `fields`.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    host         TEXT NOT NULL,
+    index_name   TEXT NOT NULL,
+    ticker       TEXT NOT NULL,
+    source       TEXT NOT NULL,
+    seq_no       INTEGER,
+    primary_term INTEGER,
+    fetched_at   REAL NOT NULL,
+    accessed_at  REAL NOT NULL,
+    PRIMARY KEY (host, index_name, ticker)
+);
+CREATE TABLE IF NOT EXISTS cache_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class FundamentalsCache:
+
+    def __init__(self, path, ttl=24 * 3600, max_age=120 * 24 * 3600, max_entries=5000, fields=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+
+        self.conn = sqlite3.connect(path)
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+        if fields is not None:
+            self._check_fields(fields)
+        self.conn.commit()
+
+    def _migrate(self):
+        # caches written before entries were keyed by host and index
+        # cannot tell which index they came from
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(fundamentals)")]
+        if columns and "index_name" not in columns:
+            self.conn.execute("DROP TABLE fundamentals")
+
+    def _check_fields(self, fields):
+        fields = json.dumps(sorted(fields))
+        row = self.conn.execute("SELECT value FROM cache_meta WHERE key = 'fields'").fetchone()
+
+        if row is None or row[0] != fields:
+            self.conn.execute("DELETE FROM fundamentals")
+            self.conn.execute("INSERT OR REPLACE INTO cache_meta VALUES ('fields', ?)", (fields,))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.evict()
+        self.close()
+
+    def load(self, tickers, index, host=""):
+        """
+        Return {ticker: entry} for tickers cached from `index` on `host`,
+        where entry holds source, seq_no, primary_term, fetched_at and a
+        `fresh` flag.
+        """
+        tickers = list(tickers)
+        now = time.time()
+        entries = {}
+
+        # stay under SQLite's bound-parameter limit
+        for start in range(0, len(tickers), 500):
+            chunk = tickers[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT ticker, source, seq_no, primary_term, fetched_at "
+                f"FROM fundamentals WHERE host = ? AND index_name = ? AND ticker IN ({marks})",
+                [host, index, *chunk]
+            ).fetchall()
+
+            for ticker, source, seq_no, primary_term, fetched_at in rows:
+                entries[ticker] = {
+                    "source": json.loads(source),
+                    "seq_no": seq_no,
+                    "primary_term": primary_term,
+                    "fetched_at": fetched_at,
+                    "fresh": now - fetched_at < self.ttl
+                }
+
+        self.conn.executemany(
+            "UPDATE fundamentals SET accessed_at = ? WHERE host = ? AND index_name = ? AND ticker = ?",
+            [(now, host, index, t) for t in entries]
+        )
+        self.conn.commit()
+        return entries
+
+    def store(self, docs, index, host=""):
+        """
+        docs: {ticker: mget doc} as returned by Elasticsearch for `index`
+        on `host`.
+        """
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    host,
+                    index,
+                    ticker,
+                    json.dumps(doc["_source"]),
+                    doc.get("_seq_no"),
+                    doc.get("_primary_term"),
+                    now,
+                    now
+                )
+                for ticker, doc in docs.items()
+            ]
+        )
+        self.conn.commit()
+
+    def touch(self, tickers, index, host=""):
+        """
+        Mark entries as revalidated: restarts their TTL.
+        """
+        now = time.time()
+        self.conn.executemany(
+            "UPDATE fundamentals SET fetched_at = ?, accessed_at = ? "
+            "WHERE host = ? AND index_name = ? AND ticker = ?",
+            [(now, now, host, index, t) for t in tickers]
+        )
+        self.conn.commit()
+
+    def evict(self):
+        """
+        Drop entries older than max_age, then the least recently used
+        ones beyond max_entries. Returns the number of rows removed.
+        """
+        before = self.conn.total_changes
+
+        self.conn.execute(
+            "DELETE FROM fundamentals WHERE fetched_at < ?",
+            (time.time() - self.max_age,)
+        )
+        self.conn.execute(
+            "DELETE FROM fundamentals WHERE rowid NOT IN ("
+            "SELECT rowid FROM fundamentals ORDER BY accessed_at DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self.conn.commit()
+
+        return self.conn.total_changes - before
+
+    def clear(self):
+        self.conn.execute("DELETE FROM fundamentals")
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM fundamentals").fetchone()[0]
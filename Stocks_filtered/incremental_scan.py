@@ -0,0 +1,291 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+
+import pandas as pd
+
+from Stocks_filtered import screener_core as core
+from Stocks_filtered.fundamentals_cache import FundamentalsCache
+from Stocks_filtered.report_writers import sector_chart, write_report
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+# Run from the repo root:
+#   python -m Stocks_filtered.incremental_scan
+STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scan_state.sqlite")
+OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "support_resistance_scan_incremental.xlsx")
+REPORT_BACKEND = "openpyxl"
+
+# ==========================================================
+# PREVIOUS SCAN STATE
+# ==========================================================
+# One row per ticker seen in the last scan: its status, a hash of its
+# crossed_resistance rows, the (_seq_no, _primary_term) of its
+# fundamentals doc, the fundamentals dict it was enriched with and its
+# Net_Score.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scan_state (
+    ticker       TEXT PRIMARY KEY,
+    status       TEXT NOT NULL,
+    rows_hash    TEXT NOT NULL,
+    fund_version TEXT,
+    fundamentals TEXT NOT NULL,
+    net_score    INTEGER
+);
+CREATE TABLE IF NOT EXISTS scan_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def load_state(path, profile):
+    """
+    Previous per-ticker state, or {} when there is none or it was built
+    with a different scoring profile.
+    """
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        meta = dict(conn.execute("SELECT key, value FROM scan_meta").fetchall())
+        if meta.get("profile") != profile.name:
+            return {}, meta.get("scan_date")
+
+        state = {
+            ticker: {
+                "status": status,
+                "rows_hash": rows_hash,
+                "fund_version": fund_version,
+                "fundamentals": json.loads(fundamentals),
+                "net_score": net_score
+            }
+            for ticker, status, rows_hash, fund_version, fundamentals, net_score
+            in conn.execute("SELECT * FROM scan_state")
+        }
+        return state, meta.get("scan_date")
+    finally:
+        conn.close()
+
+
+def save_state(path, profile, scan_date, state):
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.execute("DELETE FROM scan_state")
+        conn.executemany(
+            "INSERT INTO scan_state VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    ticker,
+                    s["status"],
+                    s["rows_hash"],
+                    s["fund_version"],
+                    json.dumps(s["fundamentals"]),
+                    s["net_score"]
+                )
+                for ticker, s in state.items()
+            ]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO scan_meta VALUES (?, ?)",
+            [("profile", profile.name), ("scan_date", scan_date)]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# ==========================================================
+# DIFF
+# ==========================================================
+
+def rows_fingerprints(df):
+    """
+    {ticker: hash of its crossed_resistance rows}, independent of row order.
+    """
+
+    fingerprints = {}
+    for ticker, group in df.groupby("Ticker", sort=False):
+        rows = sorted(map(repr, group[core.SCAN_COLUMNS[1:]].itertuples(index=False, name=None)))
+        fingerprints[ticker] = hashlib.sha1("\n".join(rows).encode()).hexdigest()
+    return fingerprints
+
+
+def _version_key(version):
+    return None if version is None else f"{version[0]}:{version[1]}"
+
+
+def diff_scans(previous, current):
+    """
+    Entered/exited the VCP universe, moved between matched and missed, or
+    kept their status with different levels or Net_Score.
+    """
+
+    changes = []
+
+    for ticker in sorted(set(previous) | set(current)):
+        prev, cur = previous.get(ticker), current.get(ticker)
+
+        if prev is None:
+            change = "entered"
+        elif cur is None:
+            change = "exited"
+        elif prev["status"] != cur["status"]:
+            change = "status"
+        elif prev["rows_hash"] != cur["rows_hash"] or prev["net_score"] != cur["net_score"]:
+            change = "changed"
+        else:
+            continue
+
+        changes.append({
+            "Ticker": ticker,
+            "Change": change,
+            "Prev_Status": prev["status"] if prev else None,
+            "Status": cur["status"] if cur else None,
+            "Prev_Net_Score": prev["net_score"] if prev else None,
+            "Net_Score": cur["net_score"] if cur else None
+        })
+
+    columns = ["Ticker", "Change", "Prev_Status", "Status", "Prev_Net_Score", "Net_Score"]
+    return pd.DataFrame(changes, columns=columns)
+
+
+# ==========================================================
+# INCREMENTAL RUN
+# ==========================================================
+
+def fetch_changed(tickers, profile, cache=None):
+    """
+    Fundamentals of tickers whose doc moved, read straight from ES: a
+    FundamentalsCache entry inside its TTL would still hold the old
+    _source. Returns the fundamentals and the (_seq_no, _primary_term)
+    they were actually read at; the cache is refreshed with the new docs.
+    """
+
+    docs = core.fetch_fundamental_docs(tickers)
+    if cache is not None:
+        cache.store(docs, core.FUND_INDEX, core.ES_HOST)
+
+    fundamentals = core.build_fundamental_features(
+        {ticker: doc["_source"] for ticker, doc in docs.items()}, profile
+    )
+    for ticker in tickers:
+        if ticker not in fundamentals:
+            fundamentals[ticker] = core.empty_fundamental_result(profile)
+
+    versions = {t: (d.get("_seq_no"), d.get("_primary_term")) for t, d in docs.items()}
+    return fundamentals, versions
+
+
+def run_incremental(scan_date=core.SCAN_DATE, profile=core.ROCE_PROFILE,
+                    state_path=STATE_FILE, cache=None):
+    """
+    Scan scan_date, reuse the stored fundamentals of every ticker whose
+    fundamentals doc has not changed since the previous run, and enrich
+    only the rest. Returns the matched/missed frames, the change list and
+    how many tickers were re-enriched.
+    """
+
+    df_matched, df_missed = core.fetch_matched_and_all(scan_date)
+    previous, _ = load_state(state_path, profile)
+
+    status = {t: "missed" for t in df_missed["Ticker"].unique()}
+    status.update({t: "matched" for t in df_matched["Ticker"].unique()})
+
+    rows_hash = rows_fingerprints(df_missed)
+    rows_hash.update(rows_fingerprints(df_matched))
+
+    # one source-less mget pass tells which fundamentals docs moved
+    versions = core.get_fundamental_versions(list(status))
+
+    fundamentals = {}
+    delta = []
+
+    for ticker in status:
+        version = _version_key(versions.get(ticker))
+        prev = previous.get(ticker)
+
+        if prev is not None and version is not None and prev["fund_version"] == version:
+            fundamentals[ticker] = prev["fundamentals"]
+        else:
+            delta.append(ticker)
+
+    changed, fetched_versions = fetch_changed(delta, profile, cache)
+    fundamentals.update(changed)
+    # the doc may have moved again between the two passes
+    versions.update(fetched_versions)
+
+    df_matched = core.enrich_dataframe(df_matched, fundamentals, profile)
+    df_missed = core.enrich_dataframe(df_missed, fundamentals, profile)
+
+    net_score = pd.concat([df_matched, df_missed]).groupby("Ticker")["Net_Score"].first()
+
+    current = {
+        ticker: {
+            "status": status[ticker],
+            "rows_hash": rows_hash[ticker],
+            "fund_version": _version_key(versions.get(ticker)),
+            "fundamentals": fundamentals[ticker],
+            "net_score": int(net_score[ticker])
+        }
+        for ticker in status
+    }
+
+    changes = diff_scans(previous, current)
+    save_state(state_path, profile, scan_date, current)
+
+    return df_matched, df_missed, changes, len(delta)
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Incremental weekly support/resistance scan")
+    parser.add_argument("--date", default=core.SCAN_DATE)
+    parser.add_argument("--profile", choices=sorted(core.PROFILES), default="roce")
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--backend", default=REPORT_BACKEND)
+    core.add_es_arguments(parser)
+    args = parser.parse_args()
+    core.configure_from_args(args)
+
+    print(f"🔎 Incremental scan for {args.date}...")
+    with FundamentalsCache(core.FUND_CACHE_FILE, ttl=core.FUND_CACHE_TTL,
+                           fields=core.FUND_SOURCE_FIELDS) as cache:
+        df_matched, df_missed, changes, n_enriched = run_incremental(
+            args.date, core.PROFILES[args.profile], args.state, cache
+        )
+
+    print(f"📊 Re-enriched {n_enriched} of {df_matched['Ticker'].nunique() + df_missed['Ticker'].nunique()} tickers")
+    for change, count in changes["Change"].value_counts().items():
+        print(f"   {change}: {count}")
+
+    sector_matched = core.sector_summary(df_matched)
+    sector_missed = core.sector_summary(df_missed)
+
+    sheets = {
+        "changes": changes,
+        "sector_matched": sector_matched,
+        "sector_missed": sector_missed,
+        "matched": df_matched,
+        "missed": df_missed
+    }
+    charts = [
+        sector_chart("sector_matched", "Sector Distribution (Matched)", len(sector_matched)),
+        sector_chart("sector_missed", "Sector Distribution (Missed)", len(sector_missed))
+    ]
+
+    print(f"💾 Saving report ({args.backend})...")
+    write_report(sheets, charts, args.output, backend=args.backend)
+
+    print("✅ Done!")
@@ -0,0 +1,166 @@
+import os
+
+import pandas as pd
+
+# ==========================================================
+# SCREENER REPORT WRITERS
+# ==========================================================
+# A report is an ordered {sheet_name: DataFrame} plus a list of bar
+# charts, each described once as a dict:
+#   {"sheet": ..., "title": ..., "x_title": ..., "y_title": ...,
+#    "anchor": "E2", "rows": <data rows>}
+# where column A holds the categories and column B the values.
+# Every backend renders the charts with its own native API.
+
+CHART_WIDTH_CM = 20
+CHART_HEIGHT_CM = 10
+PIXELS_PER_CM = 37.8
+
+
+def sector_chart(sheet, title, rows):
+    return {
+        "sheet": sheet,
+        "title": title,
+        "x_title": "Sector",
+        "y_title": "Stock Count",
+        "anchor": "E2",
+        "rows": rows
+    }
+
+
+def write_openpyxl(sheets, charts, path):
+
+    from openpyxl.chart import BarChart, Reference
+
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+        workbook = writer.book
+
+        for spec in charts:
+            ws = workbook[spec["sheet"]]
+
+            bar = BarChart()
+            bar.title = spec["title"]
+            bar.y_axis.title = spec["y_title"]
+            bar.x_axis.title = spec["x_title"]
+            bar.height = CHART_HEIGHT_CM
+            bar.width = CHART_WIDTH_CM
+
+            data = Reference(ws, min_col=2, min_row=1, max_row=spec["rows"] + 1)
+            categories = Reference(ws, min_col=1, min_row=2, max_row=spec["rows"] + 1)
+
+            bar.add_data(data, titles_from_data=True)
+            bar.set_categories(categories)
+
+            ws.add_chart(bar, spec["anchor"])
+
+    return [path]
+
+
+def _excel_rows(df):
+    # xlsxwriter writes None as an empty cell; NaN/NaT would be errors
+    values = df.astype(object).where(df.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def write_xlsxwriter(sheets, charts, path):
+    """
+    Row-by-row writer in xlsxwriter's constant_memory mode: each row is
+    flushed to disk as soon as the next one starts, so memory stays flat
+    however large the matched/missed sheets get.
+    """
+
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center"})
+
+    try:
+        worksheets = {}
+
+        for name, df in sheets.items():
+            ws = workbook.add_worksheet(name)
+            ws.write_row(0, 0, [str(c) for c in df.columns], header_format)
+
+            for r, row in enumerate(_excel_rows(df), start=1):
+                ws.write_row(r, 0, row)
+
+            worksheets[name] = ws
+
+        for spec in charts:
+            n = spec["rows"]
+            chart = workbook.add_chart({"type": "column"})
+            chart.add_series({
+                "name": [spec["sheet"], 0, 1],
+                "categories": [spec["sheet"], 1, 0, n, 0],
+                "values": [spec["sheet"], 1, 1, n, 1]
+            })
+            chart.set_title({"name": spec["title"]})
+            chart.set_x_axis({"name": spec["x_title"]})
+            chart.set_y_axis({"name": spec["y_title"]})
+            chart.set_size({
+                "width": int(CHART_WIDTH_CM * PIXELS_PER_CM),
+                "height": int(CHART_HEIGHT_CM * PIXELS_PER_CM)
+            })
+
+            worksheets[spec["sheet"]].insert_chart(spec["anchor"], chart)
+
+    finally:
+        workbook.close()
+
+    return [path]
+
+
+def _table_dir(path):
+    base, _ = os.path.splitext(path)
+    os.makedirs(base, exist_ok=True)
+    return base
+
+
+def write_parquet(sheets, charts, path):
+    """
+    One Parquet file per sheet in a directory named after the report.
+    Charts have no Parquet equivalent and are skipped; the chart source
+    data is already in the sector_* tables.
+    """
+
+    out_dir = _table_dir(path)
+    written = []
+
+    for name, df in sheets.items():
+        target = os.path.join(out_dir, f"{name}.parquet")
+        df.to_parquet(target, index=False)
+        written.append(target)
+
+    return written
+
+
+def write_csv(sheets, charts, path):
+
+    out_dir = _table_dir(path)
+    written = []
+
+    for name, df in sheets.items():
+        target = os.path.join(out_dir, f"{name}.csv")
+        df.to_csv(target, index=False)
+        written.append(target)
+
+    return written
+
+
+REPORT_WRITERS = {
+    "openpyxl": write_openpyxl,
+    "xlsxwriter": write_xlsxwriter,
+    "parquet": write_parquet,
+    "csv": write_csv,
+}
+
+
+def write_report(sheets, charts, path, backend="openpyxl"):
+    if backend not in REPORT_WRITERS:
+        raise ValueError(f"Unknown report backend {backend!r}, expected one of {sorted(REPORT_WRITERS)}")
+
+    return REPORT_WRITERS[backend](sheets, charts, path)
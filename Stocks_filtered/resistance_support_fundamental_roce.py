@@ -1,21 +1,28 @@
-from elasticsearch import Elasticsearch
+import argparse
+import os
+
 import pandas as pd
-import numpy as np
-from datetime import datetime
+
+from Stocks_filtered import screener_core as core
+from Stocks_filtered.fundamentals_cache import FundamentalsCache
+from Stocks_filtered.report_writers import sector_chart, write_report
 
 # ==========================================================
 # CONFIG
 # ==========================================================
-ES_HOST = "http://localhost:9200"
-TECH_INDEX = "nifty_data_weekly"
-FUND_INDEX = "nifty_fundamental"
-SCAN_DATE = "2026-02-09"
-OUTPUT_FILE = "support_resistance_scan.xlsx"
+# Scan, fundamentals and scoring live in screener_core; this screener is
+# the ROCE/ROE quality-band profile plus the six-sheet report.
+#
+# Run from the repo root:
+#   python -m Stocks_filtered.resistance_support_fundamental_roce
+PROFILE = core.ROCE_PROFILE
+OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "support_resistance_scan.xlsx")
 
-es = Elasticsearch(ES_HOST)
+# openpyxl | xlsxwriter (constant memory) | parquet | csv
+REPORT_BACKEND = "openpyxl"
 
 # ==========================================================
-# UTILITY FUNCTIONS
+# STATIC DATA — INDICES
 # ==========================================================
 
 df_indices = pd.DataFrame({
@@ -79,262 +86,6 @@ df_mf = pd.DataFrame({
     ]
 })
 
-def calculate_growth(current, previous):
-    if previous in [0, None]:
-        return np.nan
-    return round(((current - previous) / previous) * 100, 2)
-
-
-def calculate_slope(values):
-    if len(values) < 5:
-        return np.nan
-    x = np.arange(len(values))
-    slope = np.polyfit(x, values, 1)[0]
-    return round(slope, 2)
-
-
-# ==========================================================
-# QUALITY SCORING
-# ==========================================================
-
-def score_roce(roce):
-    if roce < 0:
-        return -4
-    elif 0 <= roce < 5:
-        return -3
-    elif 5 <= roce < 8:
-        return -1
-    elif 8 <= roce < 12:
-        return 1
-    elif 12 <= roce < 18:
-        return 2
-    elif 18 <= roce < 25:
-        return 3
-    else:
-        return 4
-
-
-def score_roe(roe):
-    if roe < 0:
-        return -3
-    elif 0 <= roe < 8:
-        return -1
-    elif 8 <= roe < 15:
-        return 1
-    elif 15 <= roe < 20:
-        return 2
-    else:
-        return 3
-
-
-# ==========================================================
-# FINAL NET SCORE
-# ==========================================================
-
-def calculate_net_score(row):
-
-    score = 0
-
-    # Earnings Momentum
-    score += 1 if row["Sales_QoQ_%"] > 0 else -1
-    score += 1 if row["Profit_QoQ_%"] > 0 else -1
-    score += 1 if row["EPS_QoQ_%"] > 0 else -1
-
-    score += 2 if row["Sales_YoY_%"] > 0 else -2
-    score += 2 if row["Profit_YoY_%"] > 0 else -2
-    score += 2 if row["EPS_YoY_%"] > 0 else -2
-
-    score += 2 if row["Sales_Slope_5Q"] > 0 else -2
-    score += 2 if row["Profit_Slope_5Q"] > 0 else -2
-
-    # Quality
-    score += score_roce(row["ROCE"])
-    score += score_roe(row["ROE"])
-
-    return score
-
-
-# ==========================================================
-# TECHNICAL SCAN
-# ==========================================================
-
-def fetch_matched_and_all():
-
-    query1 = {
-        "track_total_hits": True,
-        "size": 1000,
-        "_source": ["ticker", "crossed_resistance", "close", "date"],
-        "query": {
-            "bool": {
-                "must": [
-                    {"range": {"crossed_resistance.support_distance_pct": {"lte": 10}}},
-                    {"term": {"vcp_trend_template": True}},
-                    {"term": {"date": SCAN_DATE}}
-                ]
-            }
-        }
-    }
-
-    res1 = es.search(index=TECH_INDEX, body=query1)
-    hits1 = res1["hits"]["hits"]
-
-    rows1 = []
-    date_value = None
-
-    for h in hits1:
-        src = h["_source"]
-        ticker = src["ticker"].replace(".NS", "")
-        close = src.get("close")
-        date_value = src.get("date")
-
-        for cr in src.get("crossed_resistance", []):
-            rows1.append({
-                "Ticker": ticker,
-                "Support": cr.get("support_level"),
-                "Resistance": cr.get("resistance_level"),
-                "Close": close
-            })
-
-    df_matched = pd.DataFrame(rows1)
-
-    query2 = {
-        "track_total_hits": True,
-        "size": 1000,
-        "_source": ["ticker", "crossed_resistance", "close"],
-        "query": {
-            "bool": {
-                "must": [
-                    {"term": {"vcp_trend_template": True}},
-                    {"term": {"date": date_value}}
-                ]
-            }
-        }
-    }
-
-    res2 = es.search(index=TECH_INDEX, body=query2)
-    hits2 = res2["hits"]["hits"]
-
-    rows2 = []
-
-    for h in hits2:
-        src = h["_source"]
-        ticker = src["ticker"].replace(".NS", "")
-        close = src.get("close")
-
-        for cr in src.get("crossed_resistance", []):
-            rows2.append({
-                "Ticker": ticker,
-                "Support": cr.get("support_level"),
-                "Resistance": cr.get("resistance_level"),
-                "Close": close
-            })
-
-    df_all = pd.DataFrame(rows2)
-
-    matched_tickers = set(df_matched["Ticker"])
-    df_missed = df_all[~df_all["Ticker"].isin(matched_tickers)]
-
-    return df_matched, df_missed
-
-
-# ==========================================================
-# FUNDAMENTAL ENRICHMENT
-# ==========================================================
-
-def get_fundamental_data(ticker):
-
-    empty_result = {
-        "Sector": np.nan,
-        "Industry": np.nan,
-        "ROCE": 0,
-        "ROE": 0,
-        "Sales_QoQ_%": 0,
-        "Profit_QoQ_%": 0,
-        "EPS_QoQ_%": 0,
-        "Sales_YoY_%": 0,
-        "Profit_YoY_%": 0,
-        "EPS_YoY_%": 0,
-        "Sales_Slope_5Q": 0,
-        "Profit_Slope_5Q": 0
-    }
-
-    try:
-        res = es.get(index=FUND_INDEX, id=ticker)
-        src = res["_source"]
-
-        sector = src.get("sector", {}).get("sector")
-        industry = src.get("sector", {}).get("industry")
-
-        ratios = src.get("ratios", {})
-        roce = ratios.get("roce", 0)
-        roe = ratios.get("roe", 0)
-
-        quarterly = src.get("quarterly", [])
-
-        sales, profits, eps = [], [], []
-
-        for q in quarterly:
-            if q["metric"] == "Sales" or q["metric"] == "Revenue":
-                sales.append((q["period_date"], q["value"]))
-            elif q["metric"] == "Net Profit":
-                profits.append((q["period_date"], q["value"]))
-            elif q["metric"] == "EPS in Rs":
-                eps.append((q["period_date"], q["value"]))
-
-        sales = sorted(sales)
-        profits = sorted(profits)
-        eps = sorted(eps)
-
-        if len(sales) < 5 or len(profits) < 5 or len(eps) < 5:
-            empty_result["Sector"] = sector
-            empty_result["Industry"] = industry
-            empty_result["ROCE"] = roce
-            empty_result["ROE"] = roe
-            return empty_result
-
-        sales_vals = [v for _, v in sales][-5:]
-        profit_vals = [v for _, v in profits][-5:]
-        eps_vals = [v for _, v in eps][-5:]
-
-        return {
-            "Sector": sector,
-            "Industry": industry,
-            "ROCE": roce,
-            "ROE": roe,
-            "Sales_QoQ_%": calculate_growth(sales_vals[-1], sales_vals[-2]),
-            "Profit_QoQ_%": calculate_growth(profit_vals[-1], profit_vals[-2]),
-            "EPS_QoQ_%": calculate_growth(eps_vals[-1], eps_vals[-2]),
-            "Sales_YoY_%": calculate_growth(sales_vals[-1], sales_vals[0]),
-            "Profit_YoY_%": calculate_growth(profit_vals[-1], profit_vals[0]),
-            "EPS_YoY_%": calculate_growth(eps_vals[-1], eps_vals[0]),
-            "Sales_Slope_5Q": calculate_slope(sales_vals),
-            "Profit_Slope_5Q": calculate_slope(profit_vals)
-        }
-
-    except Exception:
-        return empty_result
-
-
-def enrich_dataframe(df):
-
-    unique_tickers = df["Ticker"].unique()
-    fundamentals = []
-
-    for ticker in unique_tickers:
-        data = get_fundamental_data(ticker)
-        data["Ticker"] = ticker
-        fundamentals.append(data)
-
-    fund_df = pd.DataFrame(fundamentals)
-
-    df = df.merge(fund_df, on="Ticker", how="left")
-
-    df["Net_Score"] = df.apply(calculate_net_score, axis=1)
-
-    df = df.sort_values(by="Net_Score", ascending=False)
-
-    return df
-
 
 # ==========================================================
 # MAIN
@@ -342,86 +93,54 @@ def enrich_dataframe(df):
 
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description="Weekly support/resistance scan with ROCE/ROE scoring")
+    parser.add_argument("--sector-summary", action="store_true",
+                        help="only count stocks per sector with an ES aggregation; no fundamentals pull")
+    core.add_es_arguments(parser)
+    args = parser.parse_args()
+    core.configure_from_args(args)
+
     print("🔎 Running technical scan...")
-    df_matched, df_missed = fetch_matched_and_all()
+    df_matched, df_missed = core.fetch_matched_and_all(core.SCAN_DATE)
+
+    if args.sector_summary:
+        summary = core.sector_summaries_es({
+            "matched": df_matched["Ticker"].unique(),
+            "missed": df_missed["Ticker"].unique()
+        })
+        for name, df in summary.items():
+            print(f"\n📊 Stocks per sector ({name}):")
+            print(df.to_string(index=False))
+        raise SystemExit
 
     print("📊 Enriching with fundamentals...")
-    df_matched = enrich_dataframe(df_matched)
-    df_missed = enrich_dataframe(df_missed)
-
-    # Sector summary for matched
-    sector_matched = (
-        df_matched
-        .groupby("Sector")["Ticker"]
-        .count()
-        .reset_index()
-        .rename(columns={"Ticker": "Stock_Count"})
-        .sort_values(by="Stock_Count", ascending=False)
-    )
-
-    # Sector summary for missed
-    sector_missed = (
-        df_missed
-        .groupby("Sector")["Ticker"]
-        .count()
-        .reset_index()
-        .rename(columns={"Ticker": "Stock_Count"})
-        .sort_values(by="Stock_Count", ascending=False)
-    )
-
-    print("💾 Saving Excel...")
-
-    from openpyxl.chart import PieChart, Reference
-
-    with pd.ExcelWriter(OUTPUT_FILE, engine="openpyxl") as writer:
-
-        # Write sheets
-        sector_matched.to_excel(writer, sheet_name="sector_matched", index=False)
-        sector_missed.to_excel(writer, sheet_name="sector_missed", index=False)
-        df_indices.to_excel(writer, sheet_name="indices", index=False)
-        df_mf.to_excel(writer, sheet_name="MF", index=False)
-        df_matched.to_excel(writer, sheet_name="matched", index=False)
-        df_missed.to_excel(writer, sheet_name="missed", index=False)
-
-        workbook = writer.book
-
-        from openpyxl.chart import BarChart, Reference
-
-        # -------- BAR CHART FOR MATCHED --------
-        ws_matched = workbook["sector_matched"]
-
-        bar1 = BarChart()
-        bar1.title = "Sector Distribution (Matched)"
-        bar1.y_axis.title = "Stock Count"
-        bar1.x_axis.title = "Sector"
-        bar1.height = 10
-        bar1.width = 20
-
-        data1 = Reference(ws_matched, min_col=2, min_row=1, max_row=len(sector_matched) + 1)
-        categories1 = Reference(ws_matched, min_col=1, min_row=2, max_row=len(sector_matched) + 1)
-
-        bar1.add_data(data1, titles_from_data=True)
-        bar1.set_categories(categories1)
-
-        ws_matched.add_chart(bar1, "E2")
-
-        # -------- BAR CHART FOR MISSED --------
-        ws_missed = workbook["sector_missed"]
-
-        bar2 = BarChart()
-        bar2.title = "Sector Distribution (Missed)"
-        bar2.y_axis.title = "Stock Count"
-        bar2.x_axis.title = "Sector"
-        bar2.height = 10
-        bar2.width = 20
-
-        data2 = Reference(ws_missed, min_col=2, min_row=1, max_row=len(sector_missed) + 1)
-        categories2 = Reference(ws_missed, min_col=1, min_row=2, max_row=len(sector_missed) + 1)
-
-        bar2.add_data(data2, titles_from_data=True)
-        bar2.set_categories(categories2)
+    with FundamentalsCache(core.FUND_CACHE_FILE, ttl=core.FUND_CACHE_TTL,
+                           max_entries=core.FUND_CACHE_MAX_ENTRIES,
+                           fields=core.FUND_SOURCE_FIELDS) as cache:
+        (df_matched, df_missed), fund_latency = core.enrich_frames(
+            df_matched, df_missed, profile=PROFILE, cache=cache
+        )
+    print(f"   fundamentals fetch ({core.FUND_FETCH_MODE}): {fund_latency}")
+
+    sector_matched = core.sector_summary(df_matched)
+    sector_missed = core.sector_summary(df_missed)
+
+    print(f"💾 Saving report ({REPORT_BACKEND})...")
+
+    sheets = {
+        "sector_matched": sector_matched,
+        "sector_missed": sector_missed,
+        "indices": df_indices,
+        "MF": df_mf,
+        "matched": df_matched,
+        "missed": df_missed
+    }
+    charts = [
+        sector_chart("sector_matched", "Sector Distribution (Matched)", len(sector_matched)),
+        sector_chart("sector_missed", "Sector Distribution (Missed)", len(sector_missed))
+    ]
 
-        ws_missed.add_chart(bar2, "E2")
+    write_report(sheets, charts, OUTPUT_FILE, backend=REPORT_BACKEND)
 
     print("✅ Done!")
 
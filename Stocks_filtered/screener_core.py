@@ -0,0 +1,1105 @@
+import pandas as pd
+import numpy as np
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# ==========================================================
+# SHARED SCREENER CORE
+# ==========================================================
+# Technical scan, fundamentals I/O, feature building and Net_Score for
+# the support/resistance screeners. Scripts only pick a ScoringProfile.
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+ES_HOST = os.environ.get("ES_HOST", "http://localhost:9200")
+TECH_INDEX = os.environ.get("TECH_INDEX", "nifty_data_weekly")
+FUND_INDEX = os.environ.get("FUND_INDEX", "nifty_fundamental")
+FEATURES_INDEX = os.environ.get("FEATURES_INDEX", "nifty_fundamental_features")
+SCAN_DATE = "2026-02-09"
+
+# shared client: pool sized for the mget workers, gzip on the wire,
+# timeouts retried instead of failing the whole scan
+ES_CONNECTIONS_PER_NODE = int(os.environ.get("ES_CONNECTIONS_PER_NODE", 16))
+ES_REQUEST_TIMEOUT = float(os.environ.get("ES_REQUEST_TIMEOUT", 30))
+ES_MAX_RETRIES = int(os.environ.get("ES_MAX_RETRIES", 3))
+ES_HTTP_COMPRESS = os.environ.get("ES_HTTP_COMPRESS", "1") != "0"
+
+# search_after page size and point-in-time keep alive for the weekly scan
+SCAN_PAGE_SIZE = 1000
+PIT_KEEP_ALIVE = "2m"
+
+# flattened crossed_resistance frame, one row per level
+SCAN_COLUMNS = ["Ticker", "Support", "Resistance", "Close"]
+
+# matched rule: any crossed level within this % of its support
+SUPPORT_DISTANCE_MAX = 10
+
+# fetch the VCP universe once and split matched/missed client-side
+SINGLE_PASS_SCAN = True
+
+# feature groups and how many quarters feed QoQ/YoY/slope
+FEATURE_GROUPS = ["Sales", "Profit", "EPS"]
+SLOPE_GROUPS = ["Sales", "Profit"]
+FEATURE_QUARTERS = 5
+
+# threads issuing mget chunks in parallel against the shared client
+FUND_FETCH_WORKERS = 4
+
+# on-disk fundamentals cache: served without ES inside the TTL,
+# revalidated by _seq_no after it
+FUND_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fundamentals_cache.sqlite")
+FUND_CACHE_TTL = 24 * 3600
+FUND_CACHE_MAX_ENTRIES = 5000
+
+# mget batch size and the only fundamentals fields the scoring reads
+FUND_MGET_CHUNK = 200
+FUND_SUMMARY_FIELDS = [
+    "sector.sector",
+    "sector.industry",
+    "ratios.roce",
+    "ratios.roe"
+]
+FUND_SOURCE_FIELDS = FUND_SUMMARY_FIELDS + [
+    "quarterly.metric",
+    "quarterly.period_date",
+    "quarterly.value"
+]
+
+# keyword field the sector terms aggregation buckets on (the .keyword
+# sub-field dynamic mapping adds to sector.sector)
+FUND_SECTOR_FIELD = "sector.sector.keyword"
+SECTOR_AGG_SIZE = 100
+
+# "includes" ships every quarter of the scored metrics; "script" has a
+# Painless script field cut them down to the last FEATURE_QUARTERS per
+# metric on the data node (no fundamentals cache in that mode);
+# "features" reads what feature_materializer precomputed into
+# FEATURES_INDEX and only computes tickers missing there
+FUND_FETCH_MODE = "includes"
+FUND_FETCH_MODES = ("includes", "script", "features")
+
+RECENT_QUARTERS_SCRIPT = """
+def rows = params['_source'].quarterly;
+def out = new ArrayList();
+if (rows == null) { return out; }
+def byMetric = new HashMap();
+for (def q : rows) {
+    if (params.metrics.contains(q.metric)) {
+        byMetric.computeIfAbsent(q.metric, k -> new ArrayList()).add(q);
+    }
+}
+for (def series : byMetric.values()) {
+    series.sort((a, b) -> a.period_date.compareTo(b.period_date));
+    out.addAll(series.subList(Math.max(0, series.size() - params.n), series.size()));
+}
+return out;
+"""
+
+# ==========================================================
+# ELASTICSEARCH CLIENT
+# ==========================================================
+# Created on first use, not at import, and shared by every thread.
+
+_es = None
+_es_lock = threading.Lock()
+
+
+def get_es():
+    global _es
+
+    if _es is None:
+        with _es_lock:
+            if _es is None:
+                from elasticsearch import Elasticsearch
+
+                _es = Elasticsearch(
+                    ES_HOST,
+                    connections_per_node=ES_CONNECTIONS_PER_NODE,
+                    http_compress=ES_HTTP_COMPRESS,
+                    request_timeout=ES_REQUEST_TIMEOUT,
+                    max_retries=ES_MAX_RETRIES,
+                    retry_on_timeout=True,
+                    retry_on_status=(429, 502, 503, 504)
+                )
+    return _es
+
+
+def set_es(client):
+    """
+    Use `client` (e.g. the local fake) instead of building one from ES_HOST.
+    """
+    global _es
+    _es = client
+
+
+def configure(host=None, tech_index=None, fund_index=None, features_index=None):
+    """
+    Override the connection target and index names; a changed host drops
+    the current client so the next call reconnects.
+    """
+    global ES_HOST, TECH_INDEX, FUND_INDEX, FEATURES_INDEX
+
+    if host and host != ES_HOST:
+        ES_HOST = host
+        set_es(None)
+    if tech_index:
+        TECH_INDEX = tech_index
+    if fund_index:
+        FUND_INDEX = fund_index
+    if features_index:
+        FEATURES_INDEX = features_index
+
+
+def add_es_arguments(parser):
+    parser.add_argument("--es-host", default=None, help=f"default: {ES_HOST} (env ES_HOST)")
+    parser.add_argument("--tech-index", default=None, help=f"default: {TECH_INDEX} (env TECH_INDEX)")
+    parser.add_argument("--fund-index", default=None, help=f"default: {FUND_INDEX} (env FUND_INDEX)")
+    parser.add_argument("--features-index", default=None,
+                        help=f"default: {FEATURES_INDEX} (env FEATURES_INDEX)")
+
+
+def configure_from_args(args):
+    configure(args.es_host, args.tech_index, args.fund_index, args.features_index)
+
+
+# ==========================================================
+# UTILITY FUNCTIONS
+# ==========================================================
+
+def calculate_growth(current, previous):
+    if previous in [0, None]:
+        return np.nan
+    return round(((current - previous) / previous) * 100, 2)
+
+
+def calculate_slope(values):
+    if len(values) < 5:
+        return np.nan
+    x = np.arange(len(values))
+    slope = np.polyfit(x, values, 1)[0]
+    return round(slope, 2)
+
+
+def is_continuous_quarters(dates):
+    for i in range(1, len(dates)):
+        d1 = datetime.strptime(dates[i - 1], "%Y-%m")
+        d2 = datetime.strptime(dates[i], "%Y-%m")
+        diff = (d2.year - d1.year) * 12 + (d2.month - d1.month)
+        if diff != 3:
+            return False
+    return True
+
+
+# ==========================================================
+# QUALITY SCORING
+# ==========================================================
+
+def score_roce(roce):
+    if roce < 0:
+        return -4
+    elif 0 <= roce < 5:
+        return -3
+    elif 5 <= roce < 8:
+        return -1
+    elif 8 <= roce < 12:
+        return 1
+    elif 12 <= roce < 18:
+        return 2
+    elif 18 <= roce < 25:
+        return 3
+    else:
+        return 4
+
+
+def score_roe(roe):
+    if roe < 0:
+        return -3
+    elif 0 <= roe < 8:
+        return -1
+    elif 8 <= roe < 15:
+        return 1
+    elif 15 <= roe < 20:
+        return 2
+    else:
+        return 3
+
+
+# ==========================================================
+# SCORING PROFILES
+# ==========================================================
+
+FEATURE_COLUMNS = (
+    [f"{g}_QoQ_%" for g in FEATURE_GROUPS]
+    + [f"{g}_YoY_%" for g in FEATURE_GROUPS]
+    + [f"{g}_Slope_5Q" for g in SLOPE_GROUPS]
+)
+
+
+class ScoringProfile:
+    """
+    Everything that differs between the screeners: which quarterly metrics
+    count as sales, which ratios are pulled, what a missing feature is
+    filled with, and how the Net_Score is weighted.
+
+    sign_weights: column -> weight, +weight when the value is > 0 and
+        -weight otherwise (NaN counts as not positive).
+    band_scores: column -> (band edges, score per band); a band is
+        [edge_i, edge_i+1) and NaN lands in the last band, matching the
+        else branch of the row-wise ladders in band_ladders.
+    """
+
+    def __init__(self, name, sign_weights, sales_metrics=("Sales",), ratio_fields=None,
+                 band_scores=None, band_ladders=None, missing_value=np.nan,
+                 fill_missing_scores=False):
+        self.name = name
+        self.sign_weights = sign_weights
+        self.ratio_fields = ratio_fields or {}
+        self.band_scores = band_scores or {}
+        self.band_ladders = band_ladders or {}
+        self.missing_value = missing_value
+        self.fill_missing_scores = fill_missing_scores
+
+        self.feature_metrics = {m: "Sales" for m in sales_metrics}
+        self.feature_metrics.update({"Net Profit": "Profit", "EPS in Rs": "EPS"})
+
+    def __repr__(self):
+        return f"ScoringProfile({self.name!r})"
+
+
+# QoQ ±1, YoY ±2, slope ±3; missing features become 0 before scoring
+PLAIN_PROFILE = ScoringProfile(
+    name="plain",
+    sign_weights={
+        "Sales_QoQ_%": 1,
+        "Profit_QoQ_%": 1,
+        "EPS_QoQ_%": 1,
+        "Sales_YoY_%": 2,
+        "Profit_YoY_%": 2,
+        "EPS_YoY_%": 2,
+        "Sales_Slope_5Q": 3,
+        "Profit_Slope_5Q": 3
+    },
+    fill_missing_scores=True
+)
+
+# Earnings momentum (slope ±2) plus ROCE/ROE quality bands
+ROCE_PROFILE = ScoringProfile(
+    name="roce",
+    sign_weights={
+        "Sales_QoQ_%": 1,
+        "Profit_QoQ_%": 1,
+        "EPS_QoQ_%": 1,
+        "Sales_YoY_%": 2,
+        "Profit_YoY_%": 2,
+        "EPS_YoY_%": 2,
+        "Sales_Slope_5Q": 2,
+        "Profit_Slope_5Q": 2
+    },
+    sales_metrics=("Sales", "Revenue"),
+    ratio_fields={"ROCE": "roce", "ROE": "roe"},
+    band_scores={
+        "ROCE": ([0, 5, 8, 12, 18, 25], [-4, -3, -1, 1, 2, 3, 4]),
+        "ROE": ([0, 8, 15, 20], [-3, -1, 1, 2, 3])
+    },
+    band_ladders={"ROCE": score_roce, "ROE": score_roe},
+    missing_value=0
+)
+
+PROFILES = {p.name: p for p in (PLAIN_PROFILE, ROCE_PROFILE)}
+
+
+# ==========================================================
+# NET SCORE
+# ==========================================================
+
+def calculate_net_score(row, profile=ROCE_PROFILE):
+    """
+    Row-wise reference scorer; calculate_net_scores is what the screeners run.
+    """
+
+    score = 0
+
+    for col, weight in profile.sign_weights.items():
+        score += weight if row[col] > 0 else -weight
+
+    for col, ladder in profile.band_ladders.items():
+        score += ladder(row[col])
+
+    return score
+
+
+def calculate_net_scores(df, profile=ROCE_PROFILE):
+    """
+    Column-wise equivalent of df.apply(calculate_net_score, axis=1).
+    """
+
+    score = np.zeros(len(df), dtype=np.int64)
+
+    for col, weight in profile.sign_weights.items():
+        values = df[col].to_numpy(dtype=float)
+        score += np.where(values > 0, weight, -weight)
+
+    for col, (edges, scores) in profile.band_scores.items():
+        values = df[col].to_numpy(dtype=float)
+        score += np.asarray(scores, dtype=np.int64)[np.digitize(values, edges)]
+
+    return pd.Series(score, index=df.index)
+
+
+# ==========================================================
+# TECHNICAL SCAN
+# ==========================================================
+
+def iter_hits(query, index=None, page_size=SCAN_PAGE_SIZE):
+    """
+    Yield every matching `_source` doc, one page at a time, using
+    search_after over a point-in-time. Falls back to scroll when the
+    cluster does not support PIT.
+    """
+    for h in iter_search_hits(query, index, page_size):
+        yield h["_source"]
+
+
+def iter_search_hits(query, index=None, page_size=SCAN_PAGE_SIZE):
+    """
+    iter_hits, but yielding whole hits (_id, _seq_no, ...) rather than
+    just their _source.
+    """
+
+    index = index or TECH_INDEX
+    es = get_es()
+    body = {k: v for k, v in query.items() if k not in ("size", "track_total_hits")}
+
+    try:
+        pit_id = es.open_point_in_time(index=index, keep_alive=PIT_KEEP_ALIVE)["id"]
+    except Exception:
+        yield from _iter_hits_scroll(body, index, page_size)
+        return
+
+    try:
+        search_after = None
+
+        while True:
+            page = {
+                **body,
+                "size": page_size,
+                "track_total_hits": False,
+                "pit": {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE},
+                "sort": [{"_shard_doc": "asc"}]
+            }
+            if search_after is not None:
+                page["search_after"] = search_after
+
+            res = es.search(body=page)
+            pit_id = res.get("pit_id", pit_id)
+            hits = res["hits"]["hits"]
+
+            yield from hits
+
+            if len(hits) < page_size:
+                break
+
+            search_after = hits[-1]["sort"]
+
+    finally:
+        try:
+            es.close_point_in_time(id=pit_id)
+        except Exception:
+            pass
+
+
+def _iter_hits_scroll(body, index, page_size):
+
+    es = get_es()
+    res = es.search(index=index, body={**body, "size": page_size}, scroll=PIT_KEEP_ALIVE)
+    scroll_id = res.get("_scroll_id")
+
+    try:
+        while res["hits"]["hits"]:
+            yield from res["hits"]["hits"]
+
+            res = es.scroll(scroll_id=scroll_id, scroll=PIT_KEEP_ALIVE)
+            scroll_id = res.get("_scroll_id", scroll_id)
+
+    finally:
+        if scroll_id:
+            try:
+                es.clear_scroll(scroll_id=scroll_id)
+            except Exception:
+                pass
+
+
+class LevelColumns:
+    """
+    Flattened crossed_resistance levels kept as one list per column and
+    filled straight from the hit stream, instead of a dict per level.
+    """
+
+    def __init__(self):
+        self.ticker, self.support, self.resistance, self.close = [], [], [], []
+
+    def add(self, src):
+        levels = src.get("crossed_resistance", [])
+        n = len(levels)
+        if not n:
+            return
+
+        self.ticker += [src["ticker"].replace(".NS", "")] * n
+        self.close += [src.get("close")] * n
+        self.support += [cr.get("support_level") for cr in levels]
+        self.resistance += [cr.get("resistance_level") for cr in levels]
+
+    def to_frame(self):
+        return pd.DataFrame({
+            "Ticker": self.ticker,
+            "Support": self.support,
+            "Resistance": self.resistance,
+            "Close": self.close
+        }, columns=SCAN_COLUMNS)
+
+
+def flatten_crossed_resistance(sources):
+
+    columns = LevelColumns()
+
+    for src in sources:
+        columns.add(src)
+
+    return columns.to_frame()
+
+
+def is_support_matched(src, max_pct=SUPPORT_DISTANCE_MAX):
+    # Same semantics as the range query on an object array: any level counts
+    return any(
+        cr.get("support_distance_pct") is not None and cr["support_distance_pct"] <= max_pct
+        for cr in src.get("crossed_resistance", [])
+    )
+
+
+def split_crossed_resistance(sources):
+    """
+    One pass over the VCP universe: rows of docs passing the matched rule
+    go to matched, rows of every other ticker go to missed.
+    """
+
+    matched, other = LevelColumns(), LevelColumns()
+
+    for src in sources:
+        if is_support_matched(src):
+            matched.add(src)
+        else:
+            other.add(src)
+
+    df_matched = matched.to_frame()
+    df_other = other.to_frame()
+
+    matched_tickers = set(df_matched["Ticker"])
+    df_missed = df_other[~df_other["Ticker"].isin(matched_tickers)]
+
+    return df_matched, df_missed
+
+
+def fetch_matched_and_all(scan_date=SCAN_DATE, single_pass=SINGLE_PASS_SCAN):
+
+    if single_pass:
+        query = {
+            "_source": ["ticker", "crossed_resistance", "close"],
+            "query": {
+                "bool": {
+                    "must": [
+                        {"term": {"vcp_trend_template": True}},
+                        {"term": {"date": scan_date}}
+                    ]
+                }
+            }
+        }
+
+        return split_crossed_resistance(iter_hits(query))
+
+    query1 = {
+        "_source": ["ticker", "crossed_resistance", "close"],
+        "query": {
+            "bool": {
+                "must": [
+                    {"range": {"crossed_resistance.support_distance_pct": {"lte": SUPPORT_DISTANCE_MAX}}},
+                    {"term": {"vcp_trend_template": True}},
+                    {"term": {"date": scan_date}}
+                ]
+            }
+        }
+    }
+
+    df_matched = flatten_crossed_resistance(iter_hits(query1))
+
+    query2 = {
+        "_source": ["ticker", "crossed_resistance", "close"],
+        "query": {
+            "bool": {
+                "must": [
+                    {"term": {"vcp_trend_template": True}},
+                    {"term": {"date": scan_date}}
+                ]
+            }
+        }
+    }
+
+    df_all = flatten_crossed_resistance(iter_hits(query2))
+
+    matched_tickers = set(df_matched["Ticker"])
+    df_missed = df_all[~df_all["Ticker"].isin(matched_tickers)]
+
+    return df_matched, df_missed
+
+
+# ==========================================================
+# FUNDAMENTAL ENRICHMENT
+# ==========================================================
+
+def empty_fundamental_result(profile=ROCE_PROFILE):
+    result = {"Sector": np.nan, "Industry": np.nan}
+    result.update({col: 0 for col in profile.ratio_fields})
+    result.update({col: profile.missing_value for col in FEATURE_COLUMNS})
+    return result
+
+
+def parse_fundamental_source(src, profile=ROCE_PROFILE):
+
+    result = empty_fundamental_result(profile)
+
+    try:
+        sector = src.get("sector", {})
+        ratios = src.get("ratios", {})
+
+        result["Sector"] = sector.get("sector")
+        result["Industry"] = sector.get("industry")
+        for col, field in profile.ratio_fields.items():
+            result[col] = ratios.get(field, 0)
+
+        series = {g: [] for g in FEATURE_GROUPS}
+
+        for q in src.get("quarterly", []):
+            group = profile.feature_metrics.get(q["metric"])
+            if group:
+                series[group].append((q["period_date"], q["value"]))
+
+        if any(len(s) < FEATURE_QUARTERS for s in series.values()):
+            return result
+
+        vals = {g: [v for _, v in sorted(s)][-FEATURE_QUARTERS:] for g, s in series.items()}
+
+        for g in FEATURE_GROUPS:
+            result[f"{g}_QoQ_%"] = calculate_growth(vals[g][-1], vals[g][-2])
+        for g in FEATURE_GROUPS:
+            result[f"{g}_YoY_%"] = calculate_growth(vals[g][-1], vals[g][0])
+        for g in SLOPE_GROUPS:
+            result[f"{g}_Slope_5Q"] = calculate_slope(vals[g])
+
+        return result
+
+    except Exception:
+        return empty_fundamental_result(profile)
+
+
+def get_fundamental_data(ticker, profile=ROCE_PROFILE):
+
+    try:
+        res = get_es().get(index=FUND_INDEX, id=ticker, _source_includes=FUND_SOURCE_FIELDS)
+        return parse_fundamental_source(res["_source"], profile)
+
+    except Exception:
+        return empty_fundamental_result(profile)
+
+
+def build_fundamental_features(sources, profile=ROCE_PROFILE):
+    """
+    Batch version of parse_fundamental_source for a {ticker: _source}
+    dict. The last FEATURE_QUARTERS values of every ticker and metric are
+    pivoted into one (ticker x metric x quarter) array and QoQ, YoY and
+    the 5-quarter slope are computed for all tickers at once. Tickers the array
+    path cannot represent exactly (short or non-finite history, malformed
+    docs) go through parse_fundamental_source instead.
+    """
+
+    if not sources:
+        return {}
+
+    tickers = list(sources)
+    n_metrics = len(FEATURE_GROUPS)
+    group_index = {g: i for i, g in enumerate(FEATURE_GROUPS)}
+
+    metric_group = {m: group_index[g] for m, g in profile.feature_metrics.items()}
+
+    rows = []
+    fallback = set()
+
+    for t, ticker in enumerate(tickers):
+        try:
+            rows += [
+                (t, metric_group[q["metric"]], q["period_date"], q["value"])
+                for q in sources[ticker].get("quarterly", [])
+                if q["metric"] in metric_group
+            ]
+        except Exception:
+            fallback.add(t)
+
+    # no scored quarterly row at all: the array path has nothing to pivot
+    if not rows:
+        return {ticker: parse_fundamental_source(src, profile) for ticker, src in sources.items()}
+
+    long_df = pd.DataFrame(rows, columns=["t", "g", "period_date", "value"])
+    long_df = long_df.sort_values(["t", "g", "period_date", "value"], kind="stable")
+
+    counts = np.zeros((len(tickers), n_metrics), dtype=np.int64)
+    grouped = long_df.groupby(["t", "g"]).size()
+    counts[grouped.index.get_level_values("t"), grouped.index.get_level_values("g")] = grouped.to_numpy()
+
+    window = long_df.groupby(["t", "g"]).tail(FEATURE_QUARTERS)
+    pos = window.groupby(["t", "g"]).cumcount().to_numpy()
+
+    values = np.full((len(tickers), n_metrics, FEATURE_QUARTERS), np.nan)
+    values[window["t"].to_numpy(), window["g"].to_numpy(), pos] = pd.to_numeric(
+        window["value"], errors="coerce"
+    ).to_numpy(dtype=float)
+
+    ok = (counts >= FEATURE_QUARTERS).all(axis=1) & np.isfinite(values).all(axis=(1, 2))
+    ok[list(fallback)] = False
+
+    last, prev, first = values[:, :, -1], values[:, :, -2], values[:, :, 0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        qoq = np.where(prev == 0, np.nan, np.round((last - prev) / prev * 100, 2))
+        yoy = np.where(first == 0, np.nan, np.round((last - first) / first * 100, 2))
+
+    # One least-squares solve with every series as a column gives bit-for-bit
+    # the same slopes as calling polyfit per ticker; the closed-form
+    # sum((x - x̄) * y) / sum((x - x̄)²) differs in the last ulp, which flips
+    # round(..., 2) on the many .xx5 slopes two-decimal inputs produce.
+    slope = np.full((len(tickers), n_metrics), np.nan)
+    if ok.any():
+        series = values[ok].reshape(-1, FEATURE_QUARTERS).T
+        fitted = np.polyfit(np.arange(FEATURE_QUARTERS), series, 1)[0]
+        slope[ok] = np.round(fitted.reshape(-1, n_metrics), 2)
+
+    results = {}
+
+    for t, ticker in enumerate(tickers):
+        src = sources[ticker]
+
+        if not ok[t]:
+            results[ticker] = parse_fundamental_source(src, profile)
+            continue
+
+        sector = src.get("sector", {})
+        ratios = src.get("ratios", {})
+
+        result = {"Sector": sector.get("sector"), "Industry": sector.get("industry")}
+        for col, field in profile.ratio_fields.items():
+            result[col] = ratios.get(field, 0)
+        for g in FEATURE_GROUPS:
+            result[f"{g}_QoQ_%"] = float(qoq[t, group_index[g]])
+        for g in FEATURE_GROUPS:
+            result[f"{g}_YoY_%"] = float(yoy[t, group_index[g]])
+        for g in SLOPE_GROUPS:
+            result[f"{g}_Slope_5Q"] = float(slope[t, group_index[g]])
+
+        results[ticker] = result
+
+    return results
+
+
+def _response_bytes(res):
+    # bytes on the wire (compressed with http_compress) when the transport
+    # reports them; re-serializing the body is only the fallback
+    headers = getattr(getattr(res, "meta", None), "headers", None) or {}
+    length = headers.get("content-length") or headers.get("Content-Length")
+    if length is not None:
+        return int(length)
+    return len(json.dumps(getattr(res, "body", res), default=str))
+
+
+def _record(start, res, latencies=None, payload=None):
+    if latencies is not None:
+        latencies.append(time.perf_counter() - start)
+    if payload is not None and res is not None:
+        payload.append(_response_bytes(res))
+
+
+def _mget_fundamentals(chunk, latencies=None, with_source=True, payload=None):
+
+    start = time.perf_counter()
+    res = None
+
+    try:
+        if with_source:
+            res = get_es().mget(index=FUND_INDEX, ids=chunk, _source_includes=FUND_SOURCE_FIELDS)
+        else:
+            res = get_es().mget(index=FUND_INDEX, ids=chunk, _source=False)
+        docs = res["docs"]
+    except Exception:
+        docs = []
+
+    _record(start, res, latencies, payload)
+
+    return {
+        doc["_id"]: doc
+        for doc in docs
+        if doc.get("found") and (not with_source or "_source" in doc)
+    }
+
+
+def _search_recent_quarters(chunk, profile=ROCE_PROFILE, latencies=None, payload=None):
+    """
+    Fundamentals for `chunk` with the quarterly list already trimmed
+    server-side to the last FEATURE_QUARTERS entries of each scored
+    metric. Returns mget-shaped {ticker: doc}.
+    """
+
+    body = {
+        "size": len(chunk),
+        "query": {"ids": {"values": chunk}},
+        "_source": FUND_SUMMARY_FIELDS,
+        "script_fields": {
+            "recent_quarterly": {
+                "script": {
+                    "lang": "painless",
+                    "source": RECENT_QUARTERS_SCRIPT,
+                    "params": {
+                        "metrics": sorted(profile.feature_metrics),
+                        "n": FEATURE_QUARTERS
+                    }
+                }
+            }
+        }
+    }
+
+    start = time.perf_counter()
+    res = None
+
+    try:
+        res = get_es().search(index=FUND_INDEX, body=body)
+        hits = res["hits"]["hits"]
+    except Exception:
+        hits = []
+
+    _record(start, res, latencies, payload)
+
+    return {
+        h["_id"]: {
+            "_id": h["_id"],
+            "_source": {
+                **h.get("_source", {}),
+                "quarterly": h.get("fields", {}).get("recent_quarterly", [])
+            }
+        }
+        for h in hits
+    }
+
+
+def _mget_features(chunk, profile=ROCE_PROFILE, versions=None, latencies=None, payload=None):
+    """
+    Materialized features for `chunk`. With `versions` ({ticker:
+    (_seq_no, _primary_term)} of the fundamentals docs), features computed
+    from another version of the doc are left out as if not materialized.
+    """
+
+    start = time.perf_counter()
+    res = None
+
+    try:
+        res = get_es().mget(
+            index=FEATURES_INDEX, ids=chunk,
+            _source_includes=["source_version", f"profiles.{profile.name}"]
+        )
+        docs = res["docs"]
+    except Exception:
+        docs = []
+
+    _record(start, res, latencies, payload)
+
+    results = {}
+    for doc in docs:
+        src = doc.get("_source", {}) if doc.get("found") else {}
+        features = src.get("profiles", {}).get(profile.name)
+
+        if versions is not None:
+            version = versions.get(doc["_id"])
+            if version is None or src.get("source_version") != f"{version[0]}:{version[1]}":
+                continue
+
+        if features is not None:
+            # NaN is stored as null
+            results[doc["_id"]] = {k: np.nan if v is None else v for k, v in features.items()}
+    return results
+
+
+def _fetch_chunked(fetch, tickers, chunk_size, max_workers):
+
+    # small universes still get split across every worker
+    chunk_size = max(1, min(chunk_size, math.ceil(len(tickers) / max(max_workers, 1))))
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+
+    docs = {}
+
+    if max_workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for chunk_docs in pool.map(fetch, chunks):
+                docs.update(chunk_docs)
+    else:
+        for chunk in chunks:
+            docs.update(fetch(chunk))
+
+    return docs
+
+
+def fetch_fundamental_docs(tickers, chunk_size=FUND_MGET_CHUNK, max_workers=FUND_FETCH_WORKERS):
+    """
+    {ticker: mget doc} with the scored _source fields and _seq_no.
+    """
+    return _fetch_chunked(_mget_fundamentals, list(dict.fromkeys(tickers)), chunk_size, max_workers)
+
+
+def get_fundamental_versions(tickers, chunk_size=FUND_MGET_CHUNK, max_workers=FUND_FETCH_WORKERS):
+    """
+    {ticker: (_seq_no, _primary_term)} from source-less mgets. Tickers
+    without a fundamentals doc are left out.
+    """
+
+    docs = _fetch_chunked(
+        lambda c: _mget_fundamentals(c, with_source=False),
+        list(dict.fromkeys(tickers)), chunk_size, max_workers
+    )
+    return {t: (d.get("_seq_no"), d.get("_primary_term")) for t, d in docs.items()}
+
+
+def get_fundamental_data_bulk(tickers, profile=ROCE_PROFILE, chunk_size=FUND_MGET_CHUNK,
+                              max_workers=FUND_FETCH_WORKERS, latencies=None, cache=None,
+                              mode=FUND_FETCH_MODE, payload=None):
+    """
+    Same per-ticker dicts as get_fundamental_data, but fetched with
+    one mget per chunk instead of one GET per ticker. Chunks run on
+    max_workers threads sharing the client; each mget's wall time is
+    appended to `latencies` and its response size in bytes to `payload`
+    when lists are passed.
+
+    mode="script" fetches through _search_recent_quarters instead of mget
+    and bypasses the cache, whose entries hold the untrimmed quarterly list.
+    mode="features" mgets the precomputed dicts from FEATURES_INDEX and
+    falls back to "includes" for tickers not materialized yet or whose
+    fundamentals doc moved since (checked with a source-less mget).
+
+    With a FundamentalsCache, entries within its TTL skip ES entirely and
+    expired ones are revalidated by _seq_no/_primary_term before any
+    _source is downloaded again.
+    """
+
+    if mode not in FUND_FETCH_MODES:
+        raise ValueError(f"Unknown fundamentals fetch mode {mode!r}, expected one of {FUND_FETCH_MODES}")
+
+    tickers = list(dict.fromkeys(tickers))
+    sources = {}
+
+    if mode == "features":
+        current = _fetch_chunked(
+            lambda c: _mget_fundamentals(c, latencies, with_source=False, payload=payload),
+            tickers, chunk_size, max_workers
+        )
+        versions = {t: (d.get("_seq_no"), d.get("_primary_term")) for t, d in current.items()}
+        results = _fetch_chunked(
+            lambda c: _mget_features(c, profile, versions, latencies, payload),
+            tickers, chunk_size, max_workers
+        )
+        missing = [t for t in tickers if t not in results]
+        if missing:
+            results.update(get_fundamental_data_bulk(
+                missing, profile, chunk_size, max_workers, latencies, cache, "includes", payload
+            ))
+        return results
+
+    if mode == "script":
+        docs = _fetch_chunked(
+            lambda c: _search_recent_quarters(c, profile, latencies, payload),
+            tickers, chunk_size, max_workers
+        )
+        sources = {ticker: doc["_source"] for ticker, doc in docs.items()}
+        cache = None
+
+    if cache is not None:
+        cached = cache.load(tickers, FUND_INDEX, ES_HOST)
+        stale = []
+
+        for ticker, entry in cached.items():
+            if entry["fresh"]:
+                sources[ticker] = entry["source"]
+            else:
+                stale.append(ticker)
+
+        if stale:
+            current = _fetch_chunked(
+                lambda c: _mget_fundamentals(c, latencies, with_source=False, payload=payload),
+                stale, chunk_size, max_workers
+            )
+            unchanged = [
+                t for t in stale
+                if t in current
+                and current[t].get("_seq_no") == cached[t]["seq_no"]
+                and current[t].get("_primary_term") == cached[t]["primary_term"]
+            ]
+            for ticker in unchanged:
+                sources[ticker] = cached[ticker]["source"]
+            cache.touch(unchanged, FUND_INDEX, ES_HOST)
+
+    to_fetch = [t for t in tickers if t not in sources] if mode == "includes" else []
+
+    if to_fetch:
+        docs = _fetch_chunked(
+            lambda c: _mget_fundamentals(c, latencies, payload=payload),
+            to_fetch, chunk_size, max_workers
+        )
+        sources.update({ticker: doc["_source"] for ticker, doc in docs.items()})
+
+        if cache is not None:
+            cache.store(docs, FUND_INDEX, ES_HOST)
+
+    results = build_fundamental_features(sources, profile)
+
+    for ticker in tickers:
+        if ticker not in results:
+            results[ticker] = empty_fundamental_result(profile)
+
+    return results
+
+
+def latency_percentiles(latencies, percentiles=(50, 90, 99)):
+    if not latencies:
+        return {}
+
+    values = np.percentile(np.asarray(latencies) * 1000, percentiles)
+    summary = {f"p{p}": round(float(v), 1) for p, v in zip(percentiles, values)}
+    summary["max"] = round(max(latencies) * 1000, 1)
+    summary["requests"] = len(latencies)
+    return summary
+
+
+def enrich_dataframe(df, fundamentals=None, profile=ROCE_PROFILE):
+
+    unique_tickers = df["Ticker"].unique()
+
+    if fundamentals is None:
+        fundamentals = get_fundamental_data_bulk(unique_tickers, profile)
+
+    # explicit columns and key dtype: an empty scan (a week without VCP
+    # rows) still merges into the enriched shape
+    fund_df = pd.DataFrame([
+        {**fundamentals[ticker], "Ticker": ticker}
+        for ticker in unique_tickers
+    ], columns=["Ticker", *empty_fundamental_result(profile)])
+    if fund_df.empty:
+        fund_df = fund_df.astype({"Ticker": df["Ticker"].dtype})
+
+    df = df.merge(fund_df, on="Ticker", how="left")
+
+    if profile.fill_missing_scores:
+        score_cols = list(profile.sign_weights)
+        df[score_cols] = df[score_cols].fillna(0)
+
+    df["Net_Score"] = calculate_net_scores(df, profile)
+
+    df = df.sort_values(by="Net_Score", ascending=False)
+
+    return df
+
+
+def enrich_frames(*frames, profile=ROCE_PROFILE, max_workers=FUND_FETCH_WORKERS, cache=None,
+                  mode=FUND_FETCH_MODE, measure_payload=False):
+    """
+    Enrich several scan frames from one fundamentals fetch: tickers are
+    deduplicated across frames so each one is requested exactly once.
+    Returns the enriched frames and a fetch summary: per-request latency
+    percentiles, end-to-end fetch time and, with measure_payload, the
+    total response payload.
+    """
+
+    latencies = []
+    payload = [] if measure_payload else None
+    tickers = pd.concat([df["Ticker"] for df in frames]).unique()
+
+    start = time.perf_counter()
+    fundamentals = get_fundamental_data_bulk(
+        tickers,
+        profile,
+        max_workers=max_workers,
+        latencies=latencies,
+        cache=cache,
+        mode=mode,
+        payload=payload
+    )
+    elapsed = time.perf_counter() - start
+
+    enriched = [enrich_dataframe(df, fundamentals, profile) for df in frames]
+
+    summary = latency_percentiles(latencies)
+    if measure_payload:
+        summary["payload_kb"] = round(sum(payload) / 1024, 1)
+    summary["total_ms"] = round(elapsed * 1000, 1)
+    return enriched, summary
+
+
+# ==========================================================
+# SECTOR SUMMARY
+# ==========================================================
+
+def sector_summary(df):
+    return (
+        df
+        .groupby("Sector")["Ticker"]
+        .count()
+        .reset_index()
+        .rename(columns={"Ticker": "Stock_Count"})
+        .sort_values(by="Stock_Count", ascending=False)
+    )
+
+
+def sector_summaries_es(groups, index=None):
+    """
+    {name: sector summary} for several ticker lists, e.g. matched and
+    missed, from a single size-0 search with a terms aggregation on the
+    fundamentals index. No fundamentals are downloaded.
+
+    Counts distinct stocks per sector; sector_summary on an enriched
+    scan frame counts one per crossed level instead.
+    """
+
+    groups = {name: list(dict.fromkeys(tickers)) for name, tickers in groups.items()}
+    everyone = list(dict.fromkeys(t for tickers in groups.values() for t in tickers))
+
+    body = {
+        "size": 0,
+        "query": {"ids": {"values": everyone}},
+        "aggs": {
+            "groups": {
+                "filters": {
+                    "filters": {name: {"ids": {"values": tickers}} for name, tickers in groups.items()}
+                },
+                "aggs": {
+                    "sectors": {"terms": {"field": FUND_SECTOR_FIELD, "size": SECTOR_AGG_SIZE}}
+                }
+            }
+        }
+    }
+
+    res = get_es().search(index=index or FUND_INDEX, body=body)
+    buckets = res["aggregations"]["groups"]["buckets"]
+
+    return {
+        name: pd.DataFrame(
+            [(b["key"], b["doc_count"]) for b in buckets[name]["sectors"]["buckets"]],
+            columns=["Sector", "Stock_Count"]
+        )
+        for name in groups
+    }
@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from Stocks_filtered import screener_core as core
+from Stocks_filtered.fundamentals_cache import FundamentalsCache
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "watch_state.sqlite")
+POLL_INTERVAL = 5          # seconds between polls
+POLL_BATCH = 500           # new docs per request while catching up
+
+# ==========================================================
+# CHECKPOINT
+# ==========================================================
+# The watcher only asks nifty_data_weekly for VCP docs with a _seq_no
+# above the last one it processed, dated no earlier than `since`, which
+# is fixed when the state is created. Docs are not indexed in date order,
+# so the checkpoint is the _seq_no alone. _seq_no is a per-shard counter,
+# so this relies on the weekly index having a single primary shard (the
+# default for an index of this size). Re-indexed docs, for any week, get
+# a new _seq_no and are evaluated again; the alerted table keeps an
+# updated doc from alerting twice for one date.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watch_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS alerted (
+    ticker TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    PRIMARY KEY (ticker, date)
+);
+"""
+
+
+class WatchState:
+
+    def __init__(self, path, since=core.SCAN_DATE):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+        meta = dict(self.conn.execute("SELECT key, value FROM watch_meta").fetchall())
+        # states written before "since" was stored kept it under "date"
+        self.since = meta.get("since", meta.get("date", since))
+        self.seq_no = int(meta.get("seq_no", -1))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def advance(self, seq_no):
+        self.seq_no = max(self.seq_no, seq_no)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO watch_meta VALUES (?, ?)",
+            [("since", self.since), ("seq_no", str(self.seq_no))]
+        )
+        self.conn.commit()
+
+    def already_alerted(self, pairs):
+        pairs = list(pairs)
+        found = set()
+
+        for start in range(0, len(pairs), 400):
+            chunk = pairs[start:start + 400]
+            where = " OR ".join(["(ticker = ? AND date = ?)"] * len(chunk))
+            found.update(self.conn.execute(
+                f"SELECT ticker, date FROM alerted WHERE {where}",
+                [v for pair in chunk for v in pair]
+            ).fetchall())
+
+        return found
+
+    def mark_alerted(self, pairs):
+        self.conn.executemany("INSERT OR IGNORE INTO alerted VALUES (?, ?)", list(pairs))
+        self.conn.commit()
+
+
+# ==========================================================
+# TAILING nifty_data_weekly
+# ==========================================================
+
+def latest_seq_no():
+    res = core.get_es().search(
+        index=core.TECH_INDEX,
+        body={
+            "size": 1,
+            "_source": False,
+            "seq_no_primary_term": True,
+            "sort": [{"_seq_no": "desc"}],
+            "query": {"match_all": {}}
+        }
+    )
+    hits = res["hits"]["hits"]
+    return hits[0]["_seq_no"] if hits else -1
+
+
+def fetch_new_docs(since, seq_no, batch=POLL_BATCH):
+    """
+    Up to `batch` VCP docs dated `since` or later with a _seq_no above
+    `seq_no`, oldest _seq_no first.
+    """
+
+    query = {
+        "size": batch,
+        "_source": ["ticker", "date", "crossed_resistance", "close"],
+        "seq_no_primary_term": True,
+        "sort": [{"_seq_no": "asc"}],
+        "query": {
+            "bool": {
+                "filter": [
+                    {"term": {"vcp_trend_template": True}},
+                    {"range": {"date": {"gte": since}}},
+                    {"range": {"_seq_no": {"gt": seq_no}}}
+                ]
+            }
+        }
+    }
+
+    return core.get_es().search(index=core.TECH_INDEX, body=query)["hits"]["hits"]
+
+
+def alert_frame(docs, profile=core.ROCE_PROFILE, cache=None):
+    """
+    One row per crossed level of each newly matched doc, scored the same
+    way as the weekly scan.
+    """
+
+    levels = core.LevelColumns()
+    dates = []
+
+    for src in docs:
+        levels.add(src)
+        dates += [str(src.get("date"))[:10]] * len(src.get("crossed_resistance", []))
+
+    df = levels.to_frame()
+    df.insert(0, "Date", dates)
+
+    fundamentals = core.get_fundamental_data_bulk(df["Ticker"].unique(), profile, cache=cache)
+    return core.enrich_dataframe(df, fundamentals, profile)
+
+
+def poll_once(state, profile=core.ROCE_PROFILE, cache=None, batch=POLL_BATCH):
+    """
+    Evaluate the matched rule on every doc that arrived since the
+    checkpoint. Returns the alert rows and how many docs were looked at.
+    """
+
+    frames = []
+    n_docs = 0
+
+    while True:
+        hits = fetch_new_docs(state.since, state.seq_no, batch)
+        if not hits:
+            break
+
+        n_docs += len(hits)
+
+        # latest version of each ticker/date in this page wins
+        matched = {}
+        for h in hits:
+            src = h["_source"]
+            key = (src["ticker"].replace(".NS", ""), str(src.get("date"))[:10])
+            if core.is_support_matched(src):
+                matched[key] = src
+            else:
+                matched.pop(key, None)
+
+        new = set(matched) - state.already_alerted(matched)
+        if new:
+            frames.append(alert_frame([matched[k] for k in matched if k in new], profile, cache))
+            state.mark_alerted(new)
+
+        state.advance(hits[-1]["_seq_no"])
+
+        if len(hits) < batch:
+            break
+
+    if not frames:
+        return pd.DataFrame(), n_docs
+
+    return pd.concat(frames, ignore_index=True), n_docs
+
+
+# ==========================================================
+# ALERTS
+# ==========================================================
+
+def emit_alerts(alerts, alerts_file=None):
+
+    best = alerts.drop_duplicates(["Date", "Ticker"])
+
+    for row in best.itertuples(index=False):
+        print(f"🚨 {row.Date} {row.Ticker}: close {row.Close}, support {row.Support}, "
+              f"Net_Score {row.Net_Score} ({row.Sector})")
+
+    if alerts_file:
+        with open(alerts_file, "a") as f:
+            for record in alerts.to_dict(orient="records"):
+                f.write(json.dumps(record, default=str) + "\n")
+
+
+def watch(profile=core.ROCE_PROFILE, state_path=STATE_FILE, since=core.SCAN_DATE,
+          poll_interval=POLL_INTERVAL, alerts_file=None, from_now=False, max_polls=None):
+
+    with WatchState(state_path, since) as state, \
+            FundamentalsCache(core.FUND_CACHE_FILE, ttl=core.FUND_CACHE_TTL,
+                              fields=core.FUND_SOURCE_FIELDS) as cache:
+
+        if from_now:
+            state.advance(latest_seq_no())
+
+        polls = 0
+
+        while max_polls is None or polls < max_polls:
+            start = time.perf_counter()
+            alerts, n_docs = poll_once(state, profile, cache)
+
+            if n_docs:
+                print(f"📥 {n_docs} new docs, {alerts['Ticker'].nunique() if len(alerts) else 0} alerts "
+                      f"in {(time.perf_counter() - start) * 1000:.0f} ms (checkpoint _seq_no {state.seq_no})")
+            if len(alerts):
+                emit_alerts(alerts, alerts_file)
+
+            polls += 1
+            time.sleep(poll_interval)
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Alert when a VCP ticker moves near its support")
+    parser.add_argument("--since", default=core.SCAN_DATE, help="oldest date to alert on when starting fresh")
+    parser.add_argument("--from-now", action="store_true", help="skip docs already in the index")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL)
+    parser.add_argument("--profile", choices=sorted(core.PROFILES), default="roce")
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--alerts-file", default=None, help="also append alerts as JSON lines")
+    core.add_es_arguments(parser)
+    args = parser.parse_args()
+    core.configure_from_args(args)
+
+    print(f"👀 Watching {core.TECH_INDEX} every {args.interval}s...")
+    try:
+        watch(core.PROFILES[args.profile], args.state, args.since, args.interval,
+              args.alerts_file, args.from_now)
+    except KeyboardInterrupt:
+        print("✅ Stopped.")